@@ -0,0 +1,19 @@
+from django.contrib import admin
+from .models import AuditEvent
+
+@admin.register(AuditEvent)
+class AuditEventAdmin(admin.ModelAdmin):
+    list_display = ("id","created_at","action","actor_email","target_email")
+    list_filter = ("action",)
+    search_fields = ("actor_email","target_email")
+    readonly_fields = ("changes",)
+
+    # Registro de solo lectura (append-only)
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
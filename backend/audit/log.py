@@ -0,0 +1,117 @@
+"""
+Registro de auditoría de las mutaciones administrativas.
+
+    record(request, "user.block", target=user, changes=diff(antes, snapshot(user)))
+
+record() no escribe en el momento: acumula el evento en un lote por
+transacción (y savepoint) que se inserta con un solo bulk_create en
+on_commit. Una importación o una acción masiva de N usuarios cuesta un
+INSERT, no N; si la transacción se deshace, sus eventos se descartan con
+ella. Fuera de un bloque atomic on_commit se ejecuta en el acto.
+
+write() inserta en el acto, dentro de la transacción en curso: para los
+procesos largos (importaciones) que auditan por bloques y no deben retener
+todos los eventos en memoria hasta el commit final.
+"""
+import ipaddress
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from users.throttling import ScopedSlidingWindowThrottle
+
+from .models import AuditEvent
+
+# Campos de User que se copian en los diffs
+USER_FIELDS = ("email", "first_name", "last_name", "telefono", "role", "status", "is_active", "permissions")
+
+_local = threading.local()
+
+
+class _Batch:
+    """Eventos de un mismo savepoint; se insertan juntos al hacer commit."""
+
+    def __init__(self, using):
+        self.using = using
+        self.events = []
+
+    def __call__(self):
+        AuditEvent.objects.using(self.using).bulk_create(self.events, batch_size=1000)
+
+
+def _batch(using):
+    conn = transaction.get_connection(using)
+    if not conn.in_atomic_block:
+        return _Batch(using)  # on_commit se ejecuta en el acto
+    registered = [func for _, func, _ in conn.run_on_commit]
+    # Los lotes ya insertados (commit) o descartados (rollback) no siguen registrados
+    pending = _local.pending = {
+        key: batch for key, batch in getattr(_local, "pending", {}).items()
+        if any(batch is func for func in registered)
+    }
+    key = (using, tuple(conn.savepoint_ids))
+    batch = pending.get(key)
+    if batch is None:
+        batch = pending[key] = _Batch(using)
+    return batch
+
+
+def snapshot(user):
+    """Valores auditables de `user` (antes o después de un cambio)."""
+    return {field: getattr(user, field) for field in USER_FIELDS}
+
+
+def diff(before, after):
+    """{"campo": [antes, después]} de los campos que cambian ({} = creado o borrado)."""
+    return {
+        k: [before.get(k), after.get(k)]
+        for k in {**before, **after}
+        if before.get(k) != after.get(k)
+    }
+
+
+def _client_ip(request):
+    if request is None:
+        return None
+    ident = ScopedSlidingWindowThrottle().get_ident(request)
+    try:
+        return str(ipaddress.ip_address(ident))
+    except ValueError:
+        return None
+
+
+def event(request, action, target=None, changes=None, actor=None):
+    """AuditEvent sin guardar; `actor` por defecto es request.user."""
+    if actor is None and request is not None:
+        actor = request.user
+    if actor is not None and not actor.is_authenticated:
+        actor = None
+    return AuditEvent(
+        action=action,
+        actor_id=actor.pk if actor is not None else None,
+        actor_email=actor.email if actor is not None else "",
+        target_id=target.pk if target is not None else None,
+        target_email=target.email if target is not None else "",
+        changes=changes or {},
+        ip=_client_ip(request),
+    )
+
+
+def record(request, action, target=None, changes=None, actor=None, using=DEFAULT_DB_ALIAS):
+    record_many([event(request, action, target, changes, actor)], using=using)
+
+
+def write(events, using=DEFAULT_DB_ALIAS):
+    """Inserta `events` ya (un bulk_create); se deshacen con la transacción en curso."""
+    AuditEvent.objects.using(using).bulk_create(events, batch_size=1000)
+
+
+def record_many(events, using=DEFAULT_DB_ALIAS):
+    if not events:
+        return
+    batch = _batch(using)
+    first = not batch.events
+    batch.events.extend(events)
+    if first:
+        # robust: un fallo de auditoría tras el commit se registra, no rompe la respuesta
+        transaction.on_commit(batch, using=using, robust=True)
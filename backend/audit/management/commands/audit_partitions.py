@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from audit.partitions import drop_partitions, ensure_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea las particiones mensuales de audit_event para los próximos meses y borra "
+        "las que superan la retención. Pensado para ejecutarse a diario (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ahead", type=int, default=settings.AUDIT_PARTITIONS_AHEAD,
+                            help="Meses futuros con partición creada.")
+        parser.add_argument("--retain-months", type=int, default=settings.AUDIT_RETENTION_MONTHS,
+                            help="Meses de histórico a conservar (0 = sin límite).")
+
+    def handle(self, *args, **o):
+        for name in ensure_partitions(o["ahead"]):
+            self.stdout.write(f"Creada {name}")
+        if o["retain_months"]:
+            for name in drop_partitions(o["retain_months"]):
+                self.stdout.write(f"Borrada {name}")
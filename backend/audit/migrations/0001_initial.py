@@ -0,0 +1,68 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_partitions(apps, schema_editor):
+    from audit.partitions import ensure_partitions
+
+    ensure_partitions(months_ahead=3)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        # Django no crea tablas particionadas: el estado es el del modelo y la
+        # tabla se crea a mano. La PK incluye la clave de partición.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='AuditEvent',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                        ('action', models.CharField(max_length=32)),
+                        ('actor_id', models.BigIntegerField(blank=True, null=True)),
+                        ('actor_email', models.CharField(blank=True, max_length=254)),
+                        ('target_id', models.BigIntegerField(blank=True, null=True)),
+                        ('target_email', models.CharField(blank=True, max_length=254)),
+                        ('changes', models.JSONField(blank=True, default=dict)),
+                        ('ip', models.GenericIPAddressField(blank=True, null=True)),
+                    ],
+                    options={
+                        'db_table': 'audit_event',
+                        'indexes': [models.Index(fields=['target_id', '-created_at', '-id'], name='audit_event_target_idx'), models.Index(fields=['actor_id', '-created_at', '-id'], name='audit_event_actor_idx')],
+                    },
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql="""
+                    CREATE TABLE audit_event (
+                        id bigint GENERATED BY DEFAULT AS IDENTITY,
+                        created_at timestamp with time zone NOT NULL DEFAULT now(),
+                        action varchar(32) NOT NULL,
+                        actor_id bigint NULL,
+                        actor_email varchar(254) NOT NULL DEFAULT '',
+                        target_id bigint NULL,
+                        target_email varchar(254) NOT NULL DEFAULT '',
+                        changes jsonb NOT NULL DEFAULT '{}',
+                        ip inet NULL,
+                        PRIMARY KEY (id, created_at)
+                    ) PARTITION BY RANGE (created_at);
+                    CREATE INDEX audit_event_target_idx ON audit_event (target_id, created_at DESC, id DESC);
+                    CREATE INDEX audit_event_actor_idx ON audit_event (actor_id, created_at DESC, id DESC);
+                    CREATE TABLE audit_event_default PARTITION OF audit_event DEFAULT;
+                    """,
+                    reverse_sql="DROP TABLE audit_event;",
+                ),
+                migrations.RunPython(create_partitions, migrations.RunPython.noop),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import models
+from django.utils import timezone
+
+
+class AuditEvent(models.Model):
+    """
+    Evento de auditoría (append-only). La tabla está particionada por mes
+    sobre created_at (ver audit.partitions y la migración 0001): la retención
+    se aplica borrando particiones enteras.
+
+    actor/target son ids sin FK, con una copia del email: el registro debe
+    sobrevivir al borrado del usuario.
+    """
+    created_at = models.DateTimeField(default=timezone.now)
+    action = models.CharField(max_length=32)
+    actor_id = models.BigIntegerField(null=True, blank=True)
+    actor_email = models.CharField(max_length=254, blank=True)
+    target_id = models.BigIntegerField(null=True, blank=True)
+    target_email = models.CharField(max_length=254, blank=True)
+    # {"campo": [antes, después]}
+    changes = models.JSONField(default=dict, blank=True)
+    ip = models.GenericIPAddressField(null=True, blank=True)
+
+    class Meta:
+        db_table = "audit_event"
+        indexes = [
+            # Consultas por keyset: (created_at, id) descendente por objetivo o actor
+            models.Index(fields=["target_id", "-created_at", "-id"], name="audit_event_target_idx"),
+            models.Index(fields=["actor_id", "-created_at", "-id"], name="audit_event_actor_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.created_at:%Y-%m-%d %H:%M} {self.action} {self.actor_email} -> {self.target_email}"
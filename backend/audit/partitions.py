@@ -0,0 +1,100 @@
+"""
+Particiones mensuales de audit_event (PARTITION BY RANGE (created_at)).
+
+  - Una partición por mes: audit_event_pYYYYMM, [día 1 del mes, día 1 del siguiente).
+  - audit_event_default recoge lo que no tenga partición; ensure_partitions()
+    mueve esas filas al crear la partición de su mes.
+  - drop_partitions() aplica la retención con DROP TABLE, sin DELETE fila a fila.
+
+manage.py audit_partitions ejecuta ambas (p.ej. a diario desde cron).
+"""
+import re
+from datetime import date, datetime, time, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+TABLE = "audit_event"
+DEFAULT = f"{TABLE}_default"
+_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def _add_months(month, n):
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month):
+    return datetime.combine(month, time.min, tzinfo=dt_timezone.utc)
+
+
+def partition_name(month):
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def existing_partitions():
+    """{primer día del mes: nombre} de las particiones mensuales actuales."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            """,
+            [TABLE],
+        )
+        names = [name for (name,) in cursor.fetchall()]
+    out = {}
+    for name in names:
+        m = _NAME.match(name)
+        if m:
+            out[date(int(m[1]), int(m[2]), 1)] = name
+    return out
+
+
+def ensure_partitions(months_ahead=3, today=None):
+    """Crea las particiones del mes actual y de los `months_ahead` siguientes. Devuelve las creadas."""
+    today = today or timezone.now().date()
+    current = today.replace(day=1)
+    existing = existing_partitions()
+    created = []
+    for n in range(months_ahead + 1):
+        month = _add_months(current, n)
+        if month in existing:
+            continue
+        name = partition_name(month)
+        start, end = _bound(month), _bound(_add_months(month, 1))
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Crear aparte y adjuntar: si la partición por defecto ya tiene filas
+            # de ese mes, se mueven antes de ATTACH (que si no fallaría).
+            cursor.execute(f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM "{DEFAULT}" WHERE created_at >= %s AND created_at < %s RETURNING *
+                )
+                INSERT INTO "{name}" SELECT * FROM moved
+                """,
+                [start, end],
+            )
+            # Los límites de partición no admiten parámetros
+            cursor.execute(
+                f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        created.append(name)
+    return created
+
+
+def drop_partitions(retain_months, today=None):
+    """Borra las particiones de meses anteriores a los últimos `retain_months`. Devuelve las borradas."""
+    today = today or timezone.now().date()
+    cutoff = _add_months(today.replace(day=1), -retain_months)
+    dropped = []
+    for month, name in sorted(existing_partitions().items()):
+        if month >= cutoff:
+            break
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE "{name}"')
+        dropped.append(name)
+    return dropped
@@ -0,0 +1,65 @@
+"""
+Consulta del registro por keyset sobre (created_at, id) descendente.
+
+Con target_id o actor_id usa audit_event_target_idx / audit_event_actor_idx
+y, al filtrar por fechas, solo las particiones de esos meses: el coste de
+una página no depende del tamaño del histórico.
+"""
+import base64
+import json
+
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditEvent
+
+FIELDS = ("id", "created_at", "action", "actor_id", "actor_email", "target_id", "target_email", "changes", "ip")
+
+
+def encode_cursor(created_at, pk):
+    raw = json.dumps([created_at.isoformat(), pk], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Devuelve (created_at, id) o lanza ValueError si el cursor no es válido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, pk = json.loads(raw)
+        created_at = parse_datetime(created_at)
+    except Exception as e:
+        raise ValueError("Cursor inválido.") from e
+    if created_at is None or not isinstance(pk, int):
+        raise ValueError("Cursor inválido.")
+    return created_at, pk
+
+
+def events(target_id=None, actor_id=None, action=None, since=None, until=None, cursor=None, limit=50):
+    """
+    Página de eventos, del más reciente al más antiguo: (filas, siguiente cursor o None).
+    Lanza ValueError si el cursor no es válido.
+    """
+    qs = AuditEvent.objects.all()
+    if target_id is not None:
+        qs = qs.filter(target_id=target_id)
+    if actor_id is not None:
+        qs = qs.filter(actor_id=actor_id)
+    if action:
+        qs = qs.filter(action=action)
+    if since is not None:
+        qs = qs.filter(created_at__gte=since)
+    if until is not None:
+        qs = qs.filter(created_at__lt=until)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        qs = qs.filter(
+            RawSQL('("audit_event"."created_at", "audit_event"."id") < (%s, %s)', (created_at, pk),
+                   output_field=BooleanField())
+        )
+    rows = list(qs.order_by("-created_at", "-id").values(*FIELDS)[: limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_cursor
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import AuditEventListView
+
+urlpatterns = [
+    path("", AuditEventListView.as_view(), name="audit-list"),
+    path("users/<int:pk>", AuditEventListView.as_view(), name="audit-user"),
+]
@@ -0,0 +1,65 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from users.policies import RolePolicyPermission
+from .query import events
+
+
+def _datetime(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    dt = parse_datetime(value)
+    if dt is None:
+        raise ValueError(f"{name} debe ser una fecha ISO 8601.")
+    return timezone.make_aware(dt) if timezone.is_naive(dt) else dt
+
+
+def _int(params, name):
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} debe ser un entero.")
+
+
+class AuditEventListView(APIView):
+    """
+    GET /api/audit?target=&actor=&action=&since=&until=&limit=&cursor=
+    GET /api/audit/users/<id>   -> eventos cuyo objetivo es <id>
+    Paginado por keyset, del más reciente al más antiguo.
+    Solo ADMIN o GERENTE.
+    """
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"GET": "ver"}
+    permission_denied_messages = {"GET": "No tienes permiso para ver la auditoría."}
+
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    def get(self, request, pk=None):
+        params = request.query_params
+        try:
+            limit = min(int(params.get("limit", self.PAGE_SIZE)), self.MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({"detail": "limit debe ser un entero."}, status=400)
+        if limit < 1:
+            return Response({"detail": "limit debe ser mayor que 0."}, status=400)
+
+        try:
+            rows, next_cursor = events(
+                target_id=pk if pk is not None else _int(params, "target"),
+                actor_id=_int(params, "actor"),
+                action=params.get("action"),
+                since=_datetime(params, "since"),
+                until=_datetime(params, "until"),
+                cursor=params.get("cursor"),
+                limit=limit,
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+        return Response({"results": rows, "next": next_cursor}, status=200)
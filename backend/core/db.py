@@ -0,0 +1,35 @@
+"""
+Utilidades de conexión a la BD (ver DB_POOL en core.settings).
+
+pool_stats() expone los contadores del pool de psycopg3 del proceso actual:
+cuántos checkouts se han servido, cuántos tuvieron que esperar y cuánto, y el
+estado de las conexiones. Sin pool (conexiones persistentes) devuelve None.
+"""
+from django.db import connections
+
+
+def pool_stats(alias="default"):
+    """Contadores acumulados del pool de `alias` en este proceso, o None."""
+    pool = connections[alias].pool
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    checkouts = stats.get("requests_num", 0)
+    return {
+        "size": stats.get("pool_size", 0),
+        "available": stats.get("pool_available", 0),
+        "min_size": stats.get("pool_min", 0),
+        "max_size": stats.get("pool_max", 0),
+        "checkouts": checkouts,
+        "waiting": stats.get("requests_waiting", 0),
+        "queued": stats.get("requests_queued", 0),
+        "wait_ms": stats.get("requests_wait_ms", 0),
+        "avg_wait_ms": stats.get("requests_wait_ms", 0) / checkouts if checkouts else 0.0,
+        "timeouts": stats.get("requests_errors", 0),
+        "usage_ms": stats.get("usage_ms", 0),
+        "connections_opened": stats.get("connections_num", 0),
+        "connect_ms": stats.get("connections_ms", 0),
+        "connection_errors": stats.get("connections_errors", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+        "returns_bad": stats.get("returns_bad", 0),
+    }
@@ -0,0 +1,188 @@
+"""
+Métricas Prometheus (prometheus_client), servidas en GET /metrics.
+
+Con varios workers de gunicorn cada proceso escribe sus valores en ficheros
+mmap de PROMETHEUS_MULTIPROC_DIR y /metrics los agrega al leerlos
+(MultiProcessCollector); gunicorn.conf.py vacía el directorio al arrancar y
+marca los workers que mueren. Sin esa variable (runserver) se usa el registro
+en memoria del proceso.
+
+  - http_request_duration_seconds{view, method, status}: MetricsMiddleware.
+  - auth_login_total{status}: success / failure / forbidden / invalid /
+    throttled, según la respuesta de la vista auth-login (sync o async).
+  - ratelimit_rejections_total{scope}: intentos rechazados por core.ratelimit
+    (los 429 de login, registro y restablecimiento).
+  - cache_lookups_total{cache, result}: caché de principals y de feeds; el
+    ratio de aciertos se calcula en Prometheus.
+  - db_pool_*: contadores del pool de psycopg3 (core.db.pool_stats), volcados
+    como mucho cada METRICS_POOL_INTERVAL segundos desde el middleware.
+
+Con METRICS_ENABLED=False no se importa prometheus_client: las funciones de
+registro vuelven al instante y el middleware se descarta al arrancar.
+Registrar un valor cuesta unos pocos µs (ver bench_metrics).
+"""
+import os
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from .db import pool_stats
+
+LOGIN_VIEW = "auth-login"
+LOGIN_STATUS = {200: "success", 400: "invalid", 401: "failure", 403: "forbidden", 429: "throttled"}
+
+_lock = threading.Lock()
+_metrics = None
+_children = {}
+
+
+def enabled():
+    return settings.METRICS_ENABLED
+
+
+def _get():
+    """Crea las métricas la primera vez (solo si METRICS_ENABLED)."""
+    global _metrics
+    if _metrics is None:
+        with _lock:
+            if _metrics is None:
+                from prometheus_client import Counter, Gauge, Histogram
+
+                _metrics = {
+                    "request": Histogram(
+                        "http_request_duration_seconds", "Duración de las peticiones por vista.",
+                        ["view", "method", "status"],
+                        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+                    ),
+                    "login": Counter("auth_login", "Intentos de login por resultado.", ["status"]),
+                    "ratelimit": Counter(
+                        "ratelimit_rejections", "Intentos rechazados por el rate limiter.", ["scope"]
+                    ),
+                    "cache": Counter("cache_lookups", "Consultas a cachés de aplicación.", ["cache", "result"]),
+                    "pool_checkouts": Counter("db_pool_checkouts", "Conexiones entregadas por el pool."),
+                    "pool_queued": Counter("db_pool_queued", "Checkouts que tuvieron que esperar."),
+                    "pool_wait": Counter("db_pool_wait_seconds", "Tiempo total de espera en el pool."),
+                    "pool_timeouts": Counter("db_pool_timeouts", "Checkouts que agotaron el timeout."),
+                    "pool_connections": Gauge(
+                        "db_pool_connections", "Conexiones del pool por estado.", ["state"],
+                        multiprocess_mode="livesum",
+                    ),
+                }
+    return _metrics
+
+
+def _child(name, *labels):
+    # labels() valida y toma un lock en cada llamada; el hijo se guarda aparte
+    key = (name, labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children.setdefault(key, _get()[name].labels(*labels))
+    return child
+
+
+def observe_request(view, method, status, seconds):
+    _child("request", view, method, str(status)).observe(seconds)
+    if view == LOGIN_VIEW and method == "POST":
+        _child("login", LOGIN_STATUS.get(status, str(status))).inc()
+
+
+def ratelimit_rejected(scope):
+    if settings.METRICS_ENABLED:
+        _child("ratelimit", scope).inc()
+
+
+def cache_lookup(cache, result):
+    if settings.METRICS_ENABLED:
+        _child("cache", cache, result).inc()
+
+
+_pool_state = {"next": 0.0, "last": {}}
+
+
+def _sync_pool(now):
+    """Suma al contador la diferencia desde la última lectura de pool_stats()."""
+    with _lock:
+        if now < _pool_state["next"]:
+            return
+        _pool_state["next"] = now + settings.METRICS_POOL_INTERVAL
+        stats = pool_stats()
+        if stats is None:
+            return
+        last, _pool_state["last"] = _pool_state["last"], stats
+    metrics = _get()
+    for key, name, scale in (
+        ("checkouts", "pool_checkouts", 1), ("queued", "pool_queued", 1),
+        ("wait_ms", "pool_wait", 1000), ("timeouts", "pool_timeouts", 1),
+    ):
+        delta = stats[key] - last.get(key, 0)
+        if delta > 0:
+            metrics[name].inc(delta / scale)
+    _child("pool_connections", "size").set(stats["size"])
+    _child("pool_connections", "available").set(stats["available"])
+    _child("pool_connections", "waiting").set(stats["waiting"])
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.pool = settings.DATABASES["default"].get("OPTIONS", {}).get("pool") is not None
+        _get()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        t0 = time.perf_counter()
+        response = self.get_response(request)
+        self._record(request, response, t0)
+        return response
+
+    async def __acall__(self, request):
+        t0 = time.perf_counter()
+        response = await self.get_response(request)
+        self._record(request, response, t0)
+        return response
+
+    def _record(self, request, response, t0):
+        now = time.perf_counter()
+        match = request.resolver_match
+        view = match.view_name if match is not None and match.view_name else "<unresolved>"
+        observe_request(view, request.method, response.status_code, now - t0)
+        if self.pool and now >= _pool_state["next"]:
+            _sync_pool(now)
+
+
+def _registry():
+    from prometheus_client import REGISTRY, CollectorRegistry
+    from prometheus_client.multiprocess import MultiProcessCollector
+
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    return registry
+
+
+@require_GET
+def metrics_view(request):
+    """Exposición en formato texto de Prometheus (de todos los workers)."""
+    if not settings.METRICS_ENABLED:
+        return HttpResponse(status=404)
+    token = settings.METRICS_TOKEN
+    if token and not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponseForbidden()
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+    return HttpResponse(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
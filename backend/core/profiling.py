@@ -0,0 +1,238 @@
+"""
+Perfilado por petición (desactivado por defecto).
+
+ProfilingMiddleware mide en cada petición:
+  - tiempo total, nº de consultas y tiempo en BD (connection.execute_wrapper),
+  - tiempo en serializers DRF (Serializer.data) y aciertos/fallos de la caché,
+y lo devuelve en la cabecera Server-Timing. Además:
+  - PROFILING_SAMPLE_RATE=N guarda un perfil (cProfile, o pyinstrument si
+    PROFILING_TOOL=pyinstrument y está instalado) de 1 de cada N peticiones
+    en PROFILING_DIR;
+  - SLOW_QUERY_MS registra (logger "core.profiling") cada consulta más lenta
+    que el umbral, con el nombre de la vista.
+
+Sin PROFILING_ENABLED ni SLOW_QUERY_MS el middleware lanza MiddlewareNotUsed
+y Django lo descarta al arrancar: coste cero. Los parches de Serializer.data
+y de la caché solo se instalan si está activo.
+
+Para tests y benchmarks, assert_max_queries() detecta regresiones N+1:
+
+    with assert_max_queries(3):
+        client.get("/api/auth/users")
+"""
+import contextlib
+import cProfile
+import itertools
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("profiling_stats", default=None)
+_patch_lock = threading.Lock()
+_patched = False
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "slow", "serialize_time", "serialize_depth",
+                 "cache_hits", "cache_misses")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.slow = []
+        self.serialize_time = 0.0
+        self.serialize_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+def _db_wrapper(stats, slow_ms):
+    def wrapper(execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - t0
+            stats.queries += 1
+            stats.db_time += elapsed
+            if slow_ms and elapsed * 1000 >= slow_ms:
+                stats.slow.append((elapsed, sql))
+    return wrapper
+
+
+def _patch():
+    """Instrumenta Serializer.data y get/get_many de la caché (una sola vez)."""
+    global _patched
+    with _patch_lock:
+        if _patched:
+            return
+        from rest_framework.serializers import BaseSerializer
+
+        data = BaseSerializer.data
+
+        def timed_data(self):
+            stats = _current.get()
+            if stats is None:
+                return data.fget(self)
+            # ListSerializer.data llama a BaseSerializer.data: solo cuenta el más externo
+            stats.serialize_depth += 1
+            t0 = time.perf_counter()
+            try:
+                return data.fget(self)
+            finally:
+                stats.serialize_depth -= 1
+                if not stats.serialize_depth:
+                    stats.serialize_time += time.perf_counter() - t0
+
+        BaseSerializer.data = property(timed_data)
+
+        backend = type(caches["default"])
+        get, get_many = backend.get, backend.get_many
+        missing = object()
+
+        def counted_get(self, key, default=None, version=None):
+            stats = _current.get()
+            if stats is None:
+                return get(self, key, default, version)
+            value = get(self, key, missing, version)
+            if value is missing:
+                stats.cache_misses += 1
+                return default
+            stats.cache_hits += 1
+            return value
+
+        def counted_get_many(self, keys, version=None):
+            stats = _current.get()
+            result = get_many(self, keys, version)
+            if stats is not None:
+                keys = list(keys) if not isinstance(keys, (list, tuple)) else keys
+                stats.cache_hits += len(result)
+                stats.cache_misses += len(keys) - len(result)
+            return result
+
+        backend.get, backend.get_many = counted_get, counted_get_many
+        _patched = True
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.enabled = settings.PROFILING_ENABLED
+        self.slow_ms = settings.SLOW_QUERY_MS
+        if not self.enabled and not self.slow_ms:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE if self.enabled else 0
+        self._counter = itertools.count(1)
+        if self.enabled:
+            _patch()
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        profiler = self._start_profiler() if self.sample_rate and next(self._counter) % self.sample_rate == 0 else None
+        t0 = time.perf_counter()
+        try:
+            with contextlib.ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(_db_wrapper(stats, self.slow_ms)))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - t0
+
+        view = self._view_name(request)
+        for elapsed, sql in stats.slow:
+            logger.warning("Consulta lenta (%.1f ms) en %s %s [%s]: %s",
+                           elapsed * 1000, request.method, request.path, view, sql[:2000])
+        if profiler is not None:
+            self._save_profile(profiler, request, view, total)
+        if self.enabled:
+            response["Server-Timing"] = (
+                f"total;dur={total * 1000:.1f}, "
+                f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+                f"serialize;dur={stats.serialize_time * 1000:.1f}, "
+                f'cache;desc="{stats.cache_hits} hits {stats.cache_misses} misses"'
+            )
+        return response
+
+    @staticmethod
+    def _view_name(request):
+        match = getattr(request, "resolver_match", None)
+        return match.view_name if match and match.view_name else "-"
+
+    @staticmethod
+    def _start_profiler():
+        if settings.PROFILING_TOOL == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                logger.warning("pyinstrument no está instalado; se usa cProfile")
+            else:
+                profiler = Profiler()
+                profiler.start()
+                return profiler
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    @staticmethod
+    def _save_profile(profiler, request, view, total):
+        directory = Path(settings.PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method}-{view.replace(':', '_')}-{total * 1000:.0f}ms"
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+            profiler.dump_stats(directory / f"{name}.prof")
+        else:
+            profiler.stop()
+            (directory / f"{name}.html").write_text(profiler.output_html())
+
+
+class QueryCounter:
+    """Consultas ejecutadas dentro del bloque (también las de peticiones del test client)."""
+
+    def __init__(self, using="default"):
+        self.using = using
+        self.queries = []
+
+    def __enter__(self):
+        self._cm = connections[self.using].execute_wrapper(self._record)
+        self._cm.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._cm.__exit__(*exc)
+
+    def _record(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def repeated(self):
+        """SQL ejecutado más de una vez (síntoma típico de N+1)."""
+        return {sql: n for sql, n in Counter(self.queries).items() if n > 1}
+
+
+@contextlib.contextmanager
+def assert_max_queries(limit, using="default"):
+    """Falla si el bloque ejecuta más de `limit` consultas; lista las repetidas."""
+    with QueryCounter(using) as counter:
+        yield counter
+    if len(counter) > limit:
+        repeated = "\n".join(f"  {n}x {sql[:300]}" for sql, n in counter.repeated().items())
+        raise AssertionError(
+            f"{len(counter)} consultas, máximo {limit}."
+            + (f"\nRepetidas:\n{repeated}" if repeated else "")
+        )
@@ -0,0 +1,166 @@
+"""
+Contadores de ventana deslizante sobre la caché compartida (CACHES["default"]).
+
+Cada límite (Limit) divide su ventana en BUCKETS cubos. check() evalúa
+varios límites a la vez (p.ej. por IP, por email y por endpoint) en una sola
+ida y vuelta a la caché: si todos tienen hueco suma 1 al cubo actual de cada
+uno; si alguno está lleno no cuenta nada y dice cuánto esperar.
+
+  - Redis (CACHE_URL): un script Lua, atómico en el servidor.
+  - Otros backends (LocMemCache sin red): get_many/set_many bajo un lock del
+    proceso, atómico para LocMemCache, que ya es por proceso.
+
+Si la caché no responde se deja pasar (fail-open) y se registra el error: un
+corte de Redis no debe tumbar login o restablecimiento de contraseña.
+"""
+import logging
+import math
+import threading
+import time
+from collections import Counter, namedtuple
+
+from django.core.cache import cache
+from django.core.cache.backends.redis import RedisCache
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = 10
+
+Limit = namedtuple("Limit", "scope ident limit window")
+
+_PERIODS = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600, "hour": 3600, "d": 86400, "day": 86400}
+
+# KEYS: claves de cubo de cada límite (BUCKETS por límite, la última es la actual)
+# ARGV: [nº de límites, BUCKETS, límite_1, ttl_1, límite_2, ttl_2, ...]
+# Devuelve {0} si se admite, o {i, cubos del límite i} si el límite i está lleno.
+_LUA = """
+local n, b = tonumber(ARGV[1]), tonumber(ARGV[2])
+for i = 1, n do
+  local vals = redis.call('MGET', unpack(KEYS, (i - 1) * b + 1, i * b))
+  local total = 0
+  for j = 1, b do total = total + (tonumber(vals[j]) or 0) end
+  if total + 1 > tonumber(ARGV[1 + 2 * i]) then
+    local out = {i}
+    for j = 1, b do out[j + 1] = tonumber(vals[j]) or 0 end
+    return out
+  end
+end
+for i = 1, n do
+  local key = KEYS[i * b]
+  redis.call('INCR', key)
+  redis.call('EXPIRE', key, tonumber(ARGV[2 + 2 * i]))
+end
+return {0}
+"""
+
+_local_lock = threading.Lock()
+_script = None
+
+_rejections = Counter()
+_rejections_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """'5/min' -> (5, 60). None o '' -> None (sin límite)."""
+    if not rate:
+        return None
+    num, period = rate.split("/")
+    return int(num), _PERIODS[period.strip().lower()]
+
+
+def _bucket_keys(limit, now):
+    size = limit.window / BUCKETS
+    current = int(now // size)
+    buckets = range(current - BUCKETS + 1, current + 1)
+    return buckets, size, [f"rl:{limit.scope}:{limit.ident}:{b}" for b in buckets]
+
+
+def _check_redis(limits, keys, ttls):
+    global _script
+    client = cache._cache.get_client(write=True)
+    if _script is None:
+        # EVALSHA; si el servidor no tiene el script (reinicio) lo vuelve a cargar
+        _script = client.register_script(_LUA)
+    args = [len(limits), BUCKETS]
+    for limit, ttl in zip(limits, ttls):
+        args += [limit.limit, ttl]
+    result = _script(keys=[cache.make_and_validate_key(k) for k in keys], args=args, client=client)
+    return int(result[0]), [int(v) for v in result[1:]]
+
+
+def _check_local(limits, keys, ttls):
+    with _local_lock:
+        values = cache.get_many(keys)
+        for i, limit in enumerate(limits):
+            counts = [int(values.get(k, 0)) for k in keys[i * BUCKETS:(i + 1) * BUCKETS]]
+            if sum(counts) + 1 > limit.limit:
+                return i + 1, counts
+        for i, ttl in enumerate(ttls):
+            key = keys[(i + 1) * BUCKETS - 1]
+            cache.set(key, int(values.get(key, 0)) + 1, ttl)
+    return 0, []
+
+
+def check(limits):
+    """
+    Registra un intento contra todos los `limits` (iterable de Limit).
+    Devuelve (permitido, segundos de espera, Limit rechazado o None).
+    """
+    limits = [lim for lim in limits if lim is not None]
+    if not limits:
+        return True, 0, None
+    now = time.time()
+    keys, ttls, windows = [], [], []
+    for limit in limits:
+        buckets, size, limit_keys = _bucket_keys(limit, now)
+        keys += limit_keys
+        ttls.append(math.ceil(limit.window + size))
+        windows.append((buckets, size))
+    try:
+        if isinstance(cache, RedisCache):
+            failed, counts = _check_redis(limits, keys, ttls)
+        else:
+            failed, counts = _check_local(limits, keys, ttls)
+    except Exception:
+        logger.exception("Rate limit no disponible; se permite el intento")
+        return True, 0, None
+    if not failed:
+        return True, 0, None
+
+    limit = limits[failed - 1]
+    buckets, size = windows[failed - 1]
+    with _rejections_lock:
+        _rejections[limit.scope] += 1
+    metrics.ratelimit_rejected(limit.scope)
+    # Espera hasta que salgan de la ventana suficientes cubos antiguos
+    remaining = sum(counts)
+    for b, count in zip(buckets, counts):
+        remaining -= count
+        if remaining < limit.limit:
+            return False, max(1, math.ceil((b + BUCKETS) * size - now)), limit
+    return False, math.ceil(limit.window), limit
+
+
+def hit(scope, ident, limit, window):
+    """check() de un único límite: (permitido, segundos de espera)."""
+    allowed, wait, _ = check([Limit(scope, ident, limit, window)])
+    return allowed, wait
+
+
+def count(scope, ident, window):
+    """Intentos de `ident` dentro de la ventana actual."""
+    _, _, keys = _bucket_keys(Limit(scope, ident, 0, window), time.time())
+    return sum(int(v) for v in cache.get_many(keys).values())
+
+
+def reset(scope, ident, window):
+    _, _, keys = _bucket_keys(Limit(scope, ident, 0, window), time.time())
+    cache.delete_many(keys)
+
+
+def rejections():
+    """Intentos rechazados por scope en el proceso actual."""
+    with _rejections_lock:
+        return dict(_rejections)
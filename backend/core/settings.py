@@ -41,13 +41,20 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     'rest_framework_simplejwt',
     "corsheaders",
     "users",
+    "scheduling",
+    "jobs",
+    "notifications",
+    "audit",
 ]
 
 MIDDLEWARE = [
+    "core.metrics.MetricsMiddleware",  # inactivo salvo METRICS_ENABLED
+    "core.profiling.ProfilingMiddleware",  # inactivo salvo PROFILING_ENABLED / SLOW_QUERY_MS
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -77,6 +84,12 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'core.wsgi.application'
 
+# Servidor: "wsgi" (gunicorn, workers sync) o "asgi" (gunicorn + UvicornWorker),
+# ver deploy/entrypoint.sh. En ASGI, login, me y el GET de acceso se sirven con
+# las vistas async de users.async_views.
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi")
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", str(SERVER_MODE == "asgi")) == "True"
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -89,9 +102,44 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", "shiftpass"),
         "HOST": os.getenv("POSTGRES_HOST", "db"),
         "PORT": os.getenv("POSTGRES_PORT", "5432"),
+        "OPTIONS": {},
     }
 }
 
+# Conexiones a la BD (ver core.db):
+#   - DB_POOL=True: pool de psycopg3 por proceso (OPTIONS["pool"]). Es el modo
+#     por defecto con SERVER_MODE=asgi, donde las conexiones persistentes de
+#     Django no son seguras (cada petición puede ir en otro hilo).
+#   - Sin pool: conexión persistente por hilo durante CONN_MAX_AGE segundos
+#     (solo WSGI; en ASGI sin pool se abre una conexión por petición).
+# CONN_HEALTH_CHECKS valida la conexión antes de reutilizarla en ambos modos.
+# DB_SERVER_SIDE_BINDING=True: parámetros enlazados en el servidor (psycopg3
+# Cursor) en lugar de interpolados en el cliente (ClientCursor, el de Django
+# por defecto). Solo así psycopg prepara sentencias: DB_PREPARE_THRESHOLD son
+# las ejecuciones de una misma consulta antes de prepararla ("none" = nunca).
+# Sin efecto con ClientCursor. Detrás de PgBouncer en modo transacción hace
+# falta PgBouncer >= 1.21 con max_prepared_statements, o DB_PREPARE_THRESHOLD=none.
+DB_POOL = os.getenv("DB_POOL", str(SERVER_MODE == "asgi")) == "True"
+if os.getenv("DB_SERVER_SIDE_BINDING", "False") == "True":
+    _prepare_threshold = os.getenv("DB_PREPARE_THRESHOLD", "5")
+    DATABASES["default"]["OPTIONS"]["server_side_binding"] = True
+    DATABASES["default"]["OPTIONS"]["prepare_threshold"] = (
+        None if _prepare_threshold.lower() == "none" else int(_prepare_threshold)
+    )
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = os.getenv("CONN_HEALTH_CHECKS", "True") == "True"
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "4")),          # por proceso
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),         # espera máxima de un checkout
+        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+        "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+    }
+elif SERVER_MODE == "asgi":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("CONN_MAX_AGE", "60"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -112,6 +160,39 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# PASSWORD_HASHER elige el algoritmo para hashes nuevos (pbkdf2 | argon2 | scrypt).
+# Los demás quedan registrados para verificar hashes existentes; al hacer login
+# con un hash de otro algoritmo o de otro coste, Django lo regenera.
+_PASSWORD_HASHERS = {
+    "pbkdf2": "users.hashers.TunablePBKDF2PasswordHasher",
+    "argon2": "users.hashers.TunableArgon2PasswordHasher",
+    "scrypt": "users.hashers.TunableScryptPasswordHasher",
+}
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2")
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+]
+
+PBKDF2_ITERATIONS = int(os.getenv("PBKDF2_ITERATIONS", "1000000"))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+SCRYPT_WORK_FACTOR = int(os.getenv("SCRYPT_WORK_FACTOR", str(2**14)))
+SCRYPT_BLOCK_SIZE = int(os.getenv("SCRYPT_BLOCK_SIZE", "8"))
+SCRYPT_PARALLELISM = int(os.getenv("SCRYPT_PARALLELISM", "1"))
+
+# Procesos para hashear contraseñas en lote (users.hashing); 0/1 = en línea
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+# Filas por bloque en la importación masiva de usuarios (users.importers)
+USER_IMPORT_CHUNK_SIZE = int(os.getenv("USER_IMPORT_CHUNK_SIZE", "1000"))
+# Filas por FETCH del cursor de servidor en la exportación (users.exporters)
+USER_EXPORT_CHUNK_SIZE = int(os.getenv("USER_EXPORT_CHUNK_SIZE", "2000"))
+# Máximo de usuarios por acción masiva (users.bulk), por ids o por filtro
+USER_BULK_ACTION_MAX_USERS = int(os.getenv("USER_BULK_ACTION_MAX_USERS", "10000"))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 AUTH_USER_MODEL = "users.User"
@@ -137,9 +218,34 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
+    # Proxies de confianza delante de Django (1 detrás de nginx): la IP del
+    # cliente para el throttling se toma de X-Forwarded-For solo a través de ellos.
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "0")),
+}
+
+# Límites de los endpoints públicos (users.throttling): "N/s|min|h|d" por IP,
+# por email y por endpoint (global); vacío desactiva ese límite.
+THROTTLE_RATES = {
+    "login": {
+        "ip": os.getenv("THROTTLE_LOGIN_IP", "20/min"),
+        "email": os.getenv("THROTTLE_LOGIN_EMAIL", "5/min"),
+        # Sin límite global por defecto: unas decenas de IPs de un ataque de
+        # credential stuffing lo agotarían y dejarían sin login a todos los
+        # usuarios legítimos. La protección real son los límites por IP y email.
+        "endpoint": os.getenv("THROTTLE_LOGIN_ENDPOINT", ""),
+    },
+    "register": {
+        "ip": os.getenv("THROTTLE_REGISTER_IP", "10/h"),
+        "endpoint": os.getenv("THROTTLE_REGISTER_ENDPOINT", "5/s"),
+    },
+    "password_reset": {
+        "ip": os.getenv("THROTTLE_RESET_IP", "10/h"),
+        "email": os.getenv("THROTTLE_RESET_EMAIL", "1/h"),
+        "endpoint": os.getenv("THROTTLE_RESET_ENDPOINT", "5/s"),
+    },
 }
 
 SIMPLE_JWT = {
@@ -149,16 +255,111 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
 }
 
+# Perfilado por petición (core.profiling): Server-Timing, muestras de perfil
+# (1 de cada PROFILING_SAMPLE_RATE peticiones, 0 = ninguna) y log de
+# consultas lentas (SLOW_QUERY_MS, 0 = desactivado).
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False") == "True"
+PROFILING_SAMPLE_RATE = int(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_TOOL = os.getenv("PROFILING_TOOL", "cprofile")  # cprofile | pyinstrument
+PROFILING_DIR = os.getenv("PROFILING_DIR", str(BASE_DIR / "profiles"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+
+# Métricas Prometheus en /metrics (core.metrics). Con varios workers hace falta
+# PROMETHEUS_MULTIPROC_DIR (lo lee prometheus_client del entorno). METRICS_TOKEN
+# exige "Authorization: Bearer <token>" al leerlas.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "False") == "True"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_POOL_INTERVAL = float(os.getenv("METRICS_POOL_INTERVAL", "5"))
+
+# Caché compartida: rate limits (core.ratelimit), principales, versiones de
+# feeds y de disponibilidad. Con CACHE_URL (redis://host:6379/0) la comparten
+# todos los workers y procesos; sin ella se usa LocMemCache, por proceso y sin
+# red (desarrollo y pruebas), con la misma API (incr atómico incluido).
+CACHE_URL = os.getenv("CACHE_URL", "")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+            "KEY_PREFIX": "ss",
+            "OPTIONS": {
+                "socket_connect_timeout": float(os.getenv("CACHE_CONNECT_TIMEOUT", "0.5")),
+                "socket_timeout": float(os.getenv("CACHE_TIMEOUT", "0.5")),
+            },
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "shift-scheduler",
+            "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "20000"))},
+        }
+    }
 
+# Caché del principal autenticado (users.principal)
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))  # entradas por proceso
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "300"))  # segundos
+
+
+
+# Presupuesto (segundos) de la fase de búsqueda local del generador de rosters
+ROSTER_TIME_BUDGET = float(os.getenv("ROSTER_TIME_BUDGET", "2.0"))
+# Horas semanales: por encima de OVERTIME se marcan horas extra; MAX es el límite al asignar
+OVERTIME_WEEKLY_HOURS = int(os.getenv("OVERTIME_WEEKLY_HOURS", "40"))
+MAX_WEEKLY_HOURS = int(os.getenv("MAX_WEEKLY_HOURS", "48"))
+# Feeds de turnos por empleado (me.ics / me.csv): ventana y caché del cliente
+FEED_PAST_DAYS = int(os.getenv("FEED_PAST_DAYS", "30"))
+FEED_FUTURE_DAYS = int(os.getenv("FEED_FUTURE_DAYS", "180"))
+FEED_MAX_AGE = int(os.getenv("FEED_MAX_AGE", "60"))
+FEED_UID_DOMAIN = os.getenv("FEED_UID_DOMAIN", "shift-scheduler.local")
+# Segundos máximos que un proceso usa su matriz de disponibilidad sin resincronizar
+AVAILABILITY_MAX_STALENESS = float(os.getenv("AVAILABILITY_MAX_STALENESS", "30"))
+
+# Trabajos en segundo plano (jobs, manage.py run_jobs)
+JOB_HANDLERS = {
+    "roster.generate": "scheduling.roster.generate_roster_job",
+    "users.import": "users.importers.import_users_job",
+}
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(os.cpu_count() or 1)))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+# Sin latido del worker durante este tiempo, el trabajo se considera huérfano
+JOB_STALE_AFTER = int(os.getenv("JOB_STALE_AFTER", "300"))
+JOB_PROGRESS_INTERVAL = float(os.getenv("JOB_PROGRESS_INTERVAL", "0.5"))
+# Archivos de entrada de los trabajos (jobs.inputs); compartido entre web y worker
+JOB_INPUT_DIR = os.getenv("JOB_INPUT_DIR", str(BASE_DIR / "job_inputs"))
+# Importaciones de usuarios mayores que esto (bytes) se procesan como trabajo
+USER_IMPORT_INLINE_MAX_BYTES = int(os.getenv("USER_IMPORT_INLINE_MAX_BYTES", str(512 * 1024)))
 
 # Token de reset expira en 24h
 PASSWORD_RESET_TIMEOUT = 60 * 60 * 24  # 86400 segundos
 
-# Email (desarrollo)
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+# Email. Las vistas solo encolan en la outbox (notifications.outbox); el
+# envío lo hace manage.py send_outbox. Sin SMTP: backend de consola o de
+# ficheros (EMAIL_BACKEND=django.core.mail.backends.filebased.EmailBackend y
+# EMAIL_FILE_PATH) para probar sin red.
+EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend")
+EMAIL_FILE_PATH = os.getenv("EMAIL_FILE_PATH", str(BASE_DIR / "sent_emails"))
+EMAIL_HOST = os.getenv("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", "25"))
+EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "False") == "True"
+EMAIL_TIMEOUT = int(os.getenv("EMAIL_TIMEOUT", "10"))
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "2.0"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+# Segundos que un emisor se reserva un lote; al caducar, otro lo vuelve a reclamar
+OUTBOX_LEASE = int(os.getenv("OUTBOX_LEASE", str(OUTBOX_BATCH_SIZE * EMAIL_TIMEOUT + 60)))
 
 DEFAULT_FROM_EMAIL = "no-reply@shift-scheduler.local"
 
+# Auditoría (app audit): audit_event particionada por mes. manage.py
+# audit_partitions crea las de los próximos meses y borra las antiguas.
+AUDIT_PARTITIONS_AHEAD = int(os.getenv("AUDIT_PARTITIONS_AHEAD", "3"))
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "24"))  # 0 = sin límite
+
 PASSWORD_RESET_CONFIRM_FRONTEND_URL = os.getenv(
     "PASSWORD_RESET_CONFIRM_FRONTEND_URL", ""  # p.ej. "http://localhost:5173/reset"
 )
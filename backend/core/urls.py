@@ -17,7 +17,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from core.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/auth/", include("users.urls")),
+    path("api/schedules/", include("scheduling.urls")),
+    path("api/jobs/", include("jobs.urls")),
+    path("api/audit/", include("audit.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ]
@@ -0,0 +1,23 @@
+"""
+Configuración de gunicorn (se carga sola desde el directorio de trabajo).
+
+Con PROMETHEUS_MULTIPROC_DIR (métricas de core.metrics compartidas entre
+workers) se vacía el directorio al arrancar el master y se marcan los workers
+que terminan, para que sus gauges dejen de sumarse.
+"""
+import os
+import shutil
+
+
+def on_starting(server):
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
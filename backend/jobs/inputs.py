@@ -0,0 +1,34 @@
+"""
+Archivos de entrada de los trabajos (p.ej. el CSV de una importación).
+
+Se guardan en JOB_INPUT_DIR, un directorio compartido entre la web y el
+worker (volumen job_inputs en docker-compose); el Job solo lleva el nombre
+en payload["input"]. La subida se copia por bloques (o se mueve, si Django
+ya la volcó a un temporal): no pasa entera por memoria ni por la tabla de
+la cola. queue.succeed() y el fallo definitivo en queue.fail() la borran.
+"""
+import os
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+
+def _storage():
+    return FileSystemStorage(location=settings.JOB_INPUT_DIR)
+
+
+def save(upload):
+    """Guarda `upload` (UploadedFile) y devuelve el nombre para payload["input"]."""
+    ext = os.path.splitext(upload.name or "")[1][:16]
+    return _storage().save(f"{uuid.uuid4().hex}{ext}", upload)
+
+
+def open_input(name):
+    """File binario de solo lectura (iterable por líneas, con tell() y size)."""
+    return _storage().open(name, "rb")
+
+
+def delete(name):
+    if name:
+        _storage().delete(name)
@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs import queue
+from jobs.runner import execute, init_worker
+
+STALE_CHECK_EVERY = 30.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker de trabajos en segundo plano: reclama Jobs de PostgreSQL con "
+        "FOR UPDATE SKIP LOCKED y los ejecuta en un ProcessPoolExecutor. "
+        "Se pueden lanzar varios workers contra la misma BD."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=settings.JOB_WORKERS,
+                            help="Procesos del pool (trabajos simultáneos).")
+        parser.add_argument("--poll", type=float, default=settings.JOB_POLL_INTERVAL,
+                            help="Segundos entre consultas a la cola cuando está vacía.")
+        parser.add_argument("--once", action="store_true",
+                            help="Termina cuando la cola quede vacía.")
+
+    def handle(self, *args, **opts):
+        self.workers = max(1, opts["workers"])
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        self.pool = self._pool()
+        inflight = {}
+        last_stale_check = 0.0
+        self.stdout.write(f"Worker {self.name} con {self.workers} procesos")
+
+        while not (self.stopping and not inflight):
+            # Como entre peticiones: aplica CONN_MAX_AGE/health checks o
+            # devuelve la conexión al pool (DB_POOL) entre iteraciones.
+            close_old_connections()
+            self._collect(inflight)
+
+            claimed = []
+            if not self.stopping:
+                claimed = queue.claim(self.name, self.workers - len(inflight))
+                for job_id in claimed:
+                    inflight[self.pool.submit(execute, job_id)] = job_id
+            queue.heartbeat(inflight.values())
+
+            if time.monotonic() - last_stale_check > STALE_CHECK_EVERY:
+                last_stale_check = time.monotonic()
+                requeued = queue.requeue_stale()
+                if requeued:
+                    self.stdout.write(f"{requeued} trabajos huérfanos devueltos a la cola")
+
+            if opts["once"] and not inflight and not claimed:
+                break
+            if inflight:
+                wait(inflight, timeout=opts["poll"], return_when=FIRST_COMPLETED)
+            elif not claimed:
+                time.sleep(opts["poll"])
+
+        self.pool.shutdown(wait=True)
+        self.stdout.write("Worker detenido")
+
+    def _pool(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=init_worker,
+        )
+
+    def _collect(self, inflight):
+        broken = False
+        for future in [f for f in inflight if f.done()]:
+            job_id = inflight.pop(future)
+            try:
+                self.stdout.write(f"Job {job_id}: {future.result()}")
+            except BrokenProcessPool:
+                # Un hijo murió (OOM, señal): el pool entero queda inutilizable
+                queue.fail(job_id, "El proceso del trabajo terminó de forma inesperada.")
+                broken = True
+            except Exception as e:
+                queue.fail(job_id, f"{type(e).__name__}: {e}")
+        if broken:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = self._pool()
+
+    def _stop(self, signum, frame):
+        if not self.stopping:
+            self.stdout.write("Deteniendo: se esperan los trabajos en curso…")
+        self.stopping = True
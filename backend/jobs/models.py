@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Trabajo en segundo plano. La cola es la propia tabla: el worker
+    (manage.py run_jobs) reclama filas QUEUED con FOR UPDATE SKIP LOCKED.
+    """
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED", "En cola"
+        RUNNING = "RUNNING", "En ejecución"
+        SUCCEEDED = "SUCCEEDED", "Completado"
+        FAILED = "FAILED", "Fallido"
+
+    kind = models.CharField(max_length=64)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    # Parámetros del trabajo; "input" es el nombre de su archivo en jobs.inputs
+    payload = models.JSONField(default=dict, blank=True)
+
+    progress = models.FloatField(default=0.0)
+    message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    worker = models.CharField(max_length=100, blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name="jobs"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Solo las filas pendientes: el índice se mantiene pequeño aunque crezca el histórico
+            models.Index(fields=["run_after", "id"], name="jobs_job_queued_idx",
+                         condition=Q(status="QUEUED")),
+            models.Index(fields=["heartbeat_at"], name="jobs_job_running_idx",
+                         condition=Q(status="RUNNING")),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}#{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.Status.SUCCEEDED, self.Status.FAILED)
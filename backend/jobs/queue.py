@@ -0,0 +1,119 @@
+"""
+Cola de trabajos sobre PostgreSQL, sin broker.
+
+  enqueue()        inserta un Job QUEUED (visible al hacer commit); el archivo
+                   de entrada, si lo hay, va a jobs.inputs.
+  claim()          reclama hasta N trabajos con SELECT ... FOR UPDATE SKIP LOCKED:
+                   varios workers pueden consultar a la vez sin bloquearse ni
+                   repartirse el mismo trabajo.
+  heartbeat()      el worker marca sus trabajos en curso.
+  requeue_stale()  devuelve a la cola (o da por fallidos) los trabajos cuyo
+                   worker dejó de latir.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import inputs
+from .models import Job
+
+
+def enqueue(kind, payload=None, *, user=None, input=None, max_attempts=3):
+    """`input` (UploadedFile) se guarda en jobs.inputs y su nombre va en payload["input"]."""
+    if kind not in settings.JOB_HANDLERS:
+        raise ValueError(f"Tipo de trabajo desconocido: {kind}")
+    payload = dict(payload or {})
+    if input is not None:
+        payload["input"] = inputs.save(input)
+    try:
+        return Job.objects.create(
+            kind=kind,
+            payload=payload,
+            created_by=user if user is not None and user.is_authenticated else None,
+            max_attempts=max_attempts,
+        )
+    except Exception:
+        inputs.delete(payload.get("input"))
+        raise
+
+
+def claim(worker, limit):
+    """Marca como RUNNING hasta `limit` trabajos pendientes y devuelve sus ids."""
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.QUEUED, run_after__lte=now)
+            .order_by("run_after", "id")
+            .values_list("id", flat=True)[:limit]
+        )
+        if ids:
+            Job.objects.filter(pk__in=ids).update(
+                status=Job.Status.RUNNING,
+                worker=worker,
+                attempts=F("attempts") + 1,
+                started_at=now,
+                heartbeat_at=now,
+            )
+    return ids
+
+
+def heartbeat(job_ids):
+    if job_ids:
+        Job.objects.filter(pk__in=list(job_ids), status=Job.Status.RUNNING).update(heartbeat_at=timezone.now())
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(2 ** attempts, 300))
+
+
+def fail(job_id, error, retry=True):
+    """
+    Reintenta con espera exponencial si `retry` y quedan intentos; si no,
+    FAILED. retry=False para errores deterministas (ver jobs.runner).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = Job.objects.select_for_update().get(pk=job_id)
+        if retry and job.attempts < job.max_attempts:
+            job.status = Job.Status.QUEUED
+            job.run_after = now + retry_delay(job.attempts)
+            fields = ["status", "run_after", "error"]
+        else:
+            job.status = Job.Status.FAILED
+            job.finished_at = now
+            fields = ["status", "finished_at", "error"]
+        job.error = error
+        job.save(update_fields=fields)
+    if job.status == Job.Status.FAILED:
+        inputs.delete(job.payload.get("input"))
+    return job
+
+
+def succeed(job_id, result):
+    Job.objects.filter(pk=job_id).update(
+        status=Job.Status.SUCCEEDED,
+        result=result,
+        progress=1.0,
+        message="",
+        error="",
+        finished_at=timezone.now(),
+    )
+    payload = Job.objects.filter(pk=job_id).values_list("payload", flat=True).first()
+    inputs.delete((payload or {}).get("input"))
+
+
+def requeue_stale():
+    """Trabajos RUNNING sin latido en JOB_STALE_AFTER segundos (worker caído)."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_STALE_AFTER)
+    stale = Job.objects.filter(status=Job.Status.RUNNING, heartbeat_at__lt=cutoff).values_list("id", flat=True)
+    count = 0
+    for job_id in stale:
+        fail(job_id, "El worker dejó de responder.")
+        count += 1
+    return count
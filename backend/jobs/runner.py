@@ -0,0 +1,88 @@
+"""
+Ejecución de un trabajo dentro de un proceso del pool del worker.
+
+Cada tipo de trabajo se resuelve con settings.JOB_HANDLERS (ruta con puntos a
+una función `handler(job, progress)` que devuelve un dict serializable a JSON).
+`progress(fraction, message="")` actualiza la fila del Job como mucho cada
+JOB_PROGRESS_INTERVAL segundos, para que el endpoint de estado pueda mostrarlo.
+
+Solo se reintentan los errores transitorios (RETRYABLE_ERRORS); una
+validación o un archivo ilegible fallarían igual en cada intento.
+
+El módulo se importa en los hijos del pool antes de django.setup() (al
+deserializar el initializer), así que los modelos se importan dentro de las
+funciones.
+"""
+import logging
+import time
+import traceback
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, InterfaceError, OperationalError, close_old_connections, connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# BD o red caídas: el mismo trabajo puede salir bien más tarde
+RETRYABLE_ERRORS = (OperationalError, InterfaceError, ConnectionError, TimeoutError)
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+class Progress:
+    """
+    Escribe por una conexión propia en autocommit: el handler suele trabajar
+    dentro de una transacción (p.ej. una importación entera) y por su
+    conexión el progreso no sería visible hasta el commit final.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self._last = 0.0
+        self._conn = None
+
+    def __call__(self, fraction, message=""):
+        now = time.monotonic()
+        if now - self._last < settings.JOB_PROGRESS_INTERVAL and fraction < 1.0:
+            return
+        self._last = now
+        from .models import Job
+        if self._conn is None:
+            self._conn = connections.create_connection(DEFAULT_DB_ALIAS)
+        with self._conn.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE "{Job._meta.db_table}" SET progress = %s, message = %s, heartbeat_at = %s WHERE id = %s',
+                [max(0.0, min(1.0, float(fraction))), message[:255], timezone.now(), self.job_id],
+            )
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def execute(job_id):
+    """Punto de entrada en el proceso hijo. Devuelve el estado final."""
+    from . import queue
+    from .models import Job
+
+    close_old_connections()
+    progress = Progress(job_id)
+    try:
+        job = Job.objects.get(pk=job_id)
+        try:
+            handler = import_string(settings.JOB_HANDLERS[job.kind])
+            result = handler(job, progress)
+        except Exception as e:
+            logger.exception("Job %s (%s) falló", job_id, job.kind)
+            error = "".join(traceback.format_exception_only(type(e), e)).strip()
+            return queue.fail(job_id, error, retry=isinstance(e, RETRYABLE_ERRORS)).status
+        queue.succeed(job_id, result)
+        return Job.Status.SUCCEEDED
+    finally:
+        progress.close()
+        close_old_connections()
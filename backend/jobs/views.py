@@ -0,0 +1,37 @@
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from users.policies import RolePolicyPermission, role_allows
+from .models import Job
+from .serializers import JobSerializer
+
+
+def job_location(job):
+    return f"/api/jobs/{job.pk}"
+
+
+def accepted(job):
+    """Respuesta 202 estándar para las vistas que encolan trabajo."""
+    return Response(
+        {"job": job.pk, "status": job.status, "url": job_location(job)},
+        status=202,
+        headers={"Location": job_location(job)},
+    )
+
+
+class JobDetailView(APIView):
+    """
+    GET /api/jobs/<id>   -> estado, progreso y resultado de un trabajo.
+    Visible para quien lo encoló y para los roles con permiso "ver".
+    """
+    permission_classes = [RolePolicyPermission]
+
+    def get(self, request, pk):
+        job = (
+            Job.objects.defer("payload")
+            .filter(pk=pk)
+            .first()
+        )
+        if job is None or (job.created_by_id != request.user.pk and not role_allows(request.user.role, "ver")):
+            return Response({"detail": "Trabajo no encontrado."}, status=404)
+        return Response(JobSerializer(job).data, status=200)
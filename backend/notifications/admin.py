@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import OutboxEmail
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ("id","to","subject","status","attempts","created_at","sent_at")
+    list_filter = ("status",)
+    search_fields = ("to","dedup_key")
+    # El cuerpo puede llevar enlaces de restablecimiento de contraseña vigentes
+    exclude = ("body",)
+    readonly_fields = ("last_error",)
@@ -0,0 +1,42 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from notifications.outbox import send_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Envía los correos de la outbox por lotes, con una conexión SMTP por lote. "
+        "Se pueden lanzar varios procesos contra la misma BD."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=settings.OUTBOX_BATCH_SIZE,
+                            help="Correos por lote (y por conexión SMTP).")
+        parser.add_argument("--poll", type=float, default=settings.OUTBOX_POLL_INTERVAL,
+                            help="Segundos entre consultas cuando no hay pendientes.")
+        parser.add_argument("--once", action="store_true",
+                            help="Termina cuando no queden correos listos para enviar.")
+
+    def handle(self, *args, **opts):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        while not self.stopping:
+            close_old_connections()
+            sent, failed = send_batch(opts["batch"])
+            if sent or failed:
+                self.stdout.write(f"Lote: {sent} enviados, {failed} con error")
+            elif opts["once"]:
+                break
+            else:
+                time.sleep(opts["poll"])
+        self.stdout.write("Envío detenido")
+
+    def _stop(self, signum, frame):
+        self.stopping = True
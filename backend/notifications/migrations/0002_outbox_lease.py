@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='outboxemail',
+            name='notif_outbox_pending_idx',
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pendiente'), ('SENDING', 'Enviando'), ('SENT', 'Enviado'), ('FAILED', 'Fallido')], default='PENDING', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='outboxemail',
+            index=models.Index(condition=models.Q(('status__in', ['PENDING', 'SENDING'])), fields=['run_after', 'id'], name='notif_outbox_pending_idx'),
+        ),
+        # Los correos ya enviados o fallidos no conservan el cuerpo (enlaces de reset)
+        migrations.RunSQL(
+            "UPDATE notifications_outboxemail SET body = '' WHERE status IN ('SENT', 'FAILED')",
+            migrations.RunSQL.noop,
+        ),
+    ]
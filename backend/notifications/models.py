@@ -0,0 +1,43 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class OutboxEmail(models.Model):
+    """
+    Correo pendiente de envío. Las vistas solo insertan filas; el envío lo
+    hace manage.py send_outbox por lotes, con una conexión SMTP por lote.
+    """
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pendiente"
+        SENDING = "SENDING", "Enviando"
+        SENT = "SENT", "Enviado"
+        FAILED = "FAILED", "Fallido"
+
+    to = models.EmailField(max_length=254)
+    subject = models.CharField(max_length=255)
+    # Se vacía al terminar (SENT/FAILED): puede contener enlaces de reset vigentes
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    # Mismo dedup_key => un solo envío (p.ej. "schedule-published:<roster>:<usuario>")
+    dedup_key = models.CharField(max_length=200, null=True, blank=True, unique=True)
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # PENDING: no antes de esta hora. SENDING: fin del lease del emisor
+    run_after = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Solo las filas por enviar: el índice no crece con el histórico
+            models.Index(fields=["run_after", "id"], name="notif_outbox_pending_idx",
+                         condition=Q(status__in=["PENDING", "SENDING"])),
+        ]
+
+    def __str__(self):
+        return f"{self.to}: {self.subject} ({self.status})"
@@ -0,0 +1,119 @@
+"""
+Cola de correo saliente sobre PostgreSQL (tabla OutboxEmail), sin broker.
+
+  enqueue_email()  un INSERT: es lo único que hace el camino de la petición.
+  enqueue_many()   inserción por lotes (p.ej. al publicar un roster).
+  send_batch()     reclama hasta N correos pendientes (claim) y los envía por
+                   una sola conexión (get_connection() + send_messages). Los
+                   fallos se reintentan con espera exponencial hasta
+                   max_attempts.
+
+claim() marca los correos SENDING con un lease (run_after = ahora +
+OUTBOX_LEASE) en una transacción corta con FOR UPDATE SKIP LOCKED: el envío
+SMTP ocurre fuera de la transacción, sin retener bloqueos ni la conexión a
+la BD. Entrega "al menos una vez": si el proceso muere a mitad de lote, el
+lease caduca y esos correos se vuelven a reclamar. dedup_key evita encolar
+dos veces el mismo aviso (INSERT ... ON CONFLICT DO NOTHING).
+
+Al terminar (SENT o FAILED) se borra el cuerpo: puede llevar enlaces de
+restablecimiento de contraseña vigentes 24 h.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+def enqueue_email(to, subject, body, *, from_email="", dedup_key=None):
+    enqueue_many([OutboxEmail(to=to, subject=subject, body=body, from_email=from_email, dedup_key=dedup_key)])
+
+
+def enqueue_many(messages, batch_size=1000):
+    """Inserta los OutboxEmail dados; los que repiten un dedup_key existente se descartan."""
+    for message in messages:
+        message.max_attempts = settings.OUTBOX_MAX_ATTEMPTS
+    OutboxEmail.objects.bulk_create(messages, batch_size=batch_size, ignore_conflicts=True)
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(30 * 2 ** (attempts - 1), 3600))
+
+
+def _failed(message, error, now):
+    message.last_error = f"{type(error).__name__}: {error}"
+    if message.attempts < message.max_attempts:
+        message.status = OutboxEmail.Status.PENDING
+        message.run_after = now + retry_delay(message.attempts)
+    else:
+        message.status = OutboxEmail.Status.FAILED
+        message.body = ""
+
+
+def claim(limit):
+    """
+    Marca SENDING (con lease) hasta `limit` correos listos: pendientes o con
+    el lease caducado. Cuenta el intento al reclamar, como jobs.queue.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # Lease caducado sin intentos restantes: el emisor murió en el último
+        OutboxEmail.objects.filter(
+            status=OutboxEmail.Status.SENDING, run_after__lte=now, attempts__gte=F("max_attempts")
+        ).update(status=OutboxEmail.Status.FAILED, body="", last_error="El envío no terminó (lease caducado).")
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=OutboxEmail.Status.PENDING) | Q(status=OutboxEmail.Status.SENDING), run_after__lte=now)
+            .order_by("run_after", "id")[:limit]
+        )
+        for message in batch:
+            message.status = OutboxEmail.Status.SENDING
+            message.attempts += 1
+            message.run_after = now + timedelta(seconds=settings.OUTBOX_LEASE)
+        OutboxEmail.objects.bulk_update(batch, ["status", "attempts", "run_after"])
+    return batch
+
+
+def send_batch(limit, connection=None):
+    """Envía hasta `limit` correos pendientes. Devuelve (enviados, fallidos)."""
+    batch = claim(limit)
+    if not batch:
+        return 0, 0
+
+    # Fuera de transacción: hasta `limit` x EMAIL_TIMEOUT de E/S SMTP
+    connection = connection or get_connection(fail_silently=False)
+    now = timezone.now()
+    sent = 0
+    try:
+        connection.open()
+    except Exception as e:
+        # Sin conexión (SMTP caído): todo el lote se reintenta más tarde
+        for message in batch:
+            _failed(message, e, now)
+    else:
+        try:
+            for message in batch:
+                email = EmailMessage(
+                    message.subject, message.body,
+                    message.from_email or settings.DEFAULT_FROM_EMAIL, [message.to],
+                    connection=connection,
+                )
+                try:
+                    connection.send_messages([email])
+                except Exception as e:
+                    _failed(message, e, now)
+                else:
+                    message.status = OutboxEmail.Status.SENT
+                    message.sent_at = timezone.now()
+                    message.last_error = ""
+                    message.body = ""
+                    sent += 1
+        finally:
+            connection.close()
+
+    OutboxEmail.objects.bulk_update(batch, ["status", "body", "last_error", "run_after", "sent_at"])
+    return sent, len(batch) - sent
@@ -0,0 +1,52 @@
+from django.contrib import admin
+from django.db import transaction
+from .models import Site, Position, Shift
+from . import changes, rollups
+
+@admin.register(Site)
+class SiteAdmin(admin.ModelAdmin):
+    list_display = ("id","name","address","is_active")
+    search_fields = ("name",)
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if change and {"name", "address"} & set(form.changed_data):
+                changes.feed_details_changed(site_id=obj.pk)
+
+@admin.register(Position)
+class PositionAdmin(admin.ModelAdmin):
+    list_display = ("id","name","site")
+    list_filter = ("site",)
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if change and "name" in form.changed_data:
+                changes.feed_details_changed(position_id=obj.pk)
+
+@admin.register(Shift)
+class ShiftAdmin(admin.ModelAdmin):
+    list_display = ("id","site","position","assignee","period","status")
+    list_filter = ("site","status")
+    raw_id_fields = ("assignee",)
+
+    # Las ediciones desde el admin también mantienen LaborRollup y los feeds
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            before = [rollups.facts(s) for s in changes.lock_shifts([obj.pk])] if change else []
+            super().save_model(request, obj, form, change)
+            changes.shifts_changed(before=before, after=[rollups.facts(obj)])
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            locked = changes.lock_shifts([obj.pk])
+            changes.shifts_changed(before=[rollups.facts(s) for s in locked])
+            if locked:
+                super().delete_model(request, locked[0])
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            locked = changes.lock_shifts(queryset.values("pk"))
+            changes.shifts_changed(before=[rollups.facts(s) for s in locked])
+            super().delete_queryset(request, Shift.objects.filter(pk__in=[s.pk for s in locked]))
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class SchedulingConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'scheduling'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import pre_delete
+
+        from .changes import on_user_pre_delete
+
+        # Borrar un usuario pasa por scheduling.changes (agregados y estado de sus turnos)
+        pre_delete.connect(on_user_pre_delete, sender=get_user_model(), dispatch_uid="scheduling.unassign_user")
@@ -0,0 +1,300 @@
+"""
+Disponibilidad de empleados como bitmaps semanales.
+
+Las reglas recurrentes (AvailabilityRule) de cada usuario se materializan en
+WeeklyAvailability: 672 franjas de 15 minutos (lunes 00:00 .. domingo 24:00,
+hora local) empaquetadas en 84 bytes. Cada proceso mantiene una matriz NumPy
+(empleados x 84 bytes) con los empleados activos, así que "¿quién puede
+trabajar el martes de 08:00 a 16:00?" es un AND vectorizado sobre todas las
+filas, no una evaluación de reglas por usuario.
+
+Las excepciones por fecha (AvailabilityException) son pocas y se aplican al
+consultar, leyendo solo las del rango de fechas pedido.
+
+Mantenimiento:
+  - rebuild(user_ids) recalcula los bitmaps de esos usuarios y, al hacer
+    commit, rota la versión en la caché de Django.
+  - AvailabilityIndex.refresh() recarga de forma incremental las filas
+    modificadas (updated_at de usuario o de bitmap) cuando cambia la versión
+    o han pasado AVAILABILITY_MAX_STALENESS segundos.
+  - users_deleted() (pre_delete de usuario, vía scheduling.changes) hace que
+    todos los procesos recarguen la matriz completa.
+"""
+import math
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import User
+from .models import AvailabilityException, AvailabilityRule, WeeklyAvailability
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES      # 96
+SLOTS_PER_WEEK = 7 * SLOTS_PER_DAY           # 672
+BITMAP_BYTES = SLOTS_PER_WEEK // 8           # 84
+FULL_BITMAP = np.packbits(np.ones(SLOTS_PER_WEEK, dtype=bool)).tobytes()
+
+_VERSION_KEY = "availability:v"
+# Rota al borrar usuarios: la sincronización incremental solo ve filas que
+# siguen existiendo, así que un borrado obliga a recargar la matriz completa.
+_RELOAD_KEY = "availability:reload"
+# Margen al pedir filas "modificadas desde": cubre transacciones que
+# hicieron commit después de la última sincronización con un updated_at anterior.
+_SYNC_MARGIN = timedelta(seconds=30)
+
+
+def _minutes(t):
+    return t.hour * 60 + t.minute + (t.second + t.microsecond / 1e6) / 60
+
+
+# ---------------------------------------------------------------- construcción
+
+def build_bitmaps(n_users, rules):
+    """
+    rules: iterable de (fila, weekday, start_time, end_time).
+    Devuelve una matriz (n_users, 84) uint8. Las franjas parciales no cuentan
+    (inicio redondeado hacia arriba, fin hacia abajo).
+    """
+    diff = np.zeros((n_users, SLOTS_PER_WEEK + 1), dtype=np.int16)
+    for row, weekday, start, end in rules:
+        a = math.ceil(_minutes(start) / SLOT_MINUTES)
+        b = SLOTS_PER_DAY if end.hour == end.minute == end.second == 0 else int(_minutes(end) // SLOT_MINUTES)
+        if b > a:
+            diff[row, weekday * SLOTS_PER_DAY + a] += 1
+            diff[row, weekday * SLOTS_PER_DAY + b] -= 1
+    bits = np.cumsum(diff[:, :-1], axis=1) > 0
+    return np.packbits(bits, axis=1)
+
+
+def rebuild(user_ids):
+    """Recalcula y guarda el bitmap semanal de los usuarios indicados."""
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return 0
+    row = {pk: i for i, pk in enumerate(user_ids)}
+    rules = AvailabilityRule.objects.filter(user_id__in=user_ids).values_list(
+        "user_id", "weekday", "start_time", "end_time"
+    )
+    with_rules = set()
+    entries = []
+    for user_id, weekday, start, end in rules.iterator(chunk_size=5000):
+        with_rules.add(user_id)
+        entries.append((row[user_id], weekday, start, end))
+    bits = build_bitmaps(len(user_ids), entries)
+
+    objs = [
+        WeeklyAvailability(user_id=pk, bitmap=bits[i].tobytes() if pk in with_rules else FULL_BITMAP)
+        for i, pk in enumerate(user_ids)
+    ]
+    WeeklyAvailability.objects.bulk_create(
+        objs, batch_size=2000,
+        update_conflicts=True, unique_fields=["user"], update_fields=["bitmap", "updated_at"],
+    )
+    transaction.on_commit(invalidate)
+    return len(objs)
+
+
+def invalidate():
+    cache.set(_VERSION_KEY, secrets.token_hex(8), None)
+
+
+def users_deleted():
+    """Llamar dentro de la transacción que borra usuarios."""
+    transaction.on_commit(lambda: cache.set(_RELOAD_KEY, secrets.token_hex(8), None))
+
+
+# ---------------------------------------------------------------- ventanas
+
+def slot_window(start, end):
+    """(primera franja, nº de franjas) que cubren [start, end) en hora local."""
+    start = timezone.localtime(start)
+    first = start.weekday() * SLOTS_PER_DAY + int(_minutes(start) // SLOT_MINUTES)
+    offset = _minutes(start) % SLOT_MINUTES
+    count = math.ceil((offset + (end - start).total_seconds() / 60) / SLOT_MINUTES)
+    return first, min(count, SLOTS_PER_WEEK)
+
+
+@lru_cache(maxsize=4096)
+def window_mask(first, count):
+    """Bitmap empaquetado (84,) con las franjas [first, first + count) módulo semana."""
+    bits = np.zeros(SLOTS_PER_WEEK, dtype=bool)
+    bits[np.arange(first, first + count) % SLOTS_PER_WEEK] = True
+    return np.packbits(bits)
+
+
+def _covers(bits, need):
+    return np.all((bits & need) == need, axis=1)
+
+
+def _exception_bounds(exc, tz):
+    day = datetime.combine(exc.date, datetime.min.time(), tzinfo=tz)
+    if exc.start_time is None or exc.end_time is None:
+        return day, day + timedelta(days=1)
+    start = datetime.combine(exc.date, exc.start_time, tzinfo=tz)
+    end = datetime.combine(exc.date, exc.end_time, tzinfo=tz)
+    return start, end if end > start else end + timedelta(days=1)
+
+
+def _exceptions(user_ids, start, end):
+    """Excepciones que pueden tocar [start, end), con sus límites como datetime."""
+    tz = timezone.get_current_timezone()
+    first_day = timezone.localtime(start).date() - timedelta(days=1)
+    last_day = timezone.localtime(end).date()
+    qs = AvailabilityException.objects.filter(date__range=(first_day, last_day))
+    if user_ids is not None:
+        qs = qs.filter(user_id__in=user_ids)
+    for exc in qs.only("user_id", "date", "start_time", "end_time", "available"):
+        exc_start, exc_end = _exception_bounds(exc, tz)
+        if exc_start < end and exc_end > start:
+            yield exc.user_id, exc_start, exc_end, exc.available
+
+
+# ---------------------------------------------------------------- índice
+
+_EMPTY = (
+    np.empty(0, dtype=np.int64),
+    np.empty((0, BITMAP_BYTES), dtype=np.uint8),
+    np.empty(0, dtype=bool),
+    {},
+)
+
+
+class AvailabilityIndex:
+    """
+    Matriz de bitmaps de los empleados activos de este proceso.
+
+    (user_ids, bits, alive, row) se publican juntos en `snapshot`: los
+    lectores nunca ven una matriz a medio actualizar. `row` (id -> fila) solo
+    crece entre recargas completas; cada recarga publica uno nuevo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.snapshot = _EMPTY
+        self._synced_at = None
+        self._checked_at = 0.0
+        self._version = None
+        self._reload = None
+
+    def __len__(self):
+        return int(self.snapshot[2].sum())
+
+    def refresh(self, force=False):
+        keys = cache.get_many([_VERSION_KEY, _RELOAD_KEY])
+        version, reload = keys.get(_VERSION_KEY), keys.get(_RELOAD_KEY)
+        fresh = time.monotonic() - self._checked_at < settings.AVAILABILITY_MAX_STALENESS
+        if (
+            not force and self._synced_at is not None
+            and version == self._version and reload == self._reload and fresh
+        ):
+            return
+        with self._lock:
+            now = timezone.now()
+            if self._synced_at is None or reload != self._reload:
+                self._load_rows(User.objects.filter(
+                    role=User.Role.EMPLEADO, status=User.Status.ACTIVE, is_active=True
+                ), full=True)
+            else:
+                since = self._synced_at - _SYNC_MARGIN
+                changed = set(User.objects.filter(updated_at__gte=since).values_list("id", flat=True))
+                changed.update(
+                    WeeklyAvailability.objects.filter(updated_at__gte=since).values_list("user_id", flat=True)
+                )
+                if changed:
+                    self._load_rows(User.objects.filter(pk__in=changed))
+            self._synced_at = now
+            self._checked_at = time.monotonic()
+            self._version = version
+            self._reload = reload
+
+    def _load_rows(self, users, full=False):
+        ids, bits, alive, row = _EMPTY if full else self.snapshot
+        bits, alive = bits.copy(), alive.copy()
+        if full:
+            row = {}
+        new_ids, new_bits = [], []
+        rows = users.values_list("id", "role", "status", "is_active", "weekly_availability__bitmap")
+        for pk, role, status, is_active, bitmap in rows.iterator(chunk_size=5000):
+            is_employee = role == User.Role.EMPLEADO and status == User.Status.ACTIVE and is_active
+            packed = np.frombuffer(bitmap if bitmap is not None else FULL_BITMAP, dtype=np.uint8)
+            i = row.get(pk)
+            if i is not None:
+                bits[i] = packed
+                alive[i] = is_employee
+            elif is_employee:
+                row[pk] = len(ids) + len(new_ids)
+                new_ids.append(pk)
+                new_bits.append(packed)
+        if new_ids:
+            ids = np.concatenate([ids, np.array(new_ids, dtype=np.int64)])
+            bits = np.vstack([bits, np.array(new_bits, dtype=np.uint8)])
+            alive = np.concatenate([alive, np.ones(len(new_ids), dtype=bool)])
+        self.snapshot = (ids, bits, alive, row)
+
+    def free(self, start, end):
+        """Ids de los empleados activos disponibles en todo [start, end)."""
+        ids, bits, alive, row = self.snapshot
+        ok = alive & _covers(bits, window_mask(*slot_window(start, end)))
+        for user_id, exc_start, exc_end, available in _exceptions(None, start, end):
+            i = row.get(user_id)
+            if i is None or i >= len(ids) or not alive[i]:
+                continue
+            if not available:
+                ok[i] = False
+            elif exc_start <= start and exc_end >= end:
+                ok[i] = True
+        return ids[ok]
+
+    def eligibility(self, user_ids, starts, ends):
+        """
+        Matriz (E, S) bool: el empleado user_ids[e] está disponible durante el
+        turno s ([starts[s], ends[s]) en segundos epoch). Los turnos con la
+        misma ventana semanal se evalúan una sola vez.
+        """
+        ids, all_bits, _, row = self.snapshot
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        rows = np.array([row.get(int(pk), -1) for pk in user_ids], dtype=np.int64)
+        known = (rows >= 0) & (rows < len(ids))
+        # Sin fila en el índice (p.ej. recién creado): sin restricciones
+        bits = np.full((len(user_ids), BITMAP_BYTES), 0xFF, dtype=np.uint8)
+        bits[known] = all_bits[rows[known]]
+        out = np.ones((len(user_ids), len(starts)), dtype=bool)
+        if not len(starts) or not len(user_ids):
+            return out
+
+        tz = timezone.get_current_timezone()
+        groups = {}
+        for s, (st, en) in enumerate(zip(starts, ends)):
+            window = slot_window(datetime.fromtimestamp(st, tz), datetime.fromtimestamp(en, tz))
+            groups.setdefault(window, []).append(s)
+        for window, cols in groups.items():
+            out[:, cols] = _covers(bits, window_mask(*window))[:, None]
+
+        position = {int(pk): e for e, pk in enumerate(user_ids)}
+        window_start = datetime.fromtimestamp(float(np.min(starts)), tz)
+        window_end = datetime.fromtimestamp(float(np.max(ends)), tz)
+        for user_id, exc_start, exc_end, available in _exceptions(list(position), window_start, window_end):
+            e = position[user_id]
+            a, b = exc_start.timestamp(), exc_end.timestamp()
+            if available:
+                out[e, (starts >= a) & (ends <= b)] = True
+            else:
+                out[e, (starts < b) & (ends > a)] = False
+        return out
+
+
+_index = AvailabilityIndex()
+
+
+def get_index():
+    """Índice del proceso, sincronizado con la BD."""
+    _index.refresh()
+    return _index
@@ -0,0 +1,66 @@
+"""
+Punto único a llamar, dentro de la transacción, tras escribir turnos:
+mantiene LaborRollup y sube la versión del feed de los empleados afectados.
+Los ShiftFacts previos se leen de lock_shifts(), nunca de una instancia sin bloquear.
+feed_details_changed() hace lo propio con los feeds tras editar una sede o
+un puesto.
+"""
+from django.utils import timezone
+
+from . import availability, feeds, rollups
+from .models import Shift
+
+
+def shifts_changed(before=(), after=()):
+    """before / after: ShiftFacts (rollups.facts) de los turnos afectados."""
+    before, after = list(before), list(after)
+    rollups.apply(before=before, after=after)
+    feeds.bump({f.user_id for f in before + after if f is not None and f.user_id is not None})
+
+
+def lock_shifts(pks):
+    """
+    Turnos `pks` bloqueados con SELECT ... FOR UPDATE (en orden de id), para
+    calcular dentro de la transacción los ShiftFacts previos a editar o
+    borrar: dos escrituras concurrentes sobre el mismo turno no descuentan
+    de LaborRollup los mismos valores antiguos. Los ya borrados no aparecen.
+    """
+    return list(Shift.objects.select_for_update().filter(pk__in=pks).order_by("pk"))
+
+
+def feed_details_changed(site_id=None, position_id=None):
+    """Sube la versión de los feeds con turnos (en su ventana) de la sede o el puesto editado."""
+    start, end = feeds.window()
+    qs = (
+        Shift.objects.filter(assignee__isnull=False, period__overlap=(start, end))
+        .exclude(status=Shift.Status.CANCELLED)
+    )
+    qs = qs.filter(site_id=site_id) if site_id is not None else qs.filter(position_id=position_id)
+    feeds.bump(set(qs.values_list("assignee_id", flat=True).distinct()))
+
+
+def unassign_user(user_id):
+    """
+    Deja abiertos (OPEN, sin empleado) los turnos vigentes de `user_id`
+    antes de borrarlo. El SET_NULL de Shift.assignee lo haría en la BD sin
+    pasar por los agregados y dejaría turnos ASSIGNED sin empleado.
+    """
+    shifts = list(
+        Shift.objects.select_for_update()
+        .filter(assignee_id=user_id)
+        .exclude(status=Shift.Status.CANCELLED)
+    )
+    if not shifts:
+        return 0
+    before = [rollups.facts(s) for s in shifts]
+    Shift.objects.filter(pk__in=[s.pk for s in shifts]).update(
+        assignee=None, status=Shift.Status.OPEN, updated_at=timezone.now()
+    )
+    # Sin feeds.bump(): el feed del usuario se borra con él
+    rollups.apply(before=before, after=[f._replace(user_id=None, status=Shift.Status.OPEN) for f in before])
+    return len(shifts)
+
+
+def on_user_pre_delete(sender, instance, **kwargs):
+    unassign_user(instance.pk)
+    availability.users_deleted()
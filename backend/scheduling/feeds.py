@@ -0,0 +1,210 @@
+"""
+Feeds de turnos por empleado (iCalendar y CSV).
+
+  - bump(user_ids) sube ScheduleFeed.version en la misma transacción que la
+    escritura de turnos (ver scheduling.changes).
+  - etag() se calcula con la versión, el día (la ventana del feed avanza a
+    diario) y el nombre del calendario (nombre del empleado); un GET
+    condicional que coincide se responde 304 sin leer turnos. Renombrar una
+    sede o un puesto sube la versión de los feeds que la muestran
+    (scheduling.changes.feed_details_changed).
+  - version() y token_owner() se guardan en la caché compartida durante
+    FEED_MAX_AGE segundos (lo mismo que pueden cachear los clientes); bump()
+    y rotate_token() las borran al hacer commit.
+  - ics_stream() / csv_stream() son generadores sobre una única consulta por
+    rango (índice GiST (assignee, period) de la restricción de exclusión).
+"""
+import csv
+import secrets
+import zlib
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.http import parse_etags
+
+from core import metrics
+
+from users.models import User
+from .models import ScheduleFeed, Shift
+
+ICS = "ics"
+CSV = "csv"
+CONTENT_TYPES = {ICS: "text/calendar; charset=utf-8", CSV: "text/csv; charset=utf-8"}
+
+_VERSION_KEY = "feed:v:{}"
+_TOKEN_KEY = "feed:t:{}"
+
+_FIELDS = ("id", "period", "status", "updated_at", "site__name", "site__address", "position__name")
+
+
+def new_token():
+    return secrets.token_urlsafe(32)
+
+
+def bump(user_ids):
+    user_ids = sorted(user_ids)
+    if not user_ids:
+        return
+    table = ScheduleFeed._meta.db_table
+    values = ", ".join(["(%s, 1, %s)"] * len(user_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (user_id, version, token) VALUES {values}
+            ON CONFLICT (user_id) DO UPDATE SET version = {table}.version + 1
+            RETURNING token
+            """,
+            [v for pk in user_ids for v in (pk, new_token())],
+        )
+        tokens = [token for (token,) in cursor.fetchall()]
+    keys = [_VERSION_KEY.format(pk) for pk in user_ids] + [_TOKEN_KEY.format(t) for t in tokens]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def version(user_id):
+    """Versión vigente del feed de `user_id` (0 si nunca tuvo turnos)."""
+    key = _VERSION_KEY.format(user_id)
+    value = cache.get(key)
+    metrics.cache_lookup("feed_version", "miss" if value is None else "hit")
+    if value is None:
+        value = ScheduleFeed.objects.filter(pk=user_id).values_list("version", flat=True).first() or 0
+        cache.set(key, value, settings.FEED_MAX_AGE)
+    return value
+
+
+def token_owner(token):
+    """(user_id, versión, nombre, apellido) del feed con `token`, o None."""
+    key = _TOKEN_KEY.format(token)
+    row = cache.get(key)
+    metrics.cache_lookup("feed_token", "miss" if row is None else "hit")
+    if row is None:
+        row = (
+            ScheduleFeed.objects.filter(token=token, user__is_active=True, user__status=User.Status.ACTIVE)
+            .values_list("user_id", "version", "user__first_name", "user__last_name")
+            .first()
+        ) or ()
+        cache.set(key, tuple(row), settings.FEED_MAX_AGE)
+    return tuple(row) or None
+
+
+def get_or_create_feed(user):
+    feed, _ = ScheduleFeed.objects.get_or_create(user=user, defaults={"token": new_token()})
+    return feed
+
+
+def rotate_token(user):
+    feed = get_or_create_feed(user)
+    old_key = _TOKEN_KEY.format(feed.token)
+    feed.token = new_token()
+    feed.save(update_fields=["token"])
+    transaction.on_commit(lambda: cache.delete(old_key))
+    return feed
+
+
+def etag(user_id, version, fmt, calendar_name=""):
+    name = zlib.crc32(calendar_name.encode()) if calendar_name else 0
+    return f'"{user_id}-{version}-{timezone.localdate():%Y%m%d}-{name:08x}-{fmt}"'
+
+
+def not_modified(request, tag):
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    tags = parse_etags(header)
+    return "*" in tags or tag in tags
+
+
+def window():
+    now = timezone.now()
+    return now - timedelta(days=settings.FEED_PAST_DAYS), now + timedelta(days=settings.FEED_FUTURE_DAYS)
+
+
+def shift_rows(user_id):
+    start, end = window()
+    return (
+        Shift.objects.filter(assignee_id=user_id, period__overlap=(start, end))
+        .exclude(status=Shift.Status.CANCELLED)
+        .order_by("period")
+        .values_list(*_FIELDS)
+        .iterator(chunk_size=500)
+    )
+
+
+# ---------------------------------------------------------------- iCalendar
+
+def _ics_text(value):
+    return (
+        str(value).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _ics_time(dt):
+    return dt.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _fold(line):
+    """RFC 5545 §3.1: líneas de hasta 75 octetos, continuación con espacio."""
+    raw = line.encode()
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts, chunk = [], b""
+    for ch in line:
+        b = ch.encode()
+        if len(chunk) + len(b) > (75 if not parts else 74):
+            parts.append(chunk.decode())
+            chunk = b""
+        chunk += b
+    parts.append(chunk.decode())
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def ics_stream(user_id, calendar_name):
+    yield "".join(_fold(line) for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Shift Scheduler//Turnos//ES",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_ics_text(calendar_name)}",
+    ))
+    domain = settings.FEED_UID_DOMAIN
+    for pk, period, status, updated_at, site, address, position in shift_rows(user_id):
+        summary = f"{position} · {site}" if position else f"Turno · {site}"
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:shift-{pk}@{domain}",
+            f"DTSTAMP:{_ics_time(updated_at)}",
+            f"LAST-MODIFIED:{_ics_time(updated_at)}",
+            f"DTSTART:{_ics_time(period.lower)}",
+            f"DTEND:{_ics_time(period.upper)}",
+            f"SUMMARY:{_ics_text(summary)}",
+            f"STATUS:{'CONFIRMED' if status == Shift.Status.CONFIRMED else 'TENTATIVE'}",
+        ]
+        if address:
+            lines.append(f"LOCATION:{_ics_text(address)}")
+        lines.append("END:VEVENT")
+        yield "".join(_fold(line) for line in lines)
+    yield "END:VCALENDAR\r\n"
+
+
+# ---------------------------------------------------------------- CSV
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_stream(user_id, calendar_name=None):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(["id", "start", "end", "site", "position", "status"])
+    for pk, period, status, _updated, site, _address, position in shift_rows(user_id):
+        yield writer.writerow([
+            pk, period.lower.isoformat(), period.upper.isoformat(), site, position or "", status,
+        ])
+
+
+STREAMERS = {ICS: ics_stream, CSV: csv_stream}
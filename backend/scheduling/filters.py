@@ -0,0 +1,97 @@
+import base64
+import json
+
+from django.contrib.postgres.fields.ranges import RangeStartsWith
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Shift
+
+
+def _int(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} debe ser un entero.") from None
+
+
+def _datetime(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        dt = parse_datetime(value)
+    except ValueError:
+        dt = None
+    if dt is None:
+        raise ValueError(f"{name} debe ser una fecha ISO 8601.")
+    return timezone.make_aware(dt) if timezone.is_naive(dt) else dt
+
+
+def filter_by_site(queryset, params):
+    """?site=<id> (puestos, cuadrantes). Lanza ValueError si no es un entero."""
+    site = _int(params, "site")
+    return queryset if site is None else queryset.filter(site_id=site)
+
+
+def filter_shifts(queryset, params):
+    """
+    Aplica los filtros del listado de turnos:
+      ?site=<id>  ?assignee=<id>  ?status=OPEN|ASSIGNED|CONFIRMED|CANCELLED
+      ?start=&end=<ISO 8601>  (turnos que se solapan con la ventana)
+    Lanza ValueError si algún parámetro no es válido.
+    """
+    for field in ("site", "assignee"):
+        value = _int(params, field)
+        if value is not None:
+            queryset = queryset.filter(**{f"{field}_id": value})
+
+    status = params.get("status")
+    if status:
+        queryset = queryset.filter(status=status)
+
+    start, end = _datetime(params, "start"), _datetime(params, "end")
+    if start and end:
+        queryset = queryset.filter(period__overlap=(start, end))
+    return queryset
+
+
+def order_shifts(queryset):
+    """Orden del keyset: (inicio, id), el del índice scheduling_shift_start_id."""
+    return queryset.annotate(start_at=RangeStartsWith("period")).order_by("start_at", "id")
+
+
+def encode_cursor(start, pk):
+    raw = json.dumps([start.isoformat(), pk], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Devuelve (inicio, id) o lanza ValueError si el cursor no es válido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        start, pk = json.loads(raw)
+        start = parse_datetime(start)
+    except Exception as e:
+        raise ValueError("Cursor inválido.") from e
+    if start is None or not isinstance(pk, int):
+        raise ValueError("Cursor inválido.")
+    return start, pk
+
+
+def after_cursor(queryset, cursor):
+    """Keyset: turnos estrictamente posteriores a (inicio, id) del cursor."""
+    start, pk = decode_cursor(cursor)
+    table = Shift._meta.db_table
+    return queryset.filter(
+        RawSQL(
+            f'(lower("{table}"."period"), "{table}"."id") > (%s, %s)',
+            (start, pk),
+            output_field=BooleanField(),
+        )
+    )
@@ -0,0 +1,28 @@
+"""
+Detección de solapes en memoria para lotes de turnos.
+
+Barrido ordenado por inicio con un heap de finales activos: O(n log n + k),
+siendo k el número de pares en conflicto. Los intervalos son semiabiertos
+[inicio, fin), igual que los tstzrange de Shift.period.
+"""
+import heapq
+from itertools import groupby
+from operator import itemgetter
+
+
+def find_overlaps(intervals):
+    """
+    intervals: iterable de (clave, inicio, fin, ident). Solo se comparan los
+    intervalos con la misma clave (p.ej. el empleado asignado).
+    Devuelve la lista de pares (ident_a, ident_b) que se solapan.
+    """
+    conflicts = []
+    ordered = sorted(intervals, key=itemgetter(0, 1))
+    for _, group in groupby(ordered, key=itemgetter(0)):
+        active = []  # heap de (fin, orden, ident)
+        for order, (_, start, end, ident) in enumerate(group):
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+            conflicts.extend((other, ident) for _, _, other in active)
+            heapq.heappush(active, (end, order, ident))
+    return conflicts
@@ -0,0 +1,134 @@
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from scheduling.availability import AvailabilityIndex, rebuild
+from scheduling.models import AvailabilityRule
+from users.models import User
+
+BENCH_DOMAIN = "bench-availability.shift-scheduler.local"
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la consulta de personal disponible con bitmaps frente a evaluar las "
+        "reglas usuario a usuario. Inserta empleados y reglas sintéticos en una "
+        "transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=10000)
+        parser.add_argument("--queries", type=int, default=500, help="Ventanas aleatorias a consultar.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **o):
+        rng = np.random.default_rng(o["seed"])
+        with transaction.atomic():
+            ids = self._insert(o["employees"])
+            n_rules = AvailabilityRule.objects.filter(user_id__in=ids).count()
+            self.stdout.write(f"datos           {len(ids)} empleados, {n_rules} reglas")
+
+            t0 = time.perf_counter()
+            rebuild(ids)
+            self._line("rebuild total", t0)
+
+            t0 = time.perf_counter()
+            rebuild(ids[:1])
+            self._line("rebuild 1 user", t0)
+
+            index = AvailabilityIndex()
+            t0 = time.perf_counter()
+            index.refresh(force=True)
+            self._line("carga índice", t0, f"{len(index)} filas, {index.snapshot[1].nbytes / 1024:.0f} KiB")
+
+            windows = self._windows(rng, o["queries"])
+            bench_ids = np.array(ids)
+            bitmap_us, free_counts = [], []
+            for start, end in windows:
+                t0 = time.perf_counter()
+                free = index.free(start, end)
+                bitmap_us.append((time.perf_counter() - t0) * 1e6)
+                free_counts.append(int(np.isin(free, bench_ids).sum()))
+
+            rules = {}
+            for user_id, weekday, st, et in AvailabilityRule.objects.filter(user_id__in=ids).values_list(
+                "user_id", "weekday", "start_time", "end_time"
+            ):
+                rules.setdefault(user_id, []).append((weekday, st, et))
+            naive_us, mismatches = [], 0
+            for (start, end), expected in zip(windows[:50], free_counts):
+                t0 = time.perf_counter()
+                got = sum(1 for pk in ids if self._naive_free(rules.get(pk, ()), start, end))
+                naive_us.append((time.perf_counter() - t0) * 1e6)
+                mismatches += got != expected
+
+            self.stdout.write(
+                f"consulta libre  bitmap p50 {statistics.median(bitmap_us):.0f} µs, "
+                f"p95 {np.percentile(bitmap_us, 95):.0f} µs | reglas p50 {statistics.median(naive_us):.0f} µs "
+                f"(x{statistics.median(naive_us) / statistics.median(bitmap_us):.0f}), "
+                f"{mismatches} discrepancias"
+            )
+
+            starts = np.array([s.timestamp() for s, _ in windows])
+            ends = np.array([e.timestamp() for _, e in windows])
+            t0 = time.perf_counter()
+            matrix = index.eligibility(np.array(ids[:500]), starts, ends)
+            self._line("elegibilidad", t0, f"matriz {matrix.shape[0]}x{matrix.shape[1]}")
+            transaction.set_rollback(True)
+
+    def _line(self, label, t0, extra=""):
+        self.stdout.write(f"{label:<15} {(time.perf_counter() - t0) * 1000:.1f} ms {extra}".rstrip())
+
+    def _insert(self, n):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO users_user (password, is_superuser, is_staff, is_active, date_joined, updated_at,
+                                        email, first_name, last_name, role, status, perms_mask)
+                SELECT %s, false, false, true, now(), now(),
+                       'avail' || g || '@{BENCH_DOMAIN}', 'Bench', 'Avail' || g,
+                       'EMPLEADO', 'ACTIVE', 0
+                FROM generate_series(1, %s) AS g
+                """,
+                [make_password(None), n],
+            )
+            # 5-6 días por empleado, turnos de mañana/tarde con horas variadas
+            cursor.execute(
+                f"""
+                INSERT INTO scheduling_availabilityrule (user_id, weekday, start_time, end_time)
+                SELECT u.id, d, make_time((6 + (u.id + d) % 6)::int, ((u.id * d) % 4 * 15)::int, 0),
+                       make_time((14 + (u.id * (d + 1)) % 9)::int, 0, 0)
+                FROM users_user u CROSS JOIN generate_series(0, 6) AS d
+                WHERE u.email LIKE '%@{BENCH_DOMAIN}' AND (u.id + d) % 7 <> 0 AND (u.id * 3 + d) % 11 <> 0
+                """
+            )
+        return list(User.objects.filter(email__endswith=BENCH_DOMAIN).order_by("id").values_list("id", flat=True))
+
+    @staticmethod
+    def _windows(rng, n):
+        tz = timezone.get_current_timezone()
+        monday = datetime(2026, 1, 5, tzinfo=tz)
+        out = []
+        for _ in range(n):
+            start = monday + timedelta(days=int(rng.integers(7)), minutes=15 * int(rng.integers(24, 64)))
+            out.append((start, start + timedelta(hours=int(rng.choice([4, 6, 8])))))
+        return out
+
+    @staticmethod
+    def _naive_free(rules, start, end):
+        """Evaluación directa de reglas (ventana dentro de un mismo día)."""
+        if not rules:
+            return True
+        start, end = timezone.localtime(start), timezone.localtime(end)
+        if start.date() != end.date():
+            return False
+        for weekday, st, et in rules:
+            if weekday == start.weekday() and st <= start.time() and (et >= end.time() or et.hour == et.minute == 0):
+                return True
+        return False
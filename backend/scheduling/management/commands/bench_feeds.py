@@ -0,0 +1,91 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from scheduling import feeds
+from scheduling.models import Shift, Site
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga sobre los feeds de turnos en este proceso (un worker): peticiones/s "
+        "y latencia de me.ics y del feed por token, con respuesta completa y con 304. "
+        "Los datos se crean en una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shifts", type=int, default=60, help="Turnos del empleado en la ventana.")
+        parser.add_argument("--seconds", type=float, default=3.0, help="Duración de cada escenario.")
+
+    def handle(self, *args, **o):
+        with transaction.atomic():
+            user, token = self._fixture(o["shifts"])
+            client = Client()
+            auth = {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(user).access_token}"}
+            feed_url = f"/api/schedules/feed/{token}.ics"
+
+            first = client.get("/api/schedules/me.ics", **auth)
+            body = b"".join(first.streaming_content)
+            etag = first["ETag"]
+            self.stdout.write(f"feed            {o['shifts']} turnos, {len(body)} bytes, ETag {etag}")
+
+            scenarios = [
+                ("me.ics 200", "/api/schedules/me.ics", auth),
+                ("me.ics 304", "/api/schedules/me.ics", {**auth, "HTTP_IF_NONE_MATCH": etag}),
+                ("token 200", feed_url, {}),
+                ("token 304", feed_url, {"HTTP_IF_NONE_MATCH": etag}),
+            ]
+            self.stdout.write(f"{'escenario':<15} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'consultas':>10}")
+            for label, url, headers in scenarios:
+                # request_started vacía connection.queries: se cuentan con un execute_wrapper
+                queries = []
+                with connection.execute_wrapper(lambda execute, sql, *a: queries.append(sql) or execute(sql, *a)):
+                    self._request(client, url, headers)
+                if label.endswith("304"):
+                    assert not any("scheduling_shift" in sql for sql in queries), label
+                samples = self._run(client, url, headers, o["seconds"])
+                self.stdout.write(
+                    f"{label:<15} {len(samples) / sum(samples):>8.0f} {statistics.median(samples) * 1000:>8.2f} "
+                    f"{sorted(samples)[int(len(samples) * 0.95)] * 1000:>8.2f} {len(queries):>10}"
+                )
+            transaction.set_rollback(True)
+
+    def _fixture(self, n_shifts):
+        user = User.objects.create_user(
+            email="bench-feed@shift-scheduler.local", password=None,
+            first_name="Bench", last_name="Feed", role=User.Role.EMPLEADO,
+        )
+        site = Site.objects.create(name="Bench feed", address="Calle Mayor 1, Madrid")
+        start = timezone.now().replace(hour=8, minute=0, second=0, microsecond=0)
+        Shift.objects.bulk_create(
+            Shift(site=site, assignee=user, status=Shift.Status.ASSIGNED,
+                  period=DateTimeTZRange(start + timedelta(days=d), start + timedelta(days=d, hours=8), "[)"))
+            for d in range(n_shifts)
+        )
+        feeds.bump([user.pk])
+        return user, feeds.get_or_create_feed(user).token
+
+    @staticmethod
+    def _request(client, url, headers):
+        response = client.get(url, **headers)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        assert response.status_code in (200, 304), response.status_code
+        return response
+
+    def _run(self, client, url, headers, seconds):
+        samples = []
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            self._request(client, url, headers)
+            samples.append(time.perf_counter() - t0)
+        return samples
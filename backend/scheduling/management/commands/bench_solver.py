@@ -0,0 +1,55 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from scheduling.solver import RosterProblem, solve
+
+HOUR = 3600
+
+
+def synthetic_problem(n_emp, n_shifts, weeks, density, seed):
+    """Turnos de 4/6/8 h repartidos en `weeks` semanas, elegibilidad aleatoria."""
+    rng = np.random.default_rng(seed)
+    start = rng.integers(0, weeks * 7 * 24, n_shifts).astype(np.float64) * HOUR
+    end = start + rng.choice([4, 6, 8], n_shifts) * HOUR
+    return RosterProblem(
+        start=start,
+        end=end,
+        week=(start // (7 * 24 * HOUR)).astype(np.int64),
+        eligible=rng.random((n_emp, n_shifts)) < density,
+        max_week_hours=np.full(n_emp, 40.0),
+        base_hours=np.zeros((n_emp, weeks)),
+    )
+
+
+class Command(BaseCommand):
+    help = "Mide tiempo de resolución y calidad del generador de rosters con datos sintéticos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=500)
+        parser.add_argument("--shifts", type=int, default=5000)
+        parser.add_argument("--weeks", type=int, default=4)
+        parser.add_argument("--density", type=float, default=0.6, help="Fracción de pares elegibles.")
+        parser.add_argument("--budget", type=float, default=5.0, help="Segundos de búsqueda local.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **o):
+        t0 = time.perf_counter()
+        problem = synthetic_problem(o["employees"], o["shifts"], o["weeks"], o["density"], o["seed"])
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        solution = solve(problem, time_budget=o["budget"], seed=o["seed"])
+        st = solution.stats
+        total_hours = problem.hours.sum()
+        filled_hours = problem.hours[solution.assignment >= 0].sum()
+
+        self.stdout.write(f"problema        {o['employees']} empleados x {o['shifts']} turnos "
+                          f"({build_ms:.0f} ms en construir matrices)")
+        self.stdout.write(f"greedy          {st['greedy_ms']:.0f} ms, sin cubrir {st['greedy_unfilled']}, "
+                          f"objetivo {st['greedy_objective']:.0f}")
+        self.stdout.write(f"búsqueda local  {st['search_ms']:.0f} ms, {st['iterations']} iteraciones, "
+                          f"{st['improvements']} mejoras")
+        self.stdout.write(f"final           sin cubrir {solution.unfilled}, objetivo {solution.objective:.0f}, "
+                          f"horas cubiertas {100 * filled_hours / total_hours:.1f}%, "
+                          f"desviación de horas/empleado {st['hours_std']:.2f}")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from scheduling.rollups import drift, rebuild
+
+
+class Command(BaseCommand):
+    help = "Recalcula LaborRollup desde los turnos, o con --check solo informa de desviaciones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true",
+                            help="No modifica nada; termina con error si hay desviaciones.")
+
+    def handle(self, *args, **opts):
+        if opts["check"]:
+            rows = drift()
+            for user_id, site_id, week, exp_min, got_min, exp_n, got_n in rows[:50]:
+                self.stdout.write(
+                    f"user={user_id} site={site_id} week={week}: "
+                    f"minutos {got_min} (esperado {exp_min}), turnos {got_n} (esperado {exp_n})"
+                )
+            if rows:
+                raise CommandError(f"{len(rows)} filas de LaborRollup desviadas.")
+            self.stdout.write("LaborRollup coincide con los turnos.")
+            return
+
+        with transaction.atomic():
+            count = rebuild()
+        self.stdout.write(f"LaborRollup reconstruida: {count} filas.")
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:09
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import BtreeGistExtension
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Necesaria para combinar '=' (assignee, site) y '&&' (period) en GiST
+        BtreeGistExtension(),
+        migrations.CreateModel(
+            name='Site',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('address', models.CharField(blank=True, max_length=255)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Position',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('site', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='positions', to='scheduling.site')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Shift',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', django.contrib.postgres.fields.ranges.DateTimeRangeField()),
+                ('status', models.CharField(choices=[('OPEN', 'Abierto'), ('ASSIGNED', 'Asignado'), ('CONFIRMED', 'Confirmado'), ('CANCELLED', 'Cancelado')], default='OPEN', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('assignee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='shifts', to=settings.AUTH_USER_MODEL)),
+                ('position', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='shifts', to='scheduling.position')),
+                ('site', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='shifts', to='scheduling.site')),
+            ],
+            options={
+                'indexes': [django.contrib.postgres.indexes.GistIndex(fields=['site', 'period'], name='scheduling_shift_site_period')],
+                'constraints': [django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('assignee__isnull', False), models.Q(('status', 'CANCELLED'), _negated=True)), expressions=[('assignee', '='), ('period', '&&')], name='scheduling_shift_no_double_booking'), models.CheckConstraint(condition=models.Q(('period__isempty', False), ('period__lower_inf', False), ('period__upper_inf', False)), name='scheduling_shift_period_bounded')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='position',
+            constraint=models.UniqueConstraint(fields=('site', 'name'), name='scheduling_position_site_name_uniq'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Copia congelada de scheduling.rollups.REBUILD_SQL
+POPULATE_SQL = """
+    INSERT INTO scheduling_laborrollup (user_id, site_id, week, minutes, shifts, updated_at)
+    SELECT assignee_id, site_id, week, sum(floor(extract(epoch FROM b - a) / 60))::int, count(*)::int, now()
+    FROM (
+        SELECT s.assignee_id, s.site_id, wk::date AS week,
+               greatest(lower(s.period), wk AT TIME ZONE %(tz)s) AS a,
+               least(upper(s.period), (wk + interval '7 days') AT TIME ZONE %(tz)s) AS b
+        FROM scheduling_shift s,
+             generate_series(date_trunc('week', lower(s.period) AT TIME ZONE %(tz)s),
+                             upper(s.period) AT TIME ZONE %(tz)s, interval '7 days') AS wk
+        WHERE s.status <> 'CANCELLED'
+    ) w
+    WHERE b > a
+    GROUP BY 1, 2, 3
+"""
+
+
+def populate(apps, schema_editor):
+    schema_editor.execute(POPULATE_SQL, {"tz": settings.TIME_ZONE})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0003_availability'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LaborRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField()),
+                ('minutes', models.IntegerField(default=0)),
+                ('shifts', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('site', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='scheduling.site')),
+                ('user', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['site', 'week'], name='scheduling_rollup_site_week')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'week', 'site'), name='scheduling_laborrollup_key', nulls_distinct=False)],
+            },
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
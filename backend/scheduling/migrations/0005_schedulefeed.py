@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0004_laborrollup'),
+        ('users', '0008_user_perms_mask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleFeed',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='schedule_feed', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('version', models.BigIntegerField(default=1)),
+                ('token', models.CharField(max_length=64, unique=True)),
+            ],
+        ),
+    ]
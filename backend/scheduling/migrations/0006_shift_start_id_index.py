@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:30
+
+import django.contrib.postgres.fields.ranges
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no puede correr dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('scheduling', '0005_schedulefeed'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='shift',
+            index=models.Index(django.contrib.postgres.fields.ranges.RangeStartsWith('period'), models.F('id'), name='scheduling_shift_start_id'),
+        ),
+    ]
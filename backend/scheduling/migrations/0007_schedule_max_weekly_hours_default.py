@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:40
+
+import scheduling.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0006_shift_start_id_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='schedule',
+            name='max_weekly_hours',
+            field=models.PositiveSmallIntegerField(default=scheduling.models.default_max_weekly_hours),
+        ),
+    ]
@@ -0,0 +1,213 @@
+from django.conf import settings
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
+from django.contrib.postgres.fields.ranges import RangeStartsWith
+from django.contrib.postgres.indexes import GistIndex
+from django.core.validators import MaxValueValidator
+from django.db import models
+
+
+class Site(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    address = models.CharField(max_length=255, blank=True)
+    is_active = models.BooleanField(default=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Position(models.Model):
+    site = models.ForeignKey(Site, on_delete=models.CASCADE, related_name="positions")
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["site", "name"], name="scheduling_position_site_name_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.site})"
+
+
+def default_max_weekly_hours():
+    # Mismo límite que aplican los turnos manuales (scheduling.rollups)
+    return settings.MAX_WEEKLY_HOURS
+
+
+class Schedule(models.Model):
+    """Roster de una sede para un periodo [start_date, end_date]."""
+
+    class Status(models.TextChoices):
+        DRAFT = "DRAFT", "Borrador"
+        PUBLISHED = "PUBLISHED", "Publicado"
+
+    site = models.ForeignKey(Site, on_delete=models.CASCADE, related_name="schedules")
+    start_date = models.DateField()
+    end_date = models.DateField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.DRAFT)
+    max_weekly_hours = models.PositiveSmallIntegerField(default=default_max_weekly_hours)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end_date__gte=models.F("start_date")),
+                name="scheduling_schedule_dates_ordered",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.site} {self.start_date}–{self.end_date}"
+
+
+class Shift(models.Model):
+    class Status(models.TextChoices):
+        OPEN = "OPEN", "Abierto"
+        ASSIGNED = "ASSIGNED", "Asignado"
+        CONFIRMED = "CONFIRMED", "Confirmado"
+        CANCELLED = "CANCELLED", "Cancelado"
+
+    site = models.ForeignKey(Site, on_delete=models.PROTECT, related_name="shifts")
+    position = models.ForeignKey(Position, on_delete=models.PROTECT, null=True, blank=True, related_name="shifts")
+    assignee = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="shifts"
+    )
+    period = DateTimeRangeField()  # tstzrange [inicio, fin)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.OPEN)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Un empleado no puede tener dos turnos vigentes que se solapen.
+            # El índice GiST (assignee, period) que crea también responde
+            # "¿qué turnos tiene X entre T1 y T2?".
+            ExclusionConstraint(
+                name="scheduling_shift_no_double_booking",
+                expressions=[
+                    ("assignee", RangeOperators.EQUAL),
+                    ("period", RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(assignee__isnull=False) & ~models.Q(status="CANCELLED"),
+            ),
+            models.CheckConstraint(
+                condition=models.Q(period__isempty=False)
+                & models.Q(period__lower_inf=False)
+                & models.Q(period__upper_inf=False),
+                name="scheduling_shift_period_bounded",
+            ),
+        ]
+        indexes = [
+            # "¿Quién trabaja entre T1 y T2 en la sede S?"
+            GistIndex(fields=["site", "period"], name="scheduling_shift_site_period"),
+            # Keyset del listado de turnos: ORDER BY lower(period), id
+            models.Index(RangeStartsWith("period"), "id", name="scheduling_shift_start_id"),
+        ]
+
+    @property
+    def start(self):
+        return self.period.lower if self.period else None
+
+    @property
+    def end(self):
+        return self.period.upper if self.period else None
+
+    def __str__(self):
+        return f"{self.site} {self.start:%Y-%m-%d %H:%M}–{self.end:%H:%M} ({self.status})"
+
+
+class AvailabilityRule(models.Model):
+    """
+    Franja semanal recurrente en la que el empleado puede trabajar.
+    end_time = 00:00 significa "hasta medianoche". Un empleado sin reglas se
+    considera disponible toda la semana.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="availability_rules")
+    weekday = models.PositiveSmallIntegerField(validators=[MaxValueValidator(6)])  # 0 = lunes
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    class Meta:
+        ordering = ("weekday", "start_time")
+        constraints = [
+            models.CheckConstraint(condition=models.Q(weekday__lte=6), name="scheduling_availabilityrule_weekday"),
+        ]
+
+
+class AvailabilityException(models.Model):
+    """
+    Excepción para una fecha concreta (vacaciones, cita médica, día extra).
+    Sin horas cubre el día completo.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="availability_exceptions"
+    )
+    date = models.DateField()
+    start_time = models.TimeField(null=True, blank=True)
+    end_time = models.TimeField(null=True, blank=True)
+    available = models.BooleanField(default=False)
+    reason = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ("date", "start_time")
+        indexes = [
+            # Las consultas de disponibilidad buscan por rango de fechas para todos los empleados
+            models.Index(fields=["date", "user"], name="scheduling_availexc_date_user"),
+        ]
+
+
+class WeeklyAvailability(models.Model):
+    """
+    Reglas semanales de un usuario materializadas como bitmap: 7 días x 96
+    franjas de 15 minutos = 672 bits (84 bytes). Ver scheduling.availability.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="weekly_availability"
+    )
+    bitmap = models.BinaryField(max_length=84)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+
+class LaborRollup(models.Model):
+    """
+    Minutos de turnos no cancelados por (empleado, semana, sede). user NULL
+    acumula los turnos abiertos de la sede (cobertura). La semana es el lunes
+    en hora local. Se mantiene por deltas en las escrituras de turnos (ver
+    scheduling.rollups); manage.py rebuild_rollups la recalcula.
+    """
+    # Sin índice propio: lo cubre el prefijo de la restricción única
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, related_name="+", db_index=False
+    )
+    site = models.ForeignKey(Site, on_delete=models.CASCADE, related_name="+")
+    week = models.DateField()
+    minutes = models.IntegerField(default=0)
+    shifts = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # También sirve la consulta del límite de horas: (user, week) es su prefijo
+            models.UniqueConstraint(
+                fields=["user", "week", "site"], name="scheduling_laborrollup_key", nulls_distinct=False
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["site", "week"], name="scheduling_rollup_site_week"),
+        ]
+
+
+class ScheduleFeed(models.Model):
+    """
+    Estado del feed de calendario de un empleado: `version` sube con cada
+    escritura que toca sus turnos (ETag) y `token` autentica la URL pública
+    que se suscribe desde el calendario del móvil.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="schedule_feed"
+    )
+    version = models.BigIntegerField(default=1)
+    token = models.CharField(max_length=64, unique=True)
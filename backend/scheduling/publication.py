@@ -0,0 +1,42 @@
+"""
+Avisos por correo al publicar un roster.
+
+Se encola un correo por empleado con turnos en el periodo (un INSERT por
+lote de 1000 en la outbox); el envío es asíncrono (manage.py send_outbox).
+El dedup_key por roster y empleado evita avisar dos veces si el roster se
+despublica y se vuelve a publicar.
+"""
+from django.db.models import Count
+
+from notifications.models import OutboxEmail
+from notifications.outbox import enqueue_many
+from .models import Shift
+from .roster import schedule_window
+
+
+def notify_published(schedule):
+    start, end = schedule_window(schedule)
+    rows = (
+        Shift.objects.filter(site_id=schedule.site_id, period__overlap=(start, end), assignee__isnull=False)
+        .exclude(status=Shift.Status.CANCELLED)
+        .values("assignee_id", "assignee__email", "assignee__first_name")
+        .annotate(shifts=Count("id"))
+        .order_by("assignee_id")
+    )
+    subject = f"Roster publicado – {schedule.site.name}"
+    messages = [
+        OutboxEmail(
+            to=row["assignee__email"],
+            subject=subject,
+            body=(
+                f"Hola {row['assignee__first_name']},\n\n"
+                f"Se publicó el roster de {schedule.site.name} del {schedule.start_date:%d/%m/%Y} "
+                f"al {schedule.end_date:%d/%m/%Y}. Tienes {row['shifts']} turno(s) asignado(s).\n\n"
+                "Consulta el detalle en la aplicación o en tu calendario suscrito."
+            ),
+            dedup_key=f"schedule-published:{schedule.pk}:{row['assignee_id']}",
+        )
+        for row in rows.iterator(chunk_size=2000)
+    ]
+    enqueue_many(messages)
+    return len(messages)
@@ -0,0 +1,10 @@
+from rest_framework.renderers import JSONRenderer
+
+
+class ICalendarRenderer(JSONRenderer):
+    """
+    Acepta clientes de calendario (Accept: text/calendar) en vistas que
+    responden con StreamingHttpResponse. Los errores se renderizan en JSON.
+    """
+    media_type = "text/calendar"
+    format = "ics"
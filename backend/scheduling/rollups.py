@@ -0,0 +1,179 @@
+"""
+Agregados de horas por (empleado, semana, sede) en LaborRollup.
+
+Cada escritura de turnos llama a apply() (vía scheduling.changes) dentro de
+su transacción con el estado anterior y posterior de los turnos afectados;
+solo se aplican las
+diferencias con INSERT ... ON CONFLICT DO UPDATE (incremento atómico, sin
+recalcular sumas). Un turno que cruza el lunes a medianoche reparte sus
+minutos entre las dos semanas.
+
+REBUILD_SQL calcula los mismos valores desde scheduling_shift y sirve para
+reconstruir la tabla o detectar desviaciones (manage.py rebuild_rollups).
+"""
+from collections import defaultdict, namedtuple
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import LaborRollup, Shift
+
+WEEK = timedelta(days=7)
+
+# Lo que importa de un turno para los agregados
+ShiftFacts = namedtuple("ShiftFacts", "user_id site_id period status")
+
+
+def facts(shift):
+    return ShiftFacts(shift.assignee_id, shift.site_id, shift.period, shift.status)
+
+
+def week_start(dt):
+    local = timezone.localtime(dt)
+    return local.date() - timedelta(days=local.weekday())
+
+
+def split_by_week(start, end):
+    """[(lunes, minutos)] de [start, end) cortando en el lunes 00:00 local."""
+    tz = timezone.get_current_timezone()
+    out = []
+    current = start
+    while current < end:
+        monday = week_start(current)
+        stop = min(end, datetime.combine(monday + WEEK, time.min, tzinfo=tz))
+        out.append((monday, int((stop - current).total_seconds() // 60)))
+        current = stop
+    return out
+
+
+def contributions(f):
+    """((user_id, site_id, semana), minutos) que aporta un turno."""
+    if f is None or f.status == Shift.Status.CANCELLED or not f.period:
+        return
+    for week, minutes in split_by_week(f.period.lower, f.period.upper):
+        yield (f.user_id, f.site_id, week), minutes
+
+
+def apply(before=(), after=()):
+    """Aplica la diferencia entre `before` y `after` (iterables de ShiftFacts)."""
+    delta = defaultdict(lambda: [0, 0])
+    for sign, items in ((-1, before), (1, after)):
+        for f in items:
+            for key, minutes in contributions(f):
+                delta[key][0] += sign * minutes
+                delta[key][1] += sign
+    rows = [(*key, m, n) for key, (m, n) in delta.items() if m or n]
+    if not rows:
+        return 0
+
+    table = LaborRollup._meta.db_table
+    values = ", ".join(["(%s, %s, %s, %s, %s, now())"] * len(rows))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (user_id, site_id, week, minutes, shifts, updated_at)
+            VALUES {values}
+            ON CONFLICT (user_id, week, site_id) DO UPDATE SET
+                minutes = {table}.minutes + EXCLUDED.minutes,
+                shifts = {table}.shifts + EXCLUDED.shifts,
+                updated_at = EXCLUDED.updated_at
+            """,
+            [v for row in rows for v in row],
+        )
+    return len(rows)
+
+
+def weekly_minutes(user_ids, weeks):
+    """{(user_id, semana): minutos en todas las sedes}. Lee por el prefijo (user, week)."""
+    rows = (
+        LaborRollup.objects.filter(user_id__in=user_ids, week__in=weeks)
+        .values("user_id", "week")
+        .annotate(total=Sum("minutes"))
+    )
+    return {(r["user_id"], r["week"]): r["total"] for r in rows}
+
+
+def hour_limit_errors(proposed, replaced=()):
+    """
+    Semanas en las que algún empleado superaría MAX_WEEKLY_HOURS.
+    proposed: ShiftFacts nuevos; replaced: su estado anterior (si es una
+    modificación) para no contar dos veces el mismo turno.
+    Devuelve [(user_id, semana, minutos resultantes)].
+    """
+    delta = defaultdict(int)
+    for sign, items in ((1, proposed), (-1, replaced)):
+        for f in items:
+            if f is None or f.user_id is None:
+                continue
+            for (user_id, _site, week), minutes in contributions(f):
+                delta[(user_id, week)] += sign * minutes
+    if not delta:
+        return []
+    current = weekly_minutes({u for u, _ in delta}, {w for _, w in delta})
+    limit = settings.MAX_WEEKLY_HOURS * 60
+    return sorted(
+        (user_id, week, current.get((user_id, week), 0) + minutes)
+        for (user_id, week), minutes in delta.items()
+        if minutes > 0 and current.get((user_id, week), 0) + minutes > limit
+    )
+
+
+REBUILD_SQL = """
+    WITH s AS (
+        SELECT assignee_id, site_id, lower(period) AS a, upper(period) AS b
+        FROM scheduling_shift
+        WHERE status <> 'CANCELLED'
+    ), w AS (
+        SELECT s.assignee_id, s.site_id, wk::date AS week,
+               greatest(s.a, wk AT TIME ZONE %(tz)s) AS a,
+               least(s.b, (wk + interval '7 days') AT TIME ZONE %(tz)s) AS b
+        FROM s, generate_series(date_trunc('week', s.a AT TIME ZONE %(tz)s),
+                                s.b AT TIME ZONE %(tz)s, interval '7 days') AS wk
+    )
+    SELECT assignee_id AS user_id, site_id, week,
+           sum(floor(extract(epoch FROM b - a) / 60))::int AS minutes, count(*)::int AS shifts
+    FROM w
+    WHERE b > a
+    GROUP BY 1, 2, 3
+"""
+
+
+def drift():
+    """Filas en las que la tabla no coincide con lo calculado desde los turnos."""
+    table = LaborRollup._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH expected AS ({REBUILD_SQL}),
+                 stored AS (SELECT * FROM {table} WHERE minutes <> 0 OR shifts <> 0)
+            SELECT coalesce(e.user_id, r.user_id), coalesce(e.site_id, r.site_id), coalesce(e.week, r.week),
+                   e.minutes, r.minutes, e.shifts, r.shifts
+            FROM expected e
+            FULL JOIN stored r
+              ON e.user_id IS NOT DISTINCT FROM r.user_id AND e.site_id = r.site_id AND e.week = r.week
+            WHERE e.minutes IS DISTINCT FROM r.minutes OR e.shifts IS DISTINCT FROM r.shifts
+            ORDER BY 3, 2, 1
+            """,
+            {"tz": settings.TIME_ZONE},
+        )
+        return cursor.fetchall()
+
+
+def rebuild():
+    """Recalcula la tabla completa. Llamar dentro de una transacción."""
+    table = LaborRollup._meta.db_table
+    with connection.cursor() as cursor:
+        # Bloquea escrituras de turnos mientras se recalcula (las lecturas siguen)
+        cursor.execute("LOCK TABLE scheduling_shift IN SHARE MODE")
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (user_id, site_id, week, minutes, shifts, updated_at)
+            SELECT user_id, site_id, week, minutes, shifts, now() FROM ({REBUILD_SQL}) AS expected
+            """,
+            {"tz": settings.TIME_ZONE},
+        )
+        return cursor.rowcount
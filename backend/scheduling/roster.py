@@ -0,0 +1,163 @@
+"""
+Puente entre la BD y scheduling.solver: construye las matrices del problema
+para un Schedule y aplica la asignación resultante.
+"""
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import User
+from . import changes, rollups
+from .availability import get_index
+from .models import Schedule, Shift
+from .solver import RosterProblem, solve
+
+WEEK_SECONDS = 7 * 24 * 3600
+
+
+def schedule_window(schedule):
+    tz = timezone.get_current_timezone()
+    start = datetime.combine(schedule.start_date, time.min, tzinfo=tz)
+    end = datetime.combine(schedule.end_date + timedelta(days=1), time.min, tzinfo=tz)
+    return start, end
+
+
+def active_employees():
+    return User.objects.filter(
+        role=User.Role.EMPLEADO, status=User.Status.ACTIVE, is_active=True
+    )
+
+
+def build_problem(schedule):
+    """Devuelve (RosterProblem, ids de turnos, ids de empleados)."""
+    window_start, window_end = schedule_window(schedule)
+    monday = (window_start - timedelta(days=window_start.weekday())).timestamp()
+    n_weeks = int((window_end.timestamp() - monday) // WEEK_SECONDS) + 1
+
+    open_shifts = list(
+        Shift.objects.filter(
+            site=schedule.site,
+            status=Shift.Status.OPEN,
+            assignee__isnull=True,
+            period__contained_by=(window_start, window_end),
+        ).values_list("id", "period")
+    )
+    shift_ids = np.array([pk for pk, _ in open_shifts], dtype=np.int64)
+    start = np.array([p.lower.timestamp() for _, p in open_shifts], dtype=np.float64)
+    end = np.array([p.upper.timestamp() for _, p in open_shifts], dtype=np.float64)
+    week = ((start - monday) // WEEK_SECONDS).astype(np.int64)
+
+    employee_ids = np.fromiter(
+        active_employees().order_by("id").values_list("id", flat=True), dtype=np.int64
+    )
+    index = {pk: i for i, pk in enumerate(employee_ids.tolist())}
+    n_emp, n_shifts = len(employee_ids), len(shift_ids)
+
+    eligible = np.ones((n_emp, n_shifts), dtype=bool)
+    base_hours = np.zeros((n_emp, n_weeks), dtype=np.float64)
+
+    # Horas ya asignadas en cada semana (todas las sedes, también fuera del
+    # periodo), leídas de LaborRollup.
+    first_week = (window_start - timedelta(days=window_start.weekday())).date()
+    weeks = [first_week + timedelta(weeks=w) for w in range(n_weeks)]
+    # Las consultas siguientes vuelven a evaluar active_employees(): se ignoran
+    # los empleados activados o creados después de leer employee_ids.
+    for (user_id, wk), minutes in rollups.weekly_minutes(active_employees().values("id"), weeks).items():
+        if user_id in index:
+            base_hours[index[user_id], (wk - first_week).days // 7] += minutes / 60.0
+
+    # Turnos ya asignados en el periodo (cualquier sede): bloquean los turnos
+    # abiertos con los que se solapan.
+    busy = (
+        Shift.objects.filter(assignee__in=active_employees(), period__overlap=(window_start, window_end))
+        .exclude(status=Shift.Status.CANCELLED)
+        .values_list("assignee_id", "period")
+    )
+    for assignee_id, period in busy.iterator(chunk_size=2000):
+        if assignee_id not in index:
+            continue
+        b_start, b_end = period.lower.timestamp(), period.upper.timestamp()
+        eligible[index[assignee_id]] &= ~((start < b_end) & (end > b_start))
+
+    # Reglas semanales y excepciones de disponibilidad (scheduling.availability)
+    eligible &= get_index().eligibility(employee_ids, start, end)
+
+    problem = RosterProblem(
+        start=start,
+        end=end,
+        week=week,
+        eligible=eligible,
+        max_week_hours=np.full(n_emp, float(schedule.max_weekly_hours)),
+        base_hours=base_hours,
+    )
+    return problem, shift_ids, employee_ids
+
+
+def generate_roster(schedule, time_budget=None, dry_run=False, progress=None):
+    """
+    Resuelve el roster del Schedule y (salvo dry_run) guarda las asignaciones.
+    `progress(fraction, message)` es opcional (ver jobs.runner.Progress).
+    """
+    if time_budget is None:
+        time_budget = settings.ROSTER_TIME_BUDGET
+    report = progress or (lambda fraction, message="": None)
+
+    report(0.0, "Cargando turnos y empleados")
+    problem, shift_ids, employee_ids = build_problem(schedule)
+    report(0.1, "Buscando asignación")
+    solution = solve(
+        problem, time_budget=time_budget,
+        progress=lambda f: report(0.1 + 0.8 * f, "Buscando asignación"),
+    )
+
+    assigned = solution.assignment >= 0
+    plan = dict(zip(shift_ids[assigned].tolist(), employee_ids[solution.assignment[assigned]].tolist()))
+
+    applied = 0
+    if plan and not dry_run:
+        report(0.9, "Guardando asignaciones")
+        applied = apply_assignment(plan)
+
+    return {
+        "shifts": len(shift_ids),
+        "employees": len(employee_ids),
+        "assigned": len(plan),
+        "applied": applied,
+        "unfilled": solution.unfilled,
+        "objective": solution.objective,
+        **solution.stats,
+    }
+
+
+def generate_roster_job(job, progress):
+    """Handler de jobs para "roster.generate": payload {schedule, time_budget, dry_run}."""
+    schedule = Schedule.objects.select_related("site").get(pk=job.payload["schedule"])
+    return generate_roster(
+        schedule,
+        time_budget=job.payload.get("time_budget"),
+        dry_run=job.payload.get("dry_run", False),
+        progress=progress,
+    )
+
+
+def apply_assignment(plan):
+    """
+    plan: {shift_id: user_id}. Solo se escriben los turnos que sigan abiertos
+    (bloqueados con SELECT ... FOR UPDATE). Devuelve cuántos se asignaron.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        still_open = Shift.objects.select_for_update().filter(
+            pk__in=list(plan), status=Shift.Status.OPEN, assignee__isnull=True
+        ).values_list("id", "site_id", "period")
+        updates, before, after = [], [], []
+        for pk, site_id, period in still_open:
+            updates.append(Shift(pk=pk, assignee_id=plan[pk], status=Shift.Status.ASSIGNED, updated_at=now))
+            before.append(rollups.ShiftFacts(None, site_id, period, Shift.Status.OPEN))
+            after.append(rollups.ShiftFacts(plan[pk], site_id, period, Shift.Status.ASSIGNED))
+        Shift.objects.bulk_update(updates, ["assignee", "status", "updated_at"], batch_size=1000)
+        changes.shifts_changed(before=before, after=after)
+    return len(updates)
@@ -0,0 +1,209 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+
+from . import changes, rollups
+from .intervals import find_overlaps
+from .models import AvailabilityException, AvailabilityRule, Position, Schedule, Shift, Site
+
+DOUBLE_BOOKED = "El empleado ya tiene un turno que se solapa con ese horario."
+
+
+def hour_limit_message(week, minutes):
+    return (
+        f"Con este turno el empleado sumaría {minutes / 60:g} h la semana del {week:%d/%m/%Y} "
+        f"(máximo {settings.MAX_WEEKLY_HOURS} h)."
+    )
+
+
+class SiteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Site
+        fields = ("id", "name", "address", "is_active")
+
+
+class PositionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Position
+        fields = ("id", "site", "name")
+
+
+class ScheduleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Schedule
+        fields = ("id", "site", "start_date", "end_date", "status", "max_weekly_hours", "created_by", "created_at")
+        read_only_fields = ("id", "created_by", "created_at")
+
+    def validate_max_weekly_hours(self, value):
+        if value > settings.MAX_WEEKLY_HOURS:
+            raise serializers.ValidationError(f"No puede superar el máximo de {settings.MAX_WEEKLY_HOURS} h.")
+        return value
+
+    def validate(self, attrs):
+        start = attrs.get("start_date", self.instance.start_date if self.instance else None)
+        end = attrs.get("end_date", self.instance.end_date if self.instance else None)
+        if end < start:
+            raise serializers.ValidationError({"end_date": "La fecha final debe ser igual o posterior a la inicial."})
+        return attrs
+
+
+class GenerateRosterSerializer(serializers.Serializer):
+    time_budget = serializers.FloatField(required=False, min_value=0, max_value=60)
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+
+class AvailabilityRuleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AvailabilityRule
+        fields = ("weekday", "start_time", "end_time")
+
+    def validate(self, attrs):
+        end = attrs["end_time"]
+        # 00:00 como fin = hasta medianoche
+        if end <= attrs["start_time"] and (end.hour, end.minute, end.second) != (0, 0, 0):
+            raise serializers.ValidationError({"end_time": "El fin debe ser posterior al inicio."})
+        return attrs
+
+
+class WeeklyAvailabilitySerializer(serializers.Serializer):
+    """Reemplaza todas las reglas semanales de un usuario."""
+    rules = AvailabilityRuleSerializer(many=True)
+
+
+class AvailabilityExceptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AvailabilityException
+        fields = ("id", "date", "start_time", "end_time", "available", "reason")
+        read_only_fields = ("id",)
+
+    def validate(self, attrs):
+        start, end = attrs.get("start_time"), attrs.get("end_time")
+        if (start is None) != (end is None):
+            raise serializers.ValidationError({"end_time": "Indica inicio y fin, o ninguno para todo el día."})
+        if start is not None and end <= start and (end.hour, end.minute, end.second) != (0, 0, 0):
+            raise serializers.ValidationError({"end_time": "El fin debe ser posterior al inicio."})
+        return attrs
+
+
+class ShiftSerializer(serializers.ModelSerializer):
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
+    class Meta:
+        model = Shift
+        fields = ("id", "site", "position", "assignee", "start", "end", "status")
+        read_only_fields = ("id",)
+
+    def validate(self, attrs):
+        instance = self.instance
+        start = attrs.pop("start", instance.start if instance else None)
+        end = attrs.pop("end", instance.end if instance else None)
+        if start >= end:
+            raise serializers.ValidationError({"end": "El fin debe ser posterior al inicio."})
+        attrs["period"] = DateTimeTZRange(start, end, "[)")
+
+        site = attrs.get("site", instance.site if instance else None)
+        position = attrs.get("position", instance.position if instance else None)
+        if position is not None and position.site_id != site.pk:
+            raise serializers.ValidationError({"position": "El puesto no pertenece a la sede."})
+
+        assignee = attrs.get("assignee", instance.assignee if instance else None)
+        status = attrs.get("status", instance.status if instance else Shift.Status.OPEN)
+        if assignee is not None and status == Shift.Status.OPEN:
+            attrs["status"] = Shift.Status.ASSIGNED
+        elif assignee is None and status in (Shift.Status.ASSIGNED, Shift.Status.CONFIRMED):
+            raise serializers.ValidationError({"assignee": "Un turno asignado necesita empleado."})
+
+        # En lote el límite se comprueba sobre el conjunto (ShiftBatchSerializer)
+        if self.parent is None and assignee is not None:
+            proposed = rollups.ShiftFacts(assignee.pk, site.pk, attrs["period"], attrs.get("status", status))
+            over = rollups.hour_limit_errors([proposed], [rollups.facts(instance)] if instance else ())
+            if over:
+                _, week, minutes = over[0]
+                raise serializers.ValidationError({"assignee": hour_limit_message(week, minutes)})
+        return attrs
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                shift = super().create(validated_data)
+                changes.shifts_changed(after=[rollups.facts(shift)])
+                return shift
+        except IntegrityError:
+            raise serializers.ValidationError({"assignee": DOUBLE_BOOKED})
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                locked = changes.lock_shifts([instance.pk])
+                if not locked:
+                    raise NotFound("Turno no encontrado.")
+                before = rollups.facts(locked[0])
+                shift = super().update(locked[0], validated_data)
+                changes.shifts_changed(before=[before], after=[rollups.facts(shift)])
+                return shift
+        except IntegrityError:
+            raise serializers.ValidationError({"assignee": DOUBLE_BOOKED})
+
+
+class ShiftBatchSerializer(serializers.Serializer):
+    """
+    Alta de un lote de turnos (p.ej. el roster de una semana).
+
+    Antes de abrir la transacción se buscan solapes dentro del propio lote y
+    contra los turnos ya guardados de los mismos empleados, con un único
+    barrido O(n log n). La restricción de exclusión sigue siendo la garantía
+    final frente a escrituras concurrentes.
+    """
+    shifts = ShiftSerializer(many=True)
+
+    def validate_shifts(self, shifts):
+        proposed = [
+            (s["assignee"].pk, s["period"].lower, s["period"].upper, ("new", i))
+            for i, s in enumerate(shifts)
+            if s.get("assignee") is not None and s.get("status") != Shift.Status.CANCELLED
+        ]
+        if not proposed:
+            return shifts
+
+        window = (min(p[1] for p in proposed), max(p[2] for p in proposed))
+        existing = (
+            Shift.objects.filter(assignee__in={p[0] for p in proposed}, period__overlap=window)
+            .exclude(status=Shift.Status.CANCELLED)
+            .values_list("assignee_id", "period", "id")
+        )
+        stored = [(a, period.lower, period.upper, ("db", pk)) for a, period, pk in existing]
+
+        errors = []
+        for a, b in find_overlaps(proposed + stored):
+            if a[0] != "new":
+                a, b = b, a
+            if a[0] != "new":
+                continue  # solape entre turnos ya guardados: no es de este lote
+            other = {"index": b[1]} if b[0] == "new" else {"shift": b[1]}
+            errors.append({"index": a[1], "conflicts_with": other, "detail": DOUBLE_BOOKED})
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        over = rollups.hour_limit_errors(
+            rollups.ShiftFacts(s["assignee"].pk, s["site"].pk, s["period"], s.get("status"))
+            for s in shifts if s.get("assignee") is not None
+        )
+        if over:
+            raise serializers.ValidationError([
+                {"assignee": user_id, "detail": hour_limit_message(week, minutes)}
+                for user_id, week, minutes in over
+            ])
+        return shifts
+
+    def create(self, validated_data):
+        shifts = [Shift(**data) for data in validated_data["shifts"]]
+        try:
+            with transaction.atomic():
+                created = Shift.objects.bulk_create(shifts)
+                changes.shifts_changed(after=[rollups.facts(s) for s in created])
+                return created
+        except IntegrityError:
+            raise serializers.ValidationError({"shifts": DOUBLE_BOOKED})
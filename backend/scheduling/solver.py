@@ -0,0 +1,223 @@
+"""
+Motor de asignación de turnos abiertos a empleados.
+
+Trabaja solo con arrays de NumPy (ver scheduling.roster para construirlos
+desde la BD):
+
+  1. Greedy: recorre los turnos por hora de inicio y asigna cada uno al
+     empleado elegible, libre y con horas disponibles que menos aumenta el
+     desequilibrio de horas. Es una única pasada vectorizada sobre los empleados.
+  2. Búsqueda local con presupuesto de tiempo: intenta cubrir turnos que
+     quedaron sin asignar (moviendo, si hace falta, un turno que bloquea al
+     candidato) y reequilibra horas moviendo turnos de los empleados más
+     cargados a otros con menos horas.
+
+Objetivo a minimizar:
+    UNFILLED_PENALTY * sin_cubrir + FAIRNESS * sum_e(horas_e²)
+"""
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+UNFILLED_PENALTY = 1e6
+FAIRNESS = 1.0
+
+
+@dataclass
+class RosterProblem:
+    start: np.ndarray          # (S,) float64, segundos epoch
+    end: np.ndarray            # (S,) float64
+    week: np.ndarray           # (S,) int, índice de semana dentro del periodo
+    eligible: np.ndarray       # (E, S) bool
+    max_week_hours: np.ndarray  # (E,) float
+    base_hours: np.ndarray     # (E, W) horas ya asignadas fuera del problema
+
+    @property
+    def hours(self):
+        return (self.end - self.start) / 3600.0
+
+    @property
+    def shape(self):
+        return self.eligible.shape
+
+
+@dataclass
+class RosterSolution:
+    assignment: np.ndarray     # (S,) índice de empleado o -1
+    objective: float
+    unfilled: int
+    stats: dict = field(default_factory=dict)
+
+
+class _State:
+    """Estado mutable de una solución con comprobaciones de factibilidad O(k)."""
+
+    def __init__(self, problem):
+        self.p = problem
+        n_emp, n_shifts = problem.shape
+        self.dur = problem.hours
+        self.assignment = np.full(n_shifts, -1, dtype=np.int64)
+        self.week_hours = problem.base_hours.astype(np.float64).copy()
+        self.total_hours = self.week_hours.sum(axis=1)
+        self.by_emp = [[] for _ in range(n_emp)]
+
+    def fits(self, e, s, ignore=None):
+        p = self.p
+        if not p.eligible[e, s]:
+            return False
+        w = p.week[s]
+        extra = self.dur[ignore] if ignore is not None and p.week[ignore] == w else 0.0
+        if self.week_hours[e, w] - extra + self.dur[s] > p.max_week_hours[e] + 1e-9:
+            return False
+        return not self.blockers(e, s, ignore)
+
+    def blockers(self, e, s, ignore=None):
+        """Turnos de `e` que se solapan con `s` (excluyendo `ignore`)."""
+        p = self.p
+        return [
+            t for t in self.by_emp[e]
+            if t != ignore and p.start[t] < p.end[s] and p.end[t] > p.start[s]
+        ]
+
+    def assign(self, e, s):
+        self.assignment[s] = e
+        self.by_emp[e].append(s)
+        self.week_hours[e, self.p.week[s]] += self.dur[s]
+        self.total_hours[e] += self.dur[s]
+
+    def unassign(self, s):
+        e = self.assignment[s]
+        self.assignment[s] = -1
+        self.by_emp[e].remove(s)
+        self.week_hours[e, self.p.week[s]] -= self.dur[s]
+        self.total_hours[e] -= self.dur[s]
+        return e
+
+    def move_deltas(self, s, a, targets):
+        """Cambio del objetivo al mover `s` de `a` a cada empleado de `targets`."""
+        d = self.dur[s]
+        ha, hb = self.total_hours[a], self.total_hours[targets]
+        fair = ((hb + d) ** 2 - hb ** 2) + ((ha - d) ** 2 - ha ** 2)
+        return FAIRNESS * fair
+
+    def objective(self):
+        unfilled = int((self.assignment < 0).sum())
+        return float(UNFILLED_PENALTY * unfilled + FAIRNESS * (self.total_hours ** 2).sum())
+
+
+def greedy(problem, state=None):
+    state = state or _State(problem)
+    p = problem
+    busy_until = np.full(p.shape[0], -np.inf)
+    for s in np.argsort(p.start, kind="stable"):
+        w = p.week[s]
+        dur = state.dur[s]
+        ok = (
+            p.eligible[:, s]
+            & (busy_until <= p.start[s])
+            & (state.week_hours[:, w] + dur <= p.max_week_hours + 1e-9)
+        )
+        if not ok.any():
+            continue
+        score = FAIRNESS * (2 * state.total_hours * dur + dur * dur)
+        score = np.where(ok, score, np.inf)
+        e = int(np.argmin(score))
+        state.assign(e, s)
+        busy_until[e] = max(busy_until[e], p.end[s])
+    return state
+
+
+def _try_fill(state, s, rng):
+    """Cubre `s` directamente o liberando al candidato de un único turno que lo bloquea."""
+    p = state.p
+    candidates = np.nonzero(p.eligible[:, s])[0]
+    rng.shuffle(candidates)
+    for e in candidates:
+        if state.fits(e, s):
+            state.assign(e, s)
+            return True
+    for e in candidates[:32]:
+        blocking = state.blockers(e, s)
+        if len(blocking) != 1:
+            continue
+        t = blocking[0]
+        if not state.fits(e, s, ignore=t):
+            continue
+        for f in np.nonzero(p.eligible[:, t])[0]:
+            if f != e and state.fits(f, t):
+                state.unassign(t)
+                state.assign(f, t)
+                state.assign(e, s)
+                return True
+    return False
+
+
+def _try_rebalance(state, rng):
+    """Mueve un turno del empleado más cargado a quien mejore el objetivo."""
+    p = state.p
+    heavy = np.argsort(state.total_hours)[::-1][:16]
+    a = int(rng.choice(heavy))
+    if not state.by_emp[a]:
+        return False
+    s = state.by_emp[a][rng.integers(len(state.by_emp[a]))]
+    candidates = np.nonzero(p.eligible[:, s])[0]
+    deltas = state.move_deltas(s, a, candidates)
+    deltas[candidates == a] = np.inf
+    for i in np.argsort(deltas):
+        if deltas[i] >= 0:
+            return False
+        b = int(candidates[i])
+        if state.fits(b, s):
+            state.unassign(s)
+            state.assign(b, s)
+            return True
+    return False
+
+
+def solve(problem, time_budget=2.0, seed=0, progress=None):
+    """
+    Greedy + búsqueda local hasta agotar `time_budget` segundos.
+    `progress(fraction)` se llama periódicamente con la fracción consumida.
+    """
+    rng = np.random.default_rng(seed)
+    t0 = time.perf_counter()
+    state = greedy(problem)
+    greedy_ms = (time.perf_counter() - t0) * 1000
+    greedy_objective = state.objective()
+    greedy_unfilled = int((state.assignment < 0).sum())
+
+    deadline = t0 + time_budget
+    iterations = improvements = 0
+    stale = 0
+    while time.perf_counter() < deadline and stale < 2000:
+        iterations += 1
+        unfilled = np.nonzero(state.assignment < 0)[0]
+        if len(unfilled) and rng.random() < 0.5:
+            improved = _try_fill(state, int(rng.choice(unfilled)), rng)
+        else:
+            improved = _try_rebalance(state, rng)
+        if improved:
+            improvements += 1
+            stale = 0
+        else:
+            stale += 1
+        if progress is not None and iterations % 256 == 0:
+            progress(min(1.0, (time.perf_counter() - t0) / time_budget) if time_budget else 1.0)
+
+    objective = state.objective()
+    unfilled = int((state.assignment < 0).sum())
+    return RosterSolution(
+        assignment=state.assignment,
+        objective=objective,
+        unfilled=unfilled,
+        stats={
+            "greedy_ms": round(greedy_ms, 1),
+            "greedy_objective": greedy_objective,
+            "greedy_unfilled": greedy_unfilled,
+            "search_ms": round((time.perf_counter() - t0) * 1000 - greedy_ms, 1),
+            "iterations": iterations,
+            "improvements": improvements,
+            "hours_std": float(np.std(state.total_hours)),
+        },
+    )
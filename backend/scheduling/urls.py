@@ -0,0 +1,33 @@
+from django.urls import path
+from .views import (
+    SiteListCreateView, SiteDetailView, PositionListCreateView, PositionDetailView,
+    ShiftListCreateView, ShiftDetailView, ShiftBatchCreateView,
+    ScheduleListCreateView, ScheduleDetailView, ScheduleGenerateView,
+    AvailabilityView, AvailabilityExceptionListCreateView, AvailabilityExceptionDetailView,
+    FreeStaffView, LaborSummaryView, MyScheduleFeedView, TokenScheduleFeedView, FeedTokenView,
+)
+
+urlpatterns = [
+    path("", ScheduleListCreateView.as_view(), name="schedule-list"),
+    path("<int:pk>", ScheduleDetailView.as_view(), name="schedule-detail"),
+    path("<int:pk>/generate", ScheduleGenerateView.as_view(), name="schedule-generate"),
+    path("sites", SiteListCreateView.as_view(), name="site-list"),
+    path("sites/<int:pk>", SiteDetailView.as_view(), name="site-detail"),
+    path("positions", PositionListCreateView.as_view(), name="position-list"),
+    path("positions/<int:pk>", PositionDetailView.as_view(), name="position-detail"),
+    path("shifts", ShiftListCreateView.as_view(), name="shift-list"),
+    path("shifts/batch", ShiftBatchCreateView.as_view(), name="shift-batch-create"),
+    path("shifts/<int:pk>", ShiftDetailView.as_view(), name="shift-detail"),
+    path("me.ics", MyScheduleFeedView.as_view(), {"fmt": "ics"}, name="schedule-feed-me-ics"),
+    path("me.csv", MyScheduleFeedView.as_view(), {"fmt": "csv"}, name="schedule-feed-me-csv"),
+    path("me/feed", FeedTokenView.as_view(), name="schedule-feed-token"),
+    path("feed/<str:token>.ics", TokenScheduleFeedView.as_view(), {"fmt": "ics"}, name="schedule-feed-token-ics"),
+    path("feed/<str:token>.csv", TokenScheduleFeedView.as_view(), {"fmt": "csv"}, name="schedule-feed-token-csv"),
+    path("labor", LaborSummaryView.as_view(), name="labor-summary"),
+    path("availability/free", FreeStaffView.as_view(), name="availability-free"),
+    path("availability/<int:user_id>", AvailabilityView.as_view(), name="availability-detail"),
+    path("availability/<int:user_id>/exceptions", AvailabilityExceptionListCreateView.as_view(),
+         name="availability-exception-list"),
+    path("availability/<int:user_id>/exceptions/<int:pk>", AvailabilityExceptionDetailView.as_view(),
+         name="availability-exception-detail"),
+]
@@ -0,0 +1,456 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.http import HttpResponseNotModified, StreamingHttpResponse
+from django.urls import reverse
+from rest_framework import generics, permissions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from jobs.queue import enqueue
+from jobs.views import accepted
+from users.models import User
+from users.policies import RolePolicyPermission, role_allows
+from users.renderers import CSVRenderer
+from . import availability, changes, feeds, publication, rollups
+from .filters import after_cursor, encode_cursor, filter_by_site, filter_shifts, order_shifts
+from .models import (
+    AvailabilityException, AvailabilityRule, LaborRollup, Position, Schedule, Shift, Site,
+)
+from .renderers import ICalendarRenderer
+from .serializers import (
+    AvailabilityExceptionSerializer, AvailabilityRuleSerializer, GenerateRosterSerializer,
+    PositionSerializer, ScheduleSerializer, ShiftBatchSerializer, ShiftSerializer,
+    SiteSerializer, WeeklyAvailabilitySerializer,
+)
+
+# Gestión de sedes, puestos y turnos: misma política que la administración de usuarios
+CRUD_PERMS = {"GET": "ver", "POST": "crear", "PUT": "editar", "PATCH": "editar", "DELETE": "eliminar"}
+
+
+class SiteListCreateView(generics.ListCreateAPIView):
+    """
+    GET  /api/schedules/sites
+    POST /api/schedules/sites
+    """
+    queryset = Site.objects.order_by("name")
+    serializer_class = SiteSerializer
+    permission_classes = [RolePolicyPermission]
+    required_perms = CRUD_PERMS
+
+
+class SiteDetailView(generics.RetrieveUpdateDestroyAPIView):
+    queryset = Site.objects.all()
+    serializer_class = SiteSerializer
+    permission_classes = [RolePolicyPermission]
+    required_perms = CRUD_PERMS
+
+    def perform_update(self, serializer):
+        before = (serializer.instance.name, serializer.instance.address)
+        with transaction.atomic():
+            site = serializer.save()
+            # Nombre y dirección salen en los feeds de turnos
+            if (site.name, site.address) != before:
+                changes.feed_details_changed(site_id=site.pk)
+
+
+class PositionListCreateView(generics.ListCreateAPIView):
+    """
+    GET  /api/schedules/positions?site=<id>
+    POST /api/schedules/positions
+    """
+    serializer_class = PositionSerializer
+    permission_classes = [RolePolicyPermission]
+    required_perms = CRUD_PERMS
+
+    def get_queryset(self):
+        return filter_by_site(Position.objects.order_by("site_id", "name"), self.request.query_params)
+
+    def list(self, request, *args, **kwargs):
+        try:
+            return super().list(request, *args, **kwargs)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+
+class PositionDetailView(generics.RetrieveUpdateDestroyAPIView):
+    queryset = Position.objects.all()
+    serializer_class = PositionSerializer
+    permission_classes = [RolePolicyPermission]
+    required_perms = CRUD_PERMS
+
+    def perform_update(self, serializer):
+        before = serializer.instance.name
+        with transaction.atomic():
+            position = serializer.save()
+            if position.name != before:
+                changes.feed_details_changed(position_id=position.pk)
+
+
+class ShiftListCreateView(generics.ListCreateAPIView):
+    """
+    GET  /api/schedules/shifts?site=&assignee=&status=&start=&end=&limit=&cursor=
+         start/end (ISO 8601) devuelven los turnos que se solapan con la ventana;
+         con site usa el índice GiST (site, period). Paginado por keyset sobre
+         (inicio, id): {"results": [...], "next": <cursor>}.
+    POST /api/schedules/shifts
+    """
+    queryset = Shift.objects.all()
+    serializer_class = ShiftSerializer
+    permission_classes = [RolePolicyPermission]
+    required_perms = CRUD_PERMS
+
+    PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 500
+
+    def list(self, request, *args, **kwargs):
+        try:
+            limit = min(int(request.query_params.get("limit", self.PAGE_SIZE)), self.MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({"detail": "limit debe ser un entero."}, status=400)
+        if limit < 1:
+            return Response({"detail": "limit debe ser mayor que 0."}, status=400)
+
+        try:
+            qs = filter_shifts(Shift.objects.all(), request.query_params)
+            cursor = request.query_params.get("cursor")
+            if cursor:
+                qs = after_cursor(qs, cursor)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        shifts = list(order_shifts(qs)[: limit + 1])
+        next_cursor = None
+        if len(shifts) > limit:
+            shifts = shifts[:limit]
+            next_cursor = encode_cursor(shifts[-1].start, shifts[-1].pk)
+
+        return Response({"results": ShiftSerializer(shifts, many=True).data, "next": next_cursor}, status=200)
+
+
+class ShiftDetailView(generics.RetrieveUpdateDestroyAPIView):
+    queryset = Shift.objects.all()
+    serializer_class = ShiftSerializer
+    permission_classes = [RolePolicyPermission]
+    required_perms = CRUD_PERMS
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            locked = changes.lock_shifts([instance.pk])
+            if not locked:
+                return  # otro borrado concurrente ya descontó el turno
+            changes.shifts_changed(before=[rollups.facts(locked[0])])
+            locked[0].delete()
+
+
+class ShiftBatchCreateView(APIView):
+    """
+    POST /api/schedules/shifts/batch   {"shifts": [{...}, ...]}
+    Valida solapes del lote completo antes de escribir y lo inserta de una vez.
+    """
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"POST": "crear"}
+    permission_denied_messages = {"POST": "No tienes permiso para crear turnos."}
+
+    def post(self, request):
+        ser = ShiftBatchSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        shifts = ser.save()
+        return Response(
+            {"message": "Turnos creados con éxito.", "created": len(shifts),
+             "ids": [s.pk for s in shifts]},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class ScheduleListCreateView(generics.ListCreateAPIView):
+    """
+    GET  /api/schedules?site=<id>
+    POST /api/schedules
+    """
+    serializer_class = ScheduleSerializer
+    permission_classes = [RolePolicyPermission]
+    required_perms = CRUD_PERMS
+
+    def get_queryset(self):
+        return filter_by_site(Schedule.objects.order_by("-start_date", "id"), self.request.query_params)
+
+    def list(self, request, *args, **kwargs):
+        try:
+            return super().list(request, *args, **kwargs)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+
+class ScheduleDetailView(generics.RetrieveUpdateDestroyAPIView):
+    queryset = Schedule.objects.all()
+    serializer_class = ScheduleSerializer
+    permission_classes = [RolePolicyPermission]
+    required_perms = CRUD_PERMS
+
+    def perform_update(self, serializer):
+        was_published = serializer.instance.status == Schedule.Status.PUBLISHED
+        schedule = serializer.save()
+        if not was_published and schedule.status == Schedule.Status.PUBLISHED:
+            publication.notify_published(schedule)
+
+
+class ScheduleGenerateView(APIView):
+    """
+    POST /api/schedules/<id>/generate   {"time_budget": 2.0, "dry_run": false}
+    Encola la asignación de empleados activos a los turnos abiertos del
+    periodo. Responde 202 con la URL del trabajo (GET /api/jobs/<id>).
+    """
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"POST": "editar"}
+    permission_denied_messages = {"POST": "No tienes permiso para generar rosters."}
+
+    def post(self, request, pk):
+        if not Schedule.objects.filter(pk=pk).exists():
+            return Response({"detail": "Roster no encontrado."}, status=404)
+
+        ser = GenerateRosterSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        job = enqueue("roster.generate", {"schedule": pk, **ser.validated_data}, user=request.user)
+        return accepted(job)
+
+
+def _can_manage(request, user_id, perm):
+    """El propio empleado gestiona su disponibilidad; el resto necesita `perm`."""
+    return request.user.pk == user_id or role_allows(request.user.role, perm)
+
+
+class AvailabilityView(APIView):
+    """
+    GET /api/schedules/availability/<user_id>   -> reglas semanales
+    PUT /api/schedules/availability/<user_id>   {"rules": [{"weekday": 0, "start_time": "08:00", "end_time": "16:00"}, ...]}
+    Sin reglas, el empleado está disponible toda la semana.
+    """
+    permission_classes = [RolePolicyPermission]
+
+    def get(self, request, user_id):
+        if not _can_manage(request, user_id, "ver"):
+            return Response({"detail": "Usuario no encontrado."}, status=404)
+        rules = AvailabilityRule.objects.filter(user_id=user_id)
+        return Response({"user": user_id, "rules": AvailabilityRuleSerializer(rules, many=True).data}, status=200)
+
+    def put(self, request, user_id):
+        if not _can_manage(request, user_id, "editar"):
+            return Response({"detail": "No tienes permiso para editar esta disponibilidad."}, status=403)
+        if not User.objects.filter(pk=user_id).exists():
+            return Response({"detail": "Usuario no encontrado."}, status=404)
+        ser = WeeklyAvailabilitySerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            AvailabilityRule.objects.filter(user_id=user_id).delete()
+            AvailabilityRule.objects.bulk_create(
+                AvailabilityRule(user_id=user_id, **rule) for rule in ser.validated_data["rules"]
+            )
+            availability.rebuild([user_id])
+        return Response({"user": user_id, "rules": ser.data["rules"]}, status=200)
+
+
+class AvailabilityExceptionListCreateView(APIView):
+    """
+    GET  /api/schedules/availability/<user_id>/exceptions?from=YYYY-MM-DD
+    POST /api/schedules/availability/<user_id>/exceptions
+         {"date": "2025-12-24", "start_time": null, "end_time": null, "available": false, "reason": "..."}
+    """
+    permission_classes = [RolePolicyPermission]
+
+    def get(self, request, user_id):
+        if not _can_manage(request, user_id, "ver"):
+            return Response({"detail": "Usuario no encontrado."}, status=404)
+        since = timezone.localdate()
+        if request.query_params.get("from"):
+            try:
+                since = parse_date(request.query_params["from"])
+            except ValueError:
+                since = None
+            if since is None:
+                return Response({"detail": "El parámetro from debe tener formato YYYY-MM-DD."}, status=400)
+        qs = AvailabilityException.objects.filter(user_id=user_id, date__gte=since)
+        return Response(AvailabilityExceptionSerializer(qs, many=True).data, status=200)
+
+    def post(self, request, user_id):
+        if not _can_manage(request, user_id, "editar"):
+            return Response({"detail": "No tienes permiso para editar esta disponibilidad."}, status=403)
+        if not User.objects.filter(pk=user_id).exists():
+            return Response({"detail": "Usuario no encontrado."}, status=404)
+        ser = AvailabilityExceptionSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        ser.save(user_id=user_id)
+        return Response(ser.data, status=status.HTTP_201_CREATED)
+
+
+class AvailabilityExceptionDetailView(APIView):
+    """DELETE /api/schedules/availability/<user_id>/exceptions/<id>"""
+    permission_classes = [RolePolicyPermission]
+
+    def delete(self, request, user_id, pk):
+        if not _can_manage(request, user_id, "editar"):
+            return Response({"detail": "No tienes permiso para editar esta disponibilidad."}, status=403)
+        deleted, _ = AvailabilityException.objects.filter(user_id=user_id, pk=pk).delete()
+        if not deleted:
+            return Response({"detail": "Excepción no encontrada."}, status=404)
+        return Response(status=204)
+
+
+class FreeStaffView(APIView):
+    """
+    GET /api/schedules/availability/free?start=<ISO 8601>&end=<ISO 8601>[&exclude_booked=1]
+    Empleados activos disponibles durante toda la ventana (máx. 7 días).
+    Con exclude_booked=1 descarta también a quien ya tiene un turno que se solapa.
+    """
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"GET": "ver"}
+    permission_denied_messages = {"GET": "No tienes permiso para consultar la disponibilidad del personal."}
+
+    def get(self, request):
+        params = request.query_params
+        start = parse_datetime(params.get("start") or "")
+        end = parse_datetime(params.get("end") or "")
+        if not start or not end or end <= start:
+            return Response({"detail": "Indica start y end (ISO 8601) con end posterior a start."}, status=400)
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        if timezone.is_naive(end):
+            end = timezone.make_aware(end)
+        if end - start > timedelta(days=7):
+            return Response({"detail": "La ventana no puede superar 7 días."}, status=400)
+
+        free = availability.get_index().free(start, end)
+        if params.get("exclude_booked") == "1" and len(free):
+            booked = set(
+                Shift.objects.filter(assignee__isnull=False, period__overlap=(start, end))
+                .exclude(status=Shift.Status.CANCELLED)
+                .values_list("assignee_id", flat=True)
+            )
+            free = [pk for pk in free.tolist() if pk not in booked]
+        else:
+            free = free.tolist()
+        return Response({"start": start, "end": end, "count": len(free), "users": free}, status=200)
+
+
+class LaborSummaryView(APIView):
+    """
+    GET /api/schedules/labor?week=YYYY-MM-DD[&site=<id>]
+    Horas por empleado (con marca de horas extra) y cobertura por sede de la
+    semana que contiene `week`. Se lee de LaborRollup, sin sumar turnos.
+    Con `site` se listan esa sede y sus empleados, pero las horas y la marca
+    de horas extra de cada empleado cuentan todas sus sedes.
+    """
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"GET": "ver"}
+    permission_denied_messages = {"GET": "No tienes permiso para consultar las horas del personal."}
+
+    def get(self, request):
+        params = request.query_params
+        day = parse_date(params.get("week") or "") or timezone.localdate()
+        week = day - timedelta(days=day.weekday())
+        qs = LaborRollup.objects.filter(week=week)
+        # Horas y horas extra siempre sobre todas las sedes; ?site= solo
+        # decide qué empleados y qué sedes se listan
+        totals = qs.filter(user__isnull=False)
+        site = params.get("site")
+        if site:
+            try:
+                site = int(site)
+            except ValueError:
+                return Response({"detail": "site debe ser un entero."}, status=400)
+            totals = totals.filter(user__in=qs.filter(site_id=site, user__isnull=False).values("user_id"))
+            qs = qs.filter(site_id=site)
+
+        overtime = settings.OVERTIME_WEEKLY_HOURS * 60
+        employees = [
+            {"user": r["user_id"], "hours": r["minutes"] / 60, "shifts": r["shifts"], "overtime": r["minutes"] > overtime}
+            for r in totals.values("user_id")
+            .annotate(minutes=Sum("minutes"), shifts=Sum("shifts")).order_by("-minutes", "user_id")
+            if r["minutes"]
+        ]
+
+        sites = {}
+        for row in qs.values("site_id", "user_id", "minutes"):
+            entry = sites.setdefault(row["site_id"], {"site": row["site_id"], "assigned_hours": 0.0, "open_hours": 0.0})
+            entry["open_hours" if row["user_id"] is None else "assigned_hours"] += row["minutes"] / 60
+        for entry in sites.values():
+            total = entry["assigned_hours"] + entry["open_hours"]
+            entry["coverage"] = round(entry["assigned_hours"] / total, 4) if total else None
+
+        return Response({"week": week, "employees": employees, "sites": sorted(sites.values(), key=lambda e: e["site"])}, status=200)
+
+
+def _feed_response(request, user_id, version, fmt, calendar_name):
+    """200 en streaming o 304 si el ETag coincide (sin leer turnos)."""
+    tag = feeds.etag(user_id, version, fmt, calendar_name)
+    if feeds.not_modified(request, tag):
+        response = HttpResponseNotModified()
+    else:
+        response = StreamingHttpResponse(
+            feeds.STREAMERS[fmt](user_id, calendar_name), content_type=feeds.CONTENT_TYPES[fmt]
+        )
+        response["Content-Disposition"] = f'inline; filename="turnos.{fmt}"'
+    response["ETag"] = tag
+    response["Cache-Control"] = f"private, max-age={settings.FEED_MAX_AGE}"
+    return response
+
+
+class MyScheduleFeedView(APIView):
+    """
+    GET /api/schedules/me.ics   GET /api/schedules/me.csv
+    Turnos del usuario autenticado (JWT), desde FEED_PAST_DAYS atrás hasta
+    FEED_FUTURE_DAYS adelante. Admite If-None-Match.
+    """
+    permission_classes = [RolePolicyPermission]
+    renderer_classes = [ICalendarRenderer, CSVRenderer, JSONRenderer]
+
+    def get(self, request, fmt):
+        user = request.user
+        return _feed_response(request, user.pk, feeds.version(user.pk), fmt, f"Turnos · {user.first_name} {user.last_name}")
+
+
+class TokenScheduleFeedView(APIView):
+    """
+    GET /api/schedules/feed/<token>.ics | .csv
+    URL de suscripción para calendarios que no pueden enviar el JWT.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    renderer_classes = [ICalendarRenderer, CSVRenderer, JSONRenderer]
+
+    def get(self, request, token, fmt):
+        row = feeds.token_owner(token)
+        if row is None:
+            return Response({"detail": "Feed no encontrado."}, status=404)
+        user_id, version, first_name, last_name = row
+        return _feed_response(request, user_id, version, fmt, f"Turnos · {first_name} {last_name}")
+
+
+class FeedTokenView(APIView):
+    """
+    GET  /api/schedules/me/feed   -> URLs de suscripción del usuario
+    POST /api/schedules/me/feed   -> genera un token nuevo (invalida las URLs anteriores)
+    """
+    permission_classes = [RolePolicyPermission]
+
+    def get(self, request):
+        return Response(self._urls(request, feeds.get_or_create_feed(request.user)), status=200)
+
+    def post(self, request):
+        return Response(self._urls(request, feeds.rotate_token(request.user)), status=200)
+
+    @staticmethod
+    def _urls(request, feed):
+        return {
+            fmt: request.build_absolute_uri(reverse(f"schedule-feed-token-{fmt}", args=[feed.token]))
+            for fmt in (feeds.ICS, feeds.CSV)
+        }
@@ -0,0 +1,155 @@
+"""
+Vistas async para el modo ASGI (SERVER_MODE=asgi, ver deploy/entrypoint.sh).
+
+DRF no ejecuta vistas async, así que estas son vistas de Django con la misma
+respuesta que sus equivalentes en users.views. Las consultas usan el ORM
+async; el trabajo bloqueante (hash de contraseñas) va a un hilo aparte con
+sync_to_async(thread_sensitive=False), para no ocupar el hilo compartido del
+ORM ni el event loop. users.urls las enruta cuando ASYNC_VIEWS.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import check_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated, Throttled
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import CachedJWTAuthentication
+from .models import User
+from .policies import _count_denial, role_allows
+from .serializers import UserPublicSerializer
+from .throttling import check_request
+from .views import AdminUserAccessView
+
+_jwt = CachedJWTAuthentication()
+
+
+def in_thread(func):
+    """Ejecuta `func` en el pool de hilos, fuera del hilo del ORM."""
+    return sync_to_async(func, thread_sensitive=False)
+
+
+def _unauthorized(detail):
+    response = JsonResponse(detail if isinstance(detail, dict) else {"detail": detail}, status=401)
+    response["WWW-Authenticate"] = _jwt.authenticate_header(None)
+    return response
+
+
+async def _authenticate(request):
+    """
+    Mismo orden que REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"]: JWT y,
+    sin cabecera Authorization, la sesión de Django. Devuelve (user, error).
+    """
+    try:
+        result = await _jwt.aauthenticate(request)
+    except AuthenticationFailed as exc:
+        return None, _unauthorized(exc.detail)
+    if result is not None:
+        return result[0], None
+    user = await request.auser()
+    if user.is_authenticated:
+        return user, None
+    return None, _unauthorized(str(NotAuthenticated.default_detail))
+
+
+async def me(request):
+    if request.method not in ("GET", "HEAD"):
+        return JsonResponse({"detail": f'Método "{request.method}" no permitido.'}, status=405)
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    return JsonResponse({"user": UserPublicSerializer(user).data})
+
+
+def _login_data(request):
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST
+
+
+def _hash_dummy(password):
+    # Como ModelBackend: sin usuario se calcula igualmente un hash para no
+    # revelar por tiempo de respuesta qué emails existen.
+    User().set_password(password)
+
+
+@csrf_exempt
+async def login(request):
+    if request.method != "POST":
+        return JsonResponse({"detail": f'Método "{request.method}" no permitido.'}, status=405)
+    data = _login_data(request)
+    if data is None:
+        return JsonResponse({"detail": "JSON inválido."}, status=400)
+    # Antes de tocar la BD o calcular ningún hash (ver users.throttling)
+    allowed, wait = await in_thread(check_request)(request, "login", data)
+    if not allowed:
+        response = JsonResponse({"detail": str(Throttled(wait).detail)}, status=429)
+        response["Retry-After"] = str(wait)
+        return response
+
+    email, password = data.get("email"), data.get("password")
+    try:
+        if not isinstance(email, str) or not isinstance(password, str) or not password:
+            raise ValidationError("")
+        validate_email(email)
+    except ValidationError:
+        return JsonResponse({"message": "Datos inválidos"}, status=403)
+
+    user = await User.objects.filter(email=User.objects.normalize_email(email)).afirst()
+    if user is None:
+        await in_thread(_hash_dummy)(password)
+        return JsonResponse({"message": "Credenciales inválidas."}, status=401)
+
+    upgrade = []
+    valid = await in_thread(check_password)(password, user.password, upgrade.append)
+    if not valid or not user.is_active:
+        return JsonResponse({"message": "Credenciales inválidas."}, status=401)
+    if upgrade:
+        # Hash de otro algoritmo/coste: se regenera como haría check_password()
+        await in_thread(user.set_password)(password)
+        await user.asave(update_fields=["password"])
+
+    if user.status in ("BLOCKED", "INACTIVE"):
+        return JsonResponse({"message": "Usuario no autorizado. Verifica tu estado."}, status=403)
+
+    refresh = RefreshToken.for_user(user)
+    return JsonResponse({
+        "access": str(refresh.access_token),
+        "refresh": str(refresh),
+        "user": UserPublicSerializer(user).data,
+    })
+
+
+_sync_access_view = sync_to_async(AdminUserAccessView.as_view())
+
+
+@csrf_exempt
+async def user_access(request, pk):
+    """GET async; el resto de métodos (PUT) los atiende AdminUserAccessView."""
+    if request.method not in ("GET", "HEAD"):
+        return await _sync_access_view(request, pk=pk)
+
+    principal, error = await _authenticate(request)
+    if error:
+        return error
+    if not role_allows(principal.role, "ver"):
+        _count_denial("user-access-admin")
+        return JsonResponse({"detail": AdminUserAccessView.permission_denied_messages["GET"]}, status=403)
+
+    user = await User.objects.filter(pk=pk).only("id", "email", "role", "perms_mask").afirst()
+    if user is None:
+        return JsonResponse({"detail": "Usuario no encontrado."}, status=404)
+    return JsonResponse({
+        "id": user.id,
+        "email": user.email,
+        "role": user.role,
+        "permissions": user.permissions or [],
+    })
@@ -0,0 +1,116 @@
+"""
+Acciones administrativas masivas (POST /api/auth/users/bulk-action).
+
+Cada acción es un solo UPDATE sobre el conjunto de usuarios elegido, por ids
+(id = ANY(%s)) o por los filtros del directorio:
+
+    WITH old AS (SELECT ... WHERE <selección> FOR UPDATE)
+    UPDATE users_user SET ... FROM old WHERE users_user.id = old.id
+    RETURNING old.*
+
+La selección excluye al propio administrador y a los usuarios que ya tienen
+los valores pedidos; RETURNING devuelve los valores anteriores para el diff
+de auditoría. N usuarios cuestan un UPDATE, un INSERT de auditoría y un
+set_many en la caché de principals, no N de cada.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from audit import log as audit
+
+from .filters import filter_users
+from .models import User
+from .perms import to_list, to_mask
+from .principal import invalidate_principals
+
+# Acción -> evento de auditoría (el mismo que la vista individual equivalente)
+ACTIONS = {
+    "block": "user.block",
+    "activate": "user.activate",
+    "set_role": "user.access",
+    "assign_permissions": "user.access",
+}
+
+# Columnas que se leen antes del cambio (orden del RETURNING)
+_COLUMNS = ("id", "email", "role", "status", "is_active", "perms_mask")
+
+
+def _values(action, role=None, permissions=None):
+    """{columna: valor} que escribe la acción."""
+    if action == "block":
+        return {"status": User.Status.BLOCKED, "is_active": False}
+    if action == "activate":
+        return {"status": User.Status.ACTIVE, "is_active": True}
+    if action == "set_role":
+        return {"role": role}
+    if action == "assign_permissions":
+        return {"perms_mask": to_mask(permissions)}
+    raise ValueError(f"Acción no soportada: {action}")
+
+
+def select_users(actor, ids=None, filters=None):
+    """Queryset de la selección (sin el propio actor). Lanza ValueError si los filtros no son válidos."""
+    qs = User.objects.all()
+    if ids is not None:
+        table = User._meta.db_table
+        # Un único parámetro array en lugar de IN (%s, %s, ...) con un parámetro por id
+        qs = qs.filter(RawSQL(f'"{table}"."id" = ANY(%s)', (list(ids),), output_field=BooleanField()))
+    else:
+        qs = filter_users(qs, filters)
+    return qs.exclude(pk=actor.pk)
+
+
+def _audit_row(row):
+    return {
+        "role": row["role"], "status": row["status"], "is_active": row["is_active"],
+        "permissions": to_list(row["perms_mask"]),
+    }
+
+
+def apply(request, action, ids=None, filters=None, role=None, permissions=None):
+    """
+    Ejecuta `action` sobre la selección y devuelve los ids actualizados.
+    Lanza ValueError si los filtros no son válidos o la selección supera
+    USER_BULK_ACTION_MAX_USERS (en ese caso no se cambia nada).
+    """
+    values = _values(action, role, permissions)
+    limit = settings.USER_BULK_ACTION_MAX_USERS
+    # Los que ya tienen los valores pedidos no se tocan ni se auditan
+    qs = select_users(request.user, ids, filters).exclude(**values)
+    table = User._meta.db_table
+    assignments = {**values, "updated_at": timezone.now()}
+    with transaction.atomic():
+        # Bloqueo en orden de id: dos acciones masivas concurrentes no se interbloquean.
+        # (select_for_update solo compila dentro de una transacción.)
+        select_sql, select_params = (
+            qs.select_for_update().order_by("id").values_list(*_COLUMNS)[: limit + 1].query.sql_with_params()
+        )
+        sql = (
+            f'WITH old ({", ".join(_COLUMNS)}) AS ({select_sql}) '
+            f'UPDATE "{table}" AS u SET {", ".join(f"{col} = %s" for col in assignments)} '
+            f"FROM old WHERE u.id = old.id "
+            f'RETURNING {", ".join(f"old.{col}" for col in _COLUMNS)}'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*select_params, *assignments.values()])
+            rows = [dict(zip(_COLUMNS, r)) for r in cursor.fetchall()]
+        if len(rows) > limit:
+            # Se deshace el UPDATE: acotar la selección es responsabilidad del cliente
+            raise ValueError(f"La selección supera el máximo de {limit} usuarios; acota el filtro.")
+
+        updated = [row["id"] for row in rows]
+        events = [
+            audit.event(
+                request, ACTIONS[action], User(id=row["id"], email=row["email"]),
+                audit.diff(_audit_row(row), _audit_row({**row, **values})),
+            )
+            for row in rows
+        ]
+        audit.record_many(events)
+        # Tras el commit: invalidar antes permitiría recachear las filas antiguas
+        transaction.on_commit(lambda: invalidate_principals(updated))
+    return updated
+
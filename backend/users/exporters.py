@@ -0,0 +1,56 @@
+"""
+Exportación de usuarios en streaming (CSV / JSON Lines).
+
+Se itera con .iterator(chunk_size=...), que en PostgreSQL usa un cursor con
+nombre del lado del servidor, dentro de transaction.atomic(): fuera de una
+transacción Django lo declara WITH HOLD y PostgreSQL materializa el resultado
+completo antes de devolver la primera fila. Dentro de la transacción la
+memoria no depende del número de filas y el primer bloque sale antes de que
+termine la consulta (a cambio, la transacción dura lo que la descarga).
+"""
+import csv
+
+from django.conf import settings
+from django.db import transaction
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .perms import to_list
+from .serializers import UserPublicSerializer
+
+CSV = "csv"
+JSONL = "jsonl"
+EXPORT_FIELDS = UserPublicSerializer.Meta.fields + ("permissions",)
+# En BD los permisos son una máscara; se convierten a lista al escribir
+_QUERY_FIELDS = UserPublicSerializer.Meta.fields + ("perms_mask",)
+CONTENT_TYPES = {CSV: "text/csv; charset=utf-8", JSONL: "application/x-ndjson"}
+
+
+class _Echo:
+    """Pseudo-buffer: csv.writer escribe y devolvemos la línea tal cual."""
+
+    def write(self, value):
+        return value
+
+
+def _rows(queryset):
+    with transaction.atomic(using=queryset.db):
+        yield from queryset.order_by("id").values_list(*_QUERY_FIELDS).iterator(
+            chunk_size=settings.USER_EXPORT_CHUNK_SIZE
+        )
+
+
+def stream_csv(queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in _rows(queryset):
+        *public, mask = row
+        yield writer.writerow([*public, "|".join(to_list(mask))])
+
+
+def stream_jsonl(queryset):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for *public, mask in _rows(queryset):
+        yield encoder.encode(dict(zip(EXPORT_FIELDS, (*public, to_list(mask))))) + "\n"
+
+
+STREAMERS = {CSV: stream_csv, JSONL: stream_jsonl}
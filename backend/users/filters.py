@@ -0,0 +1,82 @@
+import base64
+import json
+
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import User
+
+
+def filter_users(queryset, params):
+    """
+    Aplica los filtros del directorio de usuarios:
+      ?role=ADMIN|GERENTE|EMPLEADO  ?status=ACTIVE|BLOCKED|INACTIVE
+      ?q=<prefijo>  (email, nombre o apellido, sin distinguir mayúsculas)
+      ?changed_since=<ISO 8601>  (updated_at >= fecha)
+    Lanza ValueError si algún parámetro no es válido.
+    """
+    role = params.get("role")
+    if role:
+        queryset = queryset.filter(role=role)
+
+    status = params.get("status")
+    if status:
+        queryset = queryset.filter(status=status)
+
+    changed_since = params.get("changed_since")
+    if changed_since:
+        dt = parse_datetime(changed_since)
+        if dt is None:
+            raise ValueError("changed_since debe ser una fecha ISO 8601.")
+        if timezone.is_naive(dt):
+            dt = timezone.make_aware(dt)
+        queryset = queryset.filter(updated_at__gte=dt)
+
+    q = (params.get("q") or "").strip()
+    if q:
+        # Lower(campo) LIKE 'q%' usa los índices users_*_lower_idx (text_pattern_ops)
+        queryset = queryset.annotate(email_lower=Lower("email"))
+        if "@" in q:
+            queryset = queryset.filter(email_lower__startswith=q.lower())
+        else:
+            queryset = queryset.annotate(
+                first_name_lower=Lower("first_name"), last_name_lower=Lower("last_name")
+            ).filter(
+                Q(email_lower__startswith=q.lower())
+                | Q(first_name_lower__startswith=q.lower())
+                | Q(last_name_lower__startswith=q.lower())
+            )
+    return queryset
+
+
+def encode_cursor(last_name, pk):
+    raw = json.dumps([last_name, pk], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Devuelve (last_name, id) o lanza ValueError si el cursor no es válido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_name, pk = json.loads(raw)
+    except Exception as e:
+        raise ValueError("Cursor inválido.") from e
+    if not isinstance(last_name, str) or not isinstance(pk, int):
+        raise ValueError("Cursor inválido.")
+    return last_name, pk
+
+
+def after_cursor(queryset, cursor):
+    """Keyset: filas estrictamente posteriores a (last_name, id) del cursor."""
+    last_name, pk = decode_cursor(cursor)
+    table = User._meta.db_table
+    return queryset.filter(
+        RawSQL(
+            f'("{table}"."last_name", "{table}"."id") > (%s, %s)',
+            (last_name, pk),
+            output_field=BooleanField(),
+        )
+    )
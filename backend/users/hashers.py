@@ -0,0 +1,53 @@
+"""
+Hashers de contraseña con coste configurable desde settings.
+
+Mantienen el mismo `algorithm` que los de Django, así que los hashes
+existentes siguen verificando. Como must_update() compara contra los
+parámetros vigentes, al cambiar el coste en settings el hash se regenera
+automáticamente en el siguiente login (check_password -> setter).
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PBKDF2_ITERATIONS
+
+
+class TunableArgon2PasswordHasher(Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST  # KiB
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
+
+
+class TunableScryptPasswordHasher(ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return settings.SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.SCRYPT_PARALLELISM
+
+    @property
+    def maxmem(self):
+        # scrypt necesita 128 * n * r bytes; OpenSSL limita a 32 MiB por defecto.
+        return 2 * 128 * self.work_factor * self.block_size
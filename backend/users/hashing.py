@@ -0,0 +1,53 @@
+"""
+Hash de contraseñas en lote usando un pool de procesos.
+
+El pool se crea de forma perezosa con contexto "forkserver": los hijos no
+heredan los sockets de BD del worker de gunicorn.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_init_worker,
+            )
+        return _executor
+
+
+def hash_passwords(passwords):
+    """
+    Devuelve make_password(p) para cada contraseña, en el mismo orden.
+    Con PASSWORD_HASH_WORKERS <= 1 (o un único elemento) se hace en línea.
+    """
+    passwords = list(passwords)
+    workers = settings.PASSWORD_HASH_WORKERS
+    if workers <= 1 or len(passwords) < 2:
+        return [make_password(p) for p in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(_get_executor().map(make_password, passwords, chunksize=chunksize))
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,232 @@
+"""
+Importación masiva de usuarios desde CSV o JSON Lines.
+
+El archivo se recorre en streaming y se procesa por bloques de
+USER_IMPORT_CHUNK_SIZE filas: validación con las reglas de
+AdminCreateUserSerializer, una sola consulta de duplicados por bloque,
+hash de contraseñas en paralelo y bulk_create, todo dentro de una única
+transacción.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from rest_framework import serializers
+
+from audit import log as audit
+from jobs import inputs
+
+from .hashing import hash_passwords
+from .models import User
+from .serializers import EMAIL_TAKEN, AdminCreateUserSerializer, is_email_conflict
+
+CSV = "csv"
+JSONL = "jsonl"
+
+
+class BulkUserRowSerializer(AdminCreateUserSerializer):
+    """
+    Mismas reglas que AdminCreateUserSerializer salvo:
+      - el duplicado de email se resuelve por bloque, no por fila;
+      - la contraseña es opcional: sin ella la cuenta queda con contraseña
+        inutilizable y el empleado entra por "restablecer contraseña".
+    """
+    password = serializers.CharField(write_only=True, required=False)
+    password_confirm = serializers.CharField(write_only=True, required=False)
+
+    class Meta(AdminCreateUserSerializer.Meta):
+        extra_kwargs = {"email": {"validators": []}}
+
+    def validate(self, data):
+        if data.get("password") != data.get("password_confirm", data.get("password")):
+            raise serializers.ValidationError({"password_confirm": "Las contraseñas no coinciden."})
+        data.pop("password_confirm", None)
+        data["email"] = User.objects.normalize_email(data["email"])
+        return data
+
+
+def detect_format(upload):
+    name = (upload.name or "").lower()
+    if name.endswith((".jsonl", ".ndjson")) or "ndjson" in (upload.content_type or ""):
+        return JSONL
+    if name.endswith(".csv") or "csv" in (upload.content_type or ""):
+        return CSV
+    return None
+
+
+class ImportFileError(ValueError):
+    """El archivo no se puede seguir leyendo (codificación, comillas...); `line` es la línea física."""
+
+    def __init__(self, line, message):
+        super().__init__(message)
+        self.line = line
+
+
+class _Lines:
+    """
+    Iterador del texto de cada línea física; `line_no` es la última leída.
+    Se decodifica línea a línea (no con un TextIOWrapper por bloques) para
+    poder señalar la línea que no es UTF-8.
+    """
+
+    def __init__(self, upload):
+        self._raw = iter(upload)
+        self.line_no = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        raw = next(self._raw)
+        self.line_no += 1
+        try:
+            return raw.decode("utf-8-sig" if self.line_no == 1 else "utf-8")
+        except UnicodeDecodeError as e:
+            raise ImportFileError(
+                self.line_no, "El archivo no está codificado en UTF-8 (guárdalo como CSV UTF-8)."
+            ) from e
+
+
+def iter_rows(upload, fmt):
+    """Genera (línea, dict) sin cargar el archivo completo en memoria. Lanza ImportFileError."""
+    if fmt == CSV:
+        lines = _Lines(upload)
+        reader = csv.DictReader(lines, strict=True)
+        try:
+            for row in reader:
+                yield reader.line_num, {k: v for k, v in row.items() if k and v != ""}
+        except csv.Error as e:
+            raise ImportFileError(lines.line_no, f"CSV mal formado: {e}.") from e
+    else:
+        for line_no, line in enumerate(_Lines(upload), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_no, None
+                continue
+            yield line_no, row if isinstance(row, dict) else None
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _taken(emails):
+    """Emails (en minúsculas) de `emails` que ya existen, sin distinguir mayúsculas."""
+    return set(
+        User.objects.annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=[e.lower() for e in emails])
+        .values_list("email_lower", flat=True)
+    )
+
+
+def _insert(users, errors):
+    """
+    bulk_create de [(línea, User)]. Si un alta concurrente gana la carrera
+    entre _taken() y el INSERT, esas filas pasan a EMAIL_TAKEN y se reintenta
+    el resto. Devuelve los User creados.
+    """
+    while users:
+        try:
+            with transaction.atomic():
+                return User.objects.bulk_create([u for _, u in users], batch_size=settings.USER_IMPORT_CHUNK_SIZE)
+        except IntegrityError as e:
+            taken = _taken([u.email for _, u in users]) if is_email_conflict(e) else None
+            if not taken:
+                raise
+            for line, u in users:
+                if u.email.lower() in taken:
+                    errors.append({"line": line, "errors": {"email": [EMAIL_TAKEN]}})
+            users = [(line, u) for line, u in users if u.email.lower() not in taken]
+    return []
+
+
+def import_users(upload, fmt, on_chunk=None, actor=None):
+    """
+    Devuelve {"created": int, "errors": [{"line": n, "errors": ...}]}.
+    `on_chunk()` se llama tras procesar cada bloque (progreso de los jobs).
+    Cada usuario creado queda auditado como "user.import" a nombre de `actor`.
+    Si el archivo deja de poder leerse (codificación, CSV mal formado) no se
+    crea nadie y el error indica la línea.
+    """
+    errors = []
+    try:
+        with transaction.atomic():
+            created = _import_chunks(upload, fmt, on_chunk, actor, errors)
+    except ImportFileError as e:
+        created = 0
+        errors.append({"line": e.line, "errors": {"detail": str(e)}})
+    errors.sort(key=lambda e: e["line"])
+    return {"created": created, "errors": errors}
+
+
+def _import_chunks(upload, fmt, on_chunk, actor, errors):
+    created = 0
+    seen = set()
+    # Una sola instancia: los campos del ModelSerializer se construyen una vez
+    child = BulkUserRowSerializer()
+
+    for chunk in _chunks(iter_rows(upload, fmt), settings.USER_IMPORT_CHUNK_SIZE):
+        rows = []
+        for line, row in chunk:
+            if row is None:
+                errors.append({"line": line, "errors": {"detail": "Fila con formato inválido."}})
+            else:
+                rows.append((line, row))
+
+        valid = []
+        for line, row in rows:
+            try:
+                valid.append((line, child.run_validation(row)))
+            except serializers.ValidationError as e:
+                errors.append({"line": line, "errors": e.detail})
+
+        # La unicidad es sobre LOWER(email) (users_user_email_ci_uniq)
+        existing = _taken([d["email"] for _, d in valid])
+        to_create = []
+        for line, data in valid:
+            key = data["email"].lower()
+            if key in existing or key in seen:
+                errors.append({"line": line, "errors": {"email": [EMAIL_TAKEN]}})
+                continue
+            seen.add(key)
+            to_create.append((line, data))
+
+        hashed = iter(hash_passwords([d["password"] for _, d in to_create if d.get("password")]))
+        unusable = make_password(None)
+        users = []
+        for line, data in to_create:
+            data["password"] = next(hashed) if data.get("password") else unusable
+            users.append((line, User(**data)))
+
+        users = _insert(users, errors)
+        # Un INSERT por bloque, en la misma transacción: no se retienen los
+        # eventos de toda la importación en memoria hasta el commit
+        audit.write([
+            audit.event(None, "user.import", target=u, changes=audit.diff({}, audit.snapshot(u)), actor=actor)
+            for u in users
+        ])
+        created += len(users)
+        if on_chunk is not None:
+            on_chunk()
+    return created
+
+
+def import_users_job(job, progress):
+    """Handler de jobs para "users.import": el archivo está en jobs.inputs (payload["input"])."""
+    with inputs.open_input(job.payload["input"]) as upload:
+        size = max(upload.size, 1)
+        return import_users(
+            upload, job.payload["format"], actor=job.created_by,
+            # Fracción de bytes ya leídos del archivo
+            on_chunk=lambda: progress(upload.tell() / size, "Importando usuarios"),
+        )
@@ -0,0 +1,110 @@
+import statistics
+import threading
+import time
+
+import psycopg
+from django.core.management.base import BaseCommand
+from django.db import connection
+from psycopg_pool import ConnectionPool
+
+from users.models import User
+from users.principal import PRINCIPAL_FIELDS
+
+QUERY = f"SELECT {', '.join(PRINCIPAL_FIELDS)} FROM users_user WHERE id = %s"
+
+
+class Command(BaseCommand):
+    help = (
+        "Coste de conexión por petición: conexión nueva, persistente y pool de "
+        "psycopg3 (con N hilos compitiendo por el pool), y la consulta del principal "
+        "con el ClientCursor de Django (por defecto) frente a DB_SERVER_SIDE_BINDING "
+        "sin preparar y preparada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Peticiones simuladas por escenario.")
+        parser.add_argument("--threads", type=int, default=8, help="Hilos contra el pool.")
+        parser.add_argument("--pool-size", type=int, default=4)
+
+    def handle(self, *args, **o):
+        params = connection.get_connection_params()
+        params["autocommit"] = True
+        user_id = User.objects.order_by("id").values_list("id", flat=True).first()
+        if user_id is None:
+            self.stderr.write("Hace falta al menos un usuario en la BD.")
+            return
+        n = o["requests"]
+        self.stdout.write(f"{'escenario':<30} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+
+        def fresh():
+            with psycopg.connect(**params) as conn:
+                conn.execute(QUERY, [user_id]).fetchone()
+
+        self._report("conexión nueva", self._serial(fresh, n))
+
+        with psycopg.connect(**params) as conn:
+            self._report("persistente", self._serial(lambda: conn.execute(QUERY, [user_id]).fetchone(), n))
+
+        with ConnectionPool(kwargs=params, min_size=o["pool_size"], max_size=o["pool_size"], open=True) as pool:
+            pool.wait()
+
+            def pooled():
+                with pool.connection() as conn:
+                    conn.execute(QUERY, [user_id]).fetchone()
+
+            self._report("pool (1 hilo)", self._serial(pooled, n))
+            pool.pop_stats()
+            samples, elapsed = self._threaded(pooled, n, o["threads"])
+            self._report(f"pool ({o['threads']} hilos)", samples, elapsed)
+            stats = pool.get_stats()
+            waits = stats.get("requests_queued", 0)
+            self.stdout.write(
+                f"  pool {o['pool_size']} conexiones: {stats.get('requests_num', 0)} checkouts, "
+                f"{waits} esperaron, {stats.get('requests_wait_ms', 0)} ms de espera total"
+            )
+
+        # Los mismos cursores que usa el backend de Django en cada modo
+        modes = (
+            ("cliente", psycopg.ClientCursor, None),
+            ("servidor", psycopg.Cursor, None),
+            ("servidor preparada", psycopg.Cursor, 0),
+        )
+        for label, cursor_factory, threshold in modes:
+            with psycopg.connect(**{**params, "cursor_factory": cursor_factory, "prepare_threshold": threshold}) as conn:
+                conn.execute(QUERY, [user_id]).fetchone()
+                self._report(f"principal {label}", self._serial(lambda: conn.execute(QUERY, [user_id]).fetchone(), n))
+
+    def _report(self, label, samples, elapsed=None):
+        elapsed = elapsed if elapsed is not None else sum(samples)
+        q = statistics.quantiles(samples, n=100)
+        self.stdout.write(f"{label:<30} {q[49] * 1000:>8.3f} {q[98] * 1000:>8.3f} {len(samples) / elapsed:>8.0f}")
+
+    @staticmethod
+    def _serial(func, n):
+        samples = []
+        for _ in range(n):
+            t0 = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - t0)
+        return samples
+
+    @staticmethod
+    def _threaded(func, n, threads):
+        samples, lock = [], threading.Lock()
+
+        def worker(count):
+            local = []
+            for _ in range(count):
+                t0 = time.perf_counter()
+                func()
+                local.append(time.perf_counter() - t0)
+            with lock:
+                samples.extend(local)
+
+        workers = [threading.Thread(target=worker, args=(n // threads,)) for _ in range(threads)]
+        start = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        return samples, time.perf_counter() - start
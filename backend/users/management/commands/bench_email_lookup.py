@@ -0,0 +1,68 @@
+import statistics
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from users.models import User
+
+BENCH_DOMAIN = "bench.shift-scheduler.local"
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la latencia de la búsqueda de email duplicado (email normalizado vs "
+        "email__iexact) a medida que crece users_user. Todo corre en una transacción "
+        "que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000,1000000",
+                            help="Tamaños de tabla a medir, separados por comas.")
+        parser.add_argument("--lookups", type=int, default=200, help="Búsquedas por medición.")
+
+    def handle(self, *args, **opts):
+        sizes = sorted(int(s) for s in opts["sizes"].split(","))
+        password = make_password("Turno2025!")
+
+        self.stdout.write(f"{'filas':>10} {'normalizado p50 µs':>20} {'iexact p50 µs':>15}")
+        with transaction.atomic():
+            inserted = 0
+            for size in sizes:
+                if size > inserted:
+                    self._insert(inserted, size, password)
+                    inserted = size
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE users_user")
+
+                targets = [f"Bench{(i * 7919) % size}@{BENCH_DOMAIN}" for i in range(opts["lookups"])]
+                normalized = self._time(
+                    lambda e: User.objects.filter(email=User.objects.normalize_email(e)).exists(), targets
+                )
+                iexact = self._time(lambda e: User.objects.filter(email__iexact=e).exists(), targets)
+                self.stdout.write(f"{size:>10} {normalized:>20.1f} {iexact:>15.1f}")
+            transaction.set_rollback(True)
+
+    def _insert(self, start, stop, password):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO users_user (password, is_superuser, is_staff, is_active, date_joined, updated_at,
+                                        email, first_name, last_name, role, status, perms_mask)
+                SELECT %s, false, false, true, now(), now(),
+                       'bench' || g || '@{BENCH_DOMAIN}', 'Bench', 'User' || g,
+                       'EMPLEADO', 'ACTIVE', 0
+                FROM generate_series(%s, %s) AS g
+                """,
+                [password, start, stop - 1],
+            )
+
+    @staticmethod
+    def _time(fn, targets):
+        samples = []
+        for email in targets:
+            t0 = time.perf_counter()
+            assert fn(email)
+            samples.append((time.perf_counter() - t0) * 1e6)
+        return statistics.median(samples)
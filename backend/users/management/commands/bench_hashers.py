@@ -0,0 +1,68 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.utils.module_loading import import_string
+
+# (algoritmo, parámetros) a comparar además de la configuración actual.
+CONFIGS = [
+    ("pbkdf2", {"PBKDF2_ITERATIONS": 1_000_000}),
+    ("pbkdf2", {"PBKDF2_ITERATIONS": 600_000}),
+    ("argon2", {"ARGON2_TIME_COST": 2, "ARGON2_MEMORY_COST": 65536, "ARGON2_PARALLELISM": 1}),
+    ("argon2", {"ARGON2_TIME_COST": 2, "ARGON2_MEMORY_COST": 19456, "ARGON2_PARALLELISM": 1}),
+    ("scrypt", {"SCRYPT_WORK_FACTOR": 2**14, "SCRYPT_BLOCK_SIZE": 8, "SCRYPT_PARALLELISM": 1}),
+    ("scrypt", {"SCRYPT_WORK_FACTOR": 2**15, "SCRYPT_BLOCK_SIZE": 8, "SCRYPT_PARALLELISM": 1}),
+]
+
+PARAM_PREFIX = {"pbkdf2": "PBKDF2_", "argon2": "ARGON2_", "scrypt": "SCRYPT_"}
+
+
+class Command(BaseCommand):
+    help = "Mide logins/segundo por worker para cada configuración de hasher."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=20, help="Verificaciones por configuración.")
+        parser.add_argument("--workers", type=int, default=3, help="Workers de gunicorn a extrapolar.")
+
+    def handle(self, *args, **opts):
+        current = (settings.PASSWORD_HASHER, {
+            name: getattr(settings, name)
+            for name in dir(settings)
+            if name.startswith(PARAM_PREFIX[settings.PASSWORD_HASHER])
+        })
+        header = f"{'hasher':<8} {'params':<60} {'hash ms':>9} {'login ms':>9} {'login/s/worker':>15} {'login/s total':>14}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        for algorithm, params in [current] + CONFIGS:
+            try:
+                hash_ms, check_ms = self._measure(algorithm, params, opts["rounds"])
+            except (ValueError, ImportError) as e:
+                self.stdout.write(f"{algorithm:<8} {self._fmt(params):<60} no disponible: {e}")
+                continue
+            per_worker = 1000 / check_ms
+            self.stdout.write(
+                f"{algorithm:<8} {self._fmt(params):<60} {hash_ms:>9.1f} {check_ms:>9.1f} "
+                f"{per_worker:>15.1f} {per_worker * opts['workers']:>14.1f}"
+            )
+
+    def _measure(self, algorithm, params, rounds):
+        with override_settings(**params):
+            hasher = import_string(settings._PASSWORD_HASHERS[algorithm])()
+            password = "Turno2025!"
+
+            start = time.perf_counter()
+            encoded = hasher.encode(password, hasher.salt())
+            hash_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                if not hasher.verify(password, encoded):
+                    raise ValueError("verificación fallida")
+            check_ms = (time.perf_counter() - start) * 1000 / rounds
+        return hash_ms, check_ms
+
+    @staticmethod
+    def _fmt(params):
+        return ", ".join(f"{k.split('_', 1)[1].lower()}={v}" for k, v in params.items())
@@ -0,0 +1,59 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import resolve
+
+
+class Command(BaseCommand):
+    help = (
+        "Coste por llamada de registrar métricas (core.metrics): contador, histograma "
+        "y MetricsMiddleware completo alrededor de una vista vacía. Sin "
+        "PROMETHEUS_MULTIPROC_DIR usa un directorio temporal (modo multiproceso, mmap)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200000)
+
+    def handle(self, *args, **o):
+        tmp = None
+        if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            if "prometheus_client" in sys.modules:
+                raise CommandError("prometheus_client ya está importado; exporta PROMETHEUS_MULTIPROC_DIR.")
+            tmp = os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="bench-metrics-")
+        self.stdout.write(f"PROMETHEUS_MULTIPROC_DIR={os.environ['PROMETHEUS_MULTIPROC_DIR']}")
+        try:
+            self._bench(o["iterations"])
+        finally:
+            if tmp:
+                shutil.rmtree(tmp, ignore_errors=True)
+
+    def _bench(self, n):
+        with override_settings(METRICS_ENABLED=True):
+            from core import metrics
+
+            request = RequestFactory().get("/api/auth/me")
+            request.resolver_match = resolve("/api/auth/me")
+            response = HttpResponse()
+            middleware = metrics.MetricsMiddleware(lambda r: response)
+            labeled = metrics._get()["request"]
+
+            cases = [
+                ("vacío (referencia)", lambda: None),
+                ("contador caché", lambda: metrics.cache_lookup("principal", "local_hits")),
+                ("histograma .labels()", lambda: labeled.labels("auth-me", "GET", "200").observe(0.01)),
+                ("observe_request", lambda: metrics.observe_request("auth-me", "GET", 200, 0.01)),
+                ("middleware completo", lambda: middleware(request)),
+            ]
+            self.stdout.write(f"{'operación':<24} {'µs/llamada':>10}")
+            for label, func in cases:
+                func()
+                t0 = time.perf_counter()
+                for _ in range(n):
+                    func()
+                self.stdout.write(f"{label:<24} {(time.perf_counter() - t0) / n * 1e6:>10.2f}")
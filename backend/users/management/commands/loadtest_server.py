@@ -0,0 +1,215 @@
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import User
+from .seed_users import SEED_DOMAIN, SEED_PASSWORD
+
+BENCH_DOMAIN = "loadtest.shift-scheduler.local"
+PASSWORD = "Loadtest-123!"
+
+# Mismos argumentos que deploy/entrypoint.sh
+SERVERS = {
+    "wsgi": ["core.wsgi:application"],
+    "asgi": ["core.asgi:application", "-k", "uvicorn_worker.UvicornWorker"],
+}
+
+ENDPOINTS = ["login", "me", "refresh", "detail", "access"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Levanta gunicorn en modo WSGI y en modo ASGI (uvicorn workers) con el mismo "
+        "número de workers y mide peticiones/s y p50/p95/p99 de login, me, "
+        "token/refresh, users/<id> y users/<id>/access. Con usuarios de seed_users, "
+        "login y las vistas por id rotan entre --targets de ellos. --json guarda los "
+        "resultados para comparar entre versiones. Crea usuarios de prueba y los borra "
+        "al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=3)
+        parser.add_argument("--concurrency", type=int, default=32, help="Clientes simultáneos.")
+        parser.add_argument("--seconds", type=float, default=10.0, help="Duración de cada escenario.")
+        parser.add_argument("--port", type=int, default=8011)
+        parser.add_argument("--modes", nargs="+", choices=sorted(SERVERS), default=["wsgi", "asgi"])
+        parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+        parser.add_argument("--targets", type=int, default=1000,
+                            help="Usuarios de seed_users entre los que rotar (0 = solo los de la prueba).")
+        parser.add_argument("--seed", type=int, default=42, help="Semilla para elegir los usuarios.")
+        parser.add_argument("--json", metavar="FICHERO", help="Guarda los resultados en JSON.")
+        parser.add_argument("--env", action="append", default=[], metavar="CLAVE=VALOR",
+                            help="Variable de entorno extra para gunicorn (p.ej. DB_POOL=True).")
+
+    def handle(self, *args, **o):
+        User.objects.filter(email__endswith=BENCH_DOMAIN).delete()
+        admin = User.objects.create_user(
+            email=f"admin@{BENCH_DOMAIN}", password=PASSWORD,
+            first_name="Load", last_name="Test", role=User.Role.ADMIN,
+        )
+        target = User.objects.create_user(
+            email=f"empleado@{BENCH_DOMAIN}", password=None,
+            first_name="Load", last_name="Target", role=User.Role.EMPLEADO,
+        )
+        seeded = self._seeded(o["targets"], o["seed"])
+        target_ids = [pk for pk, _ in seeded] or [target.pk]
+        logins = [(email, SEED_PASSWORD) for _, email in seeded] or [(admin.email, PASSWORD)]
+
+        refresh = RefreshToken.for_user(admin)
+        auth = {"Authorization": f"Bearer {refresh.access_token}"}
+        json_headers = {"Content-Type": "application/json"}
+        # Cada escenario es una lista de peticiones; cada cliente las recorre al azar
+        scenarios = {
+            "me": [("GET", "/api/auth/me", None, auth)],
+            "refresh": [("POST", "/api/auth/token/refresh", json.dumps({"refresh": str(refresh)}), json_headers)],
+            "detail": [("GET", f"/api/auth/users/{pk}", None, auth) for pk in target_ids],
+            "access": [("GET", f"/api/auth/users/{pk}/access", None, auth) for pk in target_ids],
+            "login": [
+                ("POST", "/api/auth/login", json.dumps({"email": email, "password": password}), json_headers)
+                for email, password in logins
+            ],
+        }
+
+        self.stdout.write(
+            f"{o['workers']} workers, {o['concurrency']} clientes, {o['seconds']:.0f} s por escenario, "
+            f"{len(target_ids)} usuarios objetivo"
+        )
+        self.stdout.write(
+            f"{'modo':<6} {'endpoint':<8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errores':>8}"
+        )
+        results = []
+        try:
+            for mode in o["modes"]:
+                server = self._start(mode, o["workers"], o["port"], o["env"])
+                try:
+                    for name in o["endpoints"]:
+                        self._run(o["port"], scenarios[name], 1.0, o["concurrency"])  # calentamiento
+                        samples, errors, elapsed = self._run(
+                            o["port"], scenarios[name], o["seconds"], o["concurrency"]
+                        )
+                        if not samples:
+                            raise CommandError(f"{mode} {name}: ninguna respuesta correcta ({errors} errores)")
+                        q = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+                        row = {
+                            "mode": mode, "endpoint": name, "requests": len(samples), "errors": errors,
+                            "throughput": round(len(samples) / elapsed, 1),
+                            "p50_ms": round(q[49] * 1000, 2), "p95_ms": round(q[94] * 1000, 2),
+                            "p99_ms": round(q[98] * 1000, 2),
+                            "mean_ms": round(statistics.fmean(samples) * 1000, 2),
+                        }
+                        results.append(row)
+                        self.stdout.write(
+                            f"{mode:<6} {name:<8} {row['throughput']:>8.0f} {row['p50_ms']:>8.1f} "
+                            f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {errors:>8}"
+                        )
+                finally:
+                    server.terminate()
+                    server.wait(timeout=30)
+        finally:
+            User.objects.filter(email__endswith=BENCH_DOMAIN).delete()
+
+        if o["json"]:
+            report = {
+                "created_at": timezone.now().isoformat(),
+                "git_commit": self._git_commit(),
+                "workers": o["workers"], "concurrency": o["concurrency"], "seconds": o["seconds"],
+                "users": User.objects.count(), "targets": len(target_ids),
+                "env": o["env"], "results": results,
+            }
+            with open(o["json"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Resultados en {o['json']}")
+
+    @staticmethod
+    def _seeded(count, seed):
+        """(id, email) de `count` usuarios activos de seed_users, elegidos de forma reproducible."""
+        if not count:
+            return []
+        qs = User.objects.filter(
+            email__endswith=f"@{SEED_DOMAIN}", status=User.Status.ACTIVE, is_active=True
+        ).order_by("id")
+        ids = list(qs.values_list("id", flat=True))
+        chosen = random.Random(seed).sample(ids, min(count, len(ids)))
+        return list(User.objects.filter(pk__in=chosen).order_by("id").values_list("id", "email"))
+
+    @staticmethod
+    def _git_commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def _start(self, mode, workers, port, extra_env):
+        env = {**os.environ, "SERVER_MODE": mode}
+        env.pop("ASYNC_VIEWS", None)
+        # Se mide el servidor, no el throttling de login (users.throttling)
+        for kind in ("IP", "EMAIL", "ENDPOINT"):
+            env.setdefault(f"THROTTLE_LOGIN_{kind}", "")
+        env.update(item.split("=", 1) for item in extra_env)
+        cmd = [
+            sys.executable, "-m", "gunicorn", *SERVERS[mode],
+            "--bind", f"127.0.0.1:{port}", "--workers", str(workers), "--log-level", "warning",
+        ]
+        server = subprocess.Popen(cmd, cwd=settings.BASE_DIR, env=env)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"gunicorn ({mode}) terminó con código {server.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f"gunicorn ({mode}) no respondió en 30 s")
+
+    @staticmethod
+    def _run(port, requests, seconds, concurrency):
+        samples, lock = [], threading.Lock()
+        errors = [0]
+        deadline = time.perf_counter() + seconds
+
+        def client(seed):
+            rng = random.Random(seed)
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            local, failed = [], 0
+            while time.perf_counter() < deadline:
+                method, path, body, headers = rng.choice(requests)
+                t0 = time.perf_counter()
+                try:
+                    conn.request(method, path, body=body, headers=headers)
+                    response = conn.getresponse()
+                    response.read()
+                    ok = response.status == 200
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    ok = False
+                if ok:
+                    local.append(time.perf_counter() - t0)
+                else:
+                    failed += 1
+            conn.close()
+            with lock:
+                samples.extend(local)
+                errors[0] += failed
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            for i in range(concurrency):
+                pool.submit(client, i)
+        return samples, errors[0], time.perf_counter() - start
@@ -0,0 +1,150 @@
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from users.models import User
+from users.perms import ALL_PERMS_MASK
+
+SEED_DOMAIN = "seed.shift-scheduler.local"
+SEED_PASSWORD = "Seed-Turno-123!"
+CLEAR_BATCH = 2000
+
+FIRST_NAMES = (
+    "María", "José", "Ana", "Juan", "Lucía", "Carlos", "Sofía", "Luis", "Paula", "Javier",
+    "Elena", "Miguel", "Laura", "David", "Carmen", "Pablo", "Marta", "Diego", "Sara", "Jorge",
+    "Valentina", "Andrés", "Camila", "Fernando", "Isabel", "Raúl", "Natalia", "Sergio", "Julia", "Álvaro",
+)
+LAST_NAMES = (
+    "García", "Rodríguez", "González", "Fernández", "López", "Martínez", "Sánchez", "Pérez", "Gómez",
+    "Martín", "Jiménez", "Ruiz", "Hernández", "Díaz", "Moreno", "Muñoz", "Álvarez", "Romero", "Alonso",
+    "Gutiérrez", "Navarro", "Torres", "Domínguez", "Vázquez", "Ramos", "Gil", "Ramírez", "Serrano",
+    "Blanco", "Molina", "Castro", "Ortiz", "Rubio", "Marín", "Sanz", "Núñez", "Iglesias", "Medina",
+)
+# (valor, peso) de cada reparto
+ROLES = ((User.Role.EMPLEADO, 90), (User.Role.GERENTE, 7), (User.Role.ADMIN, 3))
+STATUSES = ((User.Status.ACTIVE, 85), (User.Status.INACTIVE, 10), (User.Status.BLOCKED, 5))
+
+COLUMNS = (
+    "password", "last_login", "is_superuser", "is_staff", "is_active", "date_joined",
+    "email", "first_name", "last_name", "telefono", "role", "status", "perms_mask", "updated_at",
+)
+
+
+def _ascii(name):
+    return name.lower().translate(str.maketrans("áéíóúñ", "aeioun"))
+
+
+class Command(BaseCommand):
+    help = (
+        f"Genera usuarios de prueba en users_user con COPY (dominio {SEED_DOMAIN}, "
+        f"contraseña {SEED_PASSWORD!r}, hasheada una sola vez con el hasher por defecto). "
+        "Roles y estados mezclados y reproducibles con --seed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1_000_000)
+        parser.add_argument("--seed", type=int, default=42, help="Semilla del generador aleatorio.")
+        parser.add_argument("--chunk", type=int, default=50_000, help="Filas por bloque enviado a COPY.")
+        parser.add_argument("--clear", action="store_true",
+                            help=f"Borra antes los usuarios de {SEED_DOMAIN}.")
+        parser.add_argument("--keep-indexes", action="store_true",
+                            help="No quita los índices no únicos durante la carga (más lento).")
+
+    def handle(self, *args, **o):
+        if o["clear"]:
+            t0 = time.perf_counter()
+            deleted = self._clear()
+            self.stdout.write(f"Borrados {deleted} usuarios de {SEED_DOMAIN} en {time.perf_counter() - t0:.1f} s")
+
+        started = time.perf_counter()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COALESCE(MAX(split_part(split_part(email, '@', 1), '.', 3)::int) + 1, 0) "
+                "FROM users_user WHERE email LIKE %s",
+                [f"%@{SEED_DOMAIN}"],
+            )
+            offset = cursor.fetchone()[0]
+
+        rng = random.Random(o["seed"] + offset)
+        password = make_password(SEED_PASSWORD)
+        now = timezone.now()
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Reconstruir un índice al final es mucho más rápido que mantenerlo
+            # fila a fila; los únicos se quedan para que COPY siga validando.
+            indexes = [] if o["keep_indexes"] else self._secondary_indexes(cursor)
+            for name, _ in indexes:
+                cursor.execute(f'DROP INDEX "{name}"')
+            with cursor.copy(f"COPY users_user ({', '.join(COLUMNS)}) FROM STDIN") as copy:
+                for start in range(offset, offset + o["count"], o["chunk"]):
+                    stop = min(start + o["chunk"], offset + o["count"])
+                    copy.write(self._chunk(rng, start, stop, password, now))
+            if indexes:
+                cursor.execute("SET LOCAL maintenance_work_mem = '256MB'")
+            for _, definition in indexes:
+                cursor.execute(definition)
+            cursor.execute("ANALYZE users_user")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{o['count']} usuarios insertados en {elapsed:.1f} s ({o['count'] / elapsed:,.0f} filas/s)"
+        ))
+
+    @staticmethod
+    def _chunk(rng, start, stop, password, now):
+        roles, role_w = zip(*ROLES)
+        statuses, status_w = zip(*STATUSES)
+        n = stop - start
+        role_col = rng.choices(roles, role_w, k=n)
+        status_col = rng.choices(statuses, status_w, k=n)
+        firsts = rng.choices(FIRST_NAMES, k=n)
+        lasts = rng.choices(LAST_NAMES, k=n)
+        joined = now.isoformat()
+        lines = []
+        for i in range(n):
+            first, last, role, status = firsts[i], lasts[i], role_col[i], status_col[i]
+            if role == User.Role.EMPLEADO:
+                mask = 0
+            elif role == User.Role.ADMIN:
+                mask = ALL_PERMS_MASK
+            else:
+                mask = rng.randrange(ALL_PERMS_MASK + 1)
+            phone = f"6{rng.randrange(10**8):08d}" if rng.random() < 0.7 else "\\N"
+            lines.append(
+                f"{password}\t\\N\tf\tf\t"
+                f"{'f' if status == User.Status.INACTIVE else 't'}\t{joined}\t"
+                f"{_ascii(first)}.{_ascii(last)}.{start + i}@{SEED_DOMAIN}\t{first}\t{last}\t{phone}\t"
+                f"{role}\t{status}\t{mask}\t{joined}\n"
+            )
+        return "".join(lines)
+
+    @staticmethod
+    def _secondary_indexes(cursor):
+        """(nombre, CREATE INDEX ...) de los índices no únicos de users_user."""
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_indexdef(i.indexrelid)
+            FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = 'users_user'::regclass AND NOT i.indisunique
+            """
+        )
+        return cursor.fetchall()
+
+    @staticmethod
+    def _clear():
+        # Por el ORM y no con un DELETE directo: aplica los on_delete de turnos,
+        # jobs, disponibilidad... y el pre_delete de scheduling (los turnos de
+        # los borrados quedan abiertos y LaborRollup cuadra). En bloques por id
+        # para no cargar todos los usuarios en memoria ni en una transacción.
+        qs = User.objects.filter(email__endswith=f"@{SEED_DOMAIN}").order_by("id")
+        deleted, last = 0, 0
+        while batch := list(qs.filter(pk__gt=last).values_list("id", flat=True)[:CLEAR_BATCH]):
+            with transaction.atomic():
+                _, per_model = User.objects.filter(pk__in=batch).delete()
+            deleted += per_model.get(User._meta.label, 0)
+            last = batch[-1]
+        return deleted
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:04
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower, Trim
+
+
+def normalize_emails(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    duplicated = list(
+        User.objects.annotate(norm=Lower(Trim("email")))
+        .values("norm")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+        .values_list("norm", flat=True)
+    )
+    if duplicated:
+        raise RuntimeError(
+            "Hay emails duplicados sin distinguir mayúsculas; resuélvelos antes de migrar: "
+            + ", ".join(duplicated)
+        )
+    User.objects.exclude(email=Lower(Trim("email"))).update(email=Lower(Trim("email")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0005_user_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='users_user_email_ci_uniq'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:07
+
+import users.models
+from django.db import migrations, models
+from django.db.models import F
+
+# Copia congelada del registro (users.perms) al momento de esta migración
+PERM_BITS = {"ver": 1, "crear": 2, "editar": 4, "eliminar": 8, "aprobar": 16}
+
+
+def json_to_mask(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    for name, bit in PERM_BITS.items():
+        User.objects.filter(permissions__contains=[name]).update(perms_mask=F("perms_mask").bitor(bit))
+
+
+def mask_to_json(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    for mask in range(1, 1 << len(PERM_BITS)):
+        perms = [name for name, bit in PERM_BITS.items() if mask & bit]
+        User.objects.filter(perms_mask=mask).update(permissions=perms)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0007_user_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='perms_mask',
+            field=users.models.PermissionMaskField(default=0),
+        ),
+        migrations.RunPython(json_to_mask, mask_to_json),
+        migrations.RemoveField(
+            model_name='user',
+            name='permissions',
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('perms_mask__has', 1)), fields=['id'], name='users_perm_ver_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('perms_mask__has', 2)), fields=['id'], name='users_perm_crear_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('perms_mask__has', 4)), fields=['id'], name='users_perm_editar_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('perms_mask__has', 8)), fields=['id'], name='users_perm_eliminar_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('perms_mask__has', 16)), fields=['id'], name='users_perm_aprobar_idx'),
+        ),
+    ]
@@ -1,10 +1,43 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.db.models.functions import Lower
+from django.contrib.postgres.indexes import OpClass
+
+from .perms import PERM_BITS, to_list, to_mask
+
+
+class PermissionMaskField(models.PositiveSmallIntegerField):
+    """Máscara de bits de users.perms; admite el lookup `__has`."""
+
+
+@PermissionMaskField.register_lookup
+class HasPerms(models.Lookup):
+    """perms_mask__has=BITS  ->  (perms_mask & BITS) = BITS"""
+    lookup_name = "has"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"({lhs} & {rhs}) = {rhs}", (*lhs_params, *rhs_params, *rhs_params)
 
 
 class UserManager(BaseUserManager):
     """Manager personalizado para usar email como identificador principal."""
 
+    @classmethod
+    def normalize_email(cls, email):
+        # El email se guarda siempre en minúsculas: así las búsquedas exactas
+        # usan el índice único y la restricción sobre LOWER(email) nunca choca
+        # con datos existentes.
+        return (email or "").strip().lower()
+
+    def get_by_natural_key(self, email):
+        return self.get(email=self.normalize_email(email))
+
+    def with_permission(self, name):
+        """Usuarios con el permiso `name`; usa el índice parcial de ese bit."""
+        return self.filter(perms_mask__has=PERM_BITS[name])
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError("El email es obligatorio.")
@@ -46,7 +79,8 @@ class User(AbstractUser):
     role = models.CharField(max_length=10, choices=Role.choices, default=Role.EMPLEADO)
     status = models.CharField(max_length=10, choices=Status.choices, default=Status.ACTIVE)
 
-    permissions = models.JSONField(default=list, blank=True)
+    perms_mask = PermissionMaskField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["first_name", "last_name"]
@@ -54,5 +88,47 @@ class User(AbstractUser):
     # 👇 Aquí enlazamos el nuevo manager
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Filtros del directorio (role/status) y paginación por keyset
+            models.Index(fields=["role", "status", "id"], name="users_role_status_id_idx"),
+            models.Index(fields=["last_name", "id"], name="users_last_name_id_idx"),
+            # Búsqueda por prefijo de email sin distinguir mayúsculas (LIKE 'abc%')
+            models.Index(OpClass(Lower("email"), name="text_pattern_ops"), name="users_email_lower_idx"),
+            # Ídem por nombre y apellido: ?q= sin "@" combina los tres con OR (BitmapOr)
+            models.Index(OpClass(Lower("first_name"), name="text_pattern_ops"), name="users_first_name_lower_idx"),
+            models.Index(OpClass(Lower("last_name"), name="text_pattern_ops"), name="users_last_name_lower_idx"),
+        ] + [
+            # "Usuarios con permiso X": un índice parcial pequeño por bit
+            models.Index(
+                fields=["id"],
+                condition=models.Q(perms_mask__has=bit),
+                name=f"users_perm_{name}_idx",
+            )
+            for name, bit in PERM_BITS.items()
+        ]
+        constraints = [
+            # Unicidad sin distinguir mayúsculas; cierra la carrera entre
+            # el exists() de los serializers y el INSERT.
+            models.UniqueConstraint(Lower("email"), name="users_user_email_ci_uniq"),
+        ]
+
+    @property
+    def permissions(self):
+        """Lista de permisos (API compatible con el antiguo JSONField)."""
+        return to_list(self.perms_mask)
+
+    @permissions.setter
+    def permissions(self, perms):
+        self.perms_mask = to_mask(perms)
+
+    def has_permission(self, name):
+        bit = PERM_BITS[name]
+        return self.perms_mask & bit == bit
+
+    def save(self, *args, **kwargs):
+        self.email = User.objects.normalize_email(self.email)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.email} ({self.role})"
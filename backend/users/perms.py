@@ -0,0 +1,29 @@
+"""
+Registro de permisos de acceso y su representación como máscara de bits.
+
+El orden de PERMISSIONS fija el bit de cada permiso: solo se pueden añadir
+permisos al final.
+"""
+
+PERMISSIONS = ("ver", "crear", "editar", "eliminar", "aprobar")
+PERM_BITS = {name: 1 << i for i, name in enumerate(PERMISSIONS)}
+ALL_PERMS_MASK = (1 << len(PERMISSIONS)) - 1
+
+# Lista de permisos precalculada para cada máscara posible
+_MASK_TO_LIST = [
+    [name for name in PERMISSIONS if mask & PERM_BITS[name]]
+    for mask in range(ALL_PERMS_MASK + 1)
+]
+
+
+def to_mask(perms):
+    """["ver", "editar"] -> 0b101. Lanza KeyError si algún permiso no existe."""
+    mask = 0
+    for name in perms:
+        mask |= PERM_BITS[name]
+    return mask
+
+
+def to_list(mask):
+    """0b101 -> ["ver", "editar"] (en el orden del registro)."""
+    return list(_MASK_TO_LIST[mask & ALL_PERMS_MASK])
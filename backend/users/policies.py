@@ -0,0 +1,84 @@
+"""
+Política de acceso rol -> permisos para las vistas administrativas.
+
+La tabla ROLE_POLICY se compila a máscaras de bits (users.perms) al importar
+el módulo; evaluar una decisión es un AND sobre el rol del principal, sin
+consultas a la BD.
+
+Uso en una vista:
+
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"GET": "ver", "PUT": "editar"}
+    permission_denied_messages = {"PUT": "No tienes permiso para editar usuarios."}
+"""
+import threading
+from collections import Counter
+
+from rest_framework.permissions import BasePermission
+
+from .perms import PERM_BITS, PERMISSIONS, to_mask
+
+ROLE_POLICY = {
+    "ADMIN": PERMISSIONS,
+    "GERENTE": PERMISSIONS,
+    "EMPLEADO": (),
+}
+
+_ROLE_MASKS = {role: to_mask(perms) for role, perms in ROLE_POLICY.items()}
+
+DEFAULT_DENIED_MESSAGE = "No tienes permiso para realizar esta acción."
+
+_denials = Counter()
+_denials_lock = threading.Lock()
+
+
+def role_allows(role, perm):
+    bit = PERM_BITS[perm]
+    return _ROLE_MASKS.get(role, 0) & bit == bit
+
+
+def denials():
+    """Denegaciones por endpoint en el proceso actual."""
+    with _denials_lock:
+        return dict(_denials)
+
+
+def _count_denial(endpoint):
+    with _denials_lock:
+        _denials[endpoint] += 1
+
+
+class RolePolicyPermission(BasePermission):
+    """
+    Exige usuario autenticado y que su rol conceda el permiso que la vista
+    declara para el método HTTP en `required_perms`. Los métodos sin entrada
+    solo requieren autenticación.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+
+        method = "GET" if request.method == "HEAD" else request.method
+        perm = getattr(view, "required_perms", {}).get(method)
+        if perm is None:
+            return True
+
+        # Caché de decisiones del request (se comparte entre vistas anidadas)
+        django_request = request._request
+        decisions = getattr(django_request, "_policy_decisions", None)
+        if decisions is None:
+            decisions = django_request._policy_decisions = {}
+        key = (user.role, perm)
+        allowed = decisions.get(key)
+        if allowed is None:
+            allowed = decisions[key] = role_allows(user.role, perm)
+
+        if not allowed:
+            match = request.resolver_match
+            _count_denial(match.url_name if match and match.url_name else type(view).__name__)
+            self.message = getattr(view, "permission_denied_messages", {}).get(
+                method, DEFAULT_DENIED_MESSAGE
+            )
+        return allowed
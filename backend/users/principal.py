@@ -0,0 +1,196 @@
+"""
+Caché del principal autenticado (request.user).
+
+Dos niveles:
+  1. LRU en memoria del proceso, acotado por PRINCIPAL_CACHE_MAX_SIZE.
+  2. Caché de Django (compartida entre workers si el backend lo es).
+
+Cada usuario tiene una "versión" en la caché de Django. Una entrada (local o
+compartida) solo es válida si fue construida con la versión vigente; invalidar
+consiste en rotar la versión, sin necesidad de borrar nada en cada proceso.
+"""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core import metrics
+
+from .models import User
+
+# Campos que se cargan en el principal. El resto (p.ej. password) queda
+# diferido: si alguien lo accede se consulta la BD, y save() nunca lo pisa.
+PRINCIPAL_FIELDS = (
+    "id", "email", "first_name", "last_name", "telefono",
+    "role", "status", "perms_mask", "is_active", "is_staff", "is_superuser",
+)
+
+# Model.from_db() espera los valores en el orden de los campos concretos.
+_ORDERED_FIELDS = tuple(
+    f.attname for f in User._meta.concrete_fields if f.attname in PRINCIPAL_FIELDS
+)
+
+_VERSION_KEY = "principal:v:{}"
+_DATA_KEY = "principal:{}:{}"
+
+
+def _max_size():
+    return getattr(settings, "PRINCIPAL_CACHE_MAX_SIZE", 10000)
+
+
+def _ttl():
+    return getattr(settings, "PRINCIPAL_CACHE_TTL", 300)
+
+
+class _LRU:
+    """LRU thread-safe con expiración por entrada."""
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[2] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, version, row):
+        with self._lock:
+            self._data[key] = (version, row, time.monotonic() + _ttl())
+            self._data.move_to_end(key)
+            while len(self._data) > _max_size():
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_local = _LRU()
+_stats_lock = threading.Lock()
+_stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+    metrics.cache_lookup("principal", name)
+
+
+def stats():
+    """Contadores de aciertos/fallos del proceso actual."""
+    with _stats_lock:
+        data = dict(_stats)
+    data["size"] = len(_local)
+    return data
+
+
+def reset_stats():
+    with _stats_lock:
+        for k in _stats:
+            _stats[k] = 0
+
+
+def _current_version(user_id):
+    key = _VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Versión desconocida (nunca creada o desalojada): se genera una nueva,
+        # con lo que cualquier entrada previa queda automáticamente obsoleta.
+        cache.add(key, secrets.token_hex(8), None)
+        version = cache.get(key)
+    return version
+
+
+def _build(row):
+    return User.from_db("default", _ORDERED_FIELDS, [row[f] for f in _ORDERED_FIELDS])
+
+
+def get_principal(user_id):
+    """Devuelve el User para `user_id` sin tocar la BD si está en caché, o None."""
+    version = _current_version(user_id)
+
+    entry = _local.get(user_id)
+    if entry is not None and entry[0] == version:
+        _count("local_hits")
+        return _build(entry[1])
+
+    data_key = _DATA_KEY.format(user_id, version)
+    row = cache.get(data_key)
+    if row is not None:
+        _count("shared_hits")
+    else:
+        _count("misses")
+        row = User.objects.filter(pk=user_id).values(*PRINCIPAL_FIELDS).first()
+        if row is None:
+            return None
+        cache.set(data_key, row, _ttl())
+
+    _local.set(user_id, version, row)
+    return _build(row)
+
+
+async def _acurrent_version(user_id):
+    key = _VERSION_KEY.format(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, secrets.token_hex(8), None)
+        version = await cache.aget(key)
+    return version
+
+
+async def aget_principal(user_id):
+    """Versión async de get_principal() para las vistas ASGI (users.async_views)."""
+    version = await _acurrent_version(user_id)
+
+    entry = _local.get(user_id)
+    if entry is not None and entry[0] == version:
+        _count("local_hits")
+        return _build(entry[1])
+
+    data_key = _DATA_KEY.format(user_id, version)
+    row = await cache.aget(data_key)
+    if row is not None:
+        _count("shared_hits")
+    else:
+        _count("misses")
+        row = await User.objects.filter(pk=user_id).values(*PRINCIPAL_FIELDS).afirst()
+        if row is None:
+            return None
+        await cache.aset(data_key, row, _ttl())
+
+    _local.set(user_id, version, row)
+    return _build(row)
+
+
+def invalidate_principal(user_id):
+    """Rota la versión del usuario; todas las copias cacheadas quedan inválidas."""
+    cache.set(_VERSION_KEY.format(user_id), secrets.token_hex(8), None)
+    _local.discard(user_id)
+
+
+def invalidate_principals(user_ids):
+    """invalidate_principal() para muchos usuarios con un solo set_many."""
+    cache.set_many({_VERSION_KEY.format(pk): secrets.token_hex(8) for pk in user_ids}, None)
+    for pk in user_ids:
+        _local.discard(pk)
+
+
+def clear_local():
+    _local.clear()
@@ -0,0 +1,15 @@
+from rest_framework.renderers import JSONRenderer
+
+
+class CSVRenderer(JSONRenderer):
+    """
+    Permite ?format=csv en vistas que responden con StreamingHttpResponse.
+    Solo se usa para renderizar respuestas de error (en JSON).
+    """
+    media_type = "text/csv"
+    format = "csv"
+
+
+class JSONLinesRenderer(JSONRenderer):
+    media_type = "application/x-ndjson"
+    format = "jsonl"
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
@@ -6,10 +7,40 @@ from django.utils.encoding import force_str, smart_bytes
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth import authenticate
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db import IntegrityError, transaction
 
 from rest_framework import serializers
 from .models import User
 from .validators import validate_password_strength
+from .principal import invalidate_principal
+from .perms import PERMISSIONS, to_list, to_mask
+
+EMAIL_TAKEN = "El correo ya está registrado."
+# Restricciones que significan "correo ya registrado": LOWER(email) y la del
+# unique=True del campo (nombre que le da PostgreSQL)
+EMAIL_CONSTRAINTS = {"users_user_email_ci_uniq", "users_user_email_key"}
+
+
+def is_email_conflict(exc):
+    """True si el IntegrityError viene de una restricción única del email."""
+    diag = getattr(exc.__cause__, "diag", None)
+    return getattr(diag, "constraint_name", None) in EMAIL_CONSTRAINTS
+
+
+def create_user_or_conflict(**fields):
+    """
+    INSERT protegido por la restricción única sobre LOWER(email): si otro
+    request registró el mismo correo entre la validación y el INSERT, se
+    devuelve el mismo error de validación en vez de un 500. Cualquier otra
+    violación de integridad se propaga.
+    """
+    try:
+        with transaction.atomic():
+            return User.objects.create(**fields)
+    except IntegrityError as e:
+        if not is_email_conflict(e):
+            raise
+        raise serializers.ValidationError({"email": EMAIL_TAKEN})
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
@@ -21,8 +52,9 @@ class RegisterSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
     def validate_email(self, value):
-        if User.objects.filter(email__iexact=value).exists():
-            raise serializers.ValidationError("El correo ya está registrado.")
+        value = User.objects.normalize_email(value)
+        if User.objects.filter(email=value).exists():
+            raise serializers.ValidationError(EMAIL_TAKEN)
         return value
 
     def validate(self, attrs):
@@ -35,7 +67,7 @@ class RegisterSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data["password"] = make_password(validated_data["password"])
-        return User.objects.create(**validated_data)
+        return create_user_or_conflict(**validated_data)
 
 class UserPublicSerializer(serializers.ModelSerializer):
     class Meta:
@@ -68,7 +100,7 @@ User = get_user_model()
 token_generator = PasswordResetTokenGenerator()
 
 ALLOWED_ROLES = {"ADMIN", "GERENTE", "EMPLEADO"}
-ALLOWED_PERMS = {"ver", "crear", "editar", "eliminar", "aprobar"}
+ALLOWED_PERMS = set(PERMISSIONS)
 
 class AssignRolePermsSerializer(serializers.Serializer):
     role = serializers.CharField(required=True)
@@ -86,27 +118,67 @@ class AssignRolePermsSerializer(serializers.Serializer):
         if invalid:
             # 👇 Criterio de aceptación: “Permiso no permitido”
             raise serializers.ValidationError([f"Permiso no permitido: {p}" for p in invalid])
-        # Quitar duplicados manteniendo el orden
-        seen = set()
-        cleaned = []
-        for p in perms:
-            if p not in seen:
-                seen.add(p)
-                cleaned.append(p)
-        return cleaned
+        # La máscara elimina duplicados; se devuelve en el orden del registro
+        return to_list(to_mask(perms))
 
     def update(self, instance, validated_data):
         instance.role = validated_data["role"]
         instance.permissions = validated_data["permissions"]
-        instance.save(update_fields=["role", "permissions"])
+        instance.save(update_fields=["role", "perms_mask", "updated_at"])
+        invalidate_principal(instance.pk)
         return instance
 
+class BulkUserActionSerializer(serializers.Serializer):
+    """
+    {"action": "block"|"activate"|"set_role"|"assign_permissions",
+     "ids": [1, 2, ...] | "filter": {"role": ..., "status": ..., "q": ..., "changed_since": ...},
+     "role": ... (set_role), "permissions": [...] (assign_permissions)}
+    """
+    FILTER_KEYS = ("role", "status", "q", "changed_since")
+
+    action = serializers.ChoiceField(choices=["block", "activate", "set_role", "assign_permissions"])
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, required=False,
+        max_length=settings.USER_BULK_ACTION_MAX_USERS,
+    )
+    filter = serializers.DictField(child=serializers.CharField(), required=False)
+    role = serializers.CharField(required=False)
+    permissions = serializers.ListField(child=serializers.CharField(), allow_empty=True, required=False)
+
+    validate_role = AssignRolePermsSerializer.validate_role
+    validate_permissions = AssignRolePermsSerializer.validate_permissions
+
+    def validate_ids(self, ids):
+        return sorted(set(ids))
+
+    def validate_filter(self, value):
+        unknown = sorted(set(value) - set(self.FILTER_KEYS))
+        if unknown:
+            raise serializers.ValidationError(f"Filtro no soportado: {', '.join(unknown)}.")
+        if not any(value.get(k) for k in self.FILTER_KEYS):
+            # Un filtro vacío seleccionaría a todos los usuarios
+            raise serializers.ValidationError("El filtro no puede estar vacío.")
+        if value.get("role") and value["role"] not in ALLOWED_ROLES:
+            raise serializers.ValidationError("Rol inválido. Use: ADMIN, GERENTE, EMPLEADO.")
+        if value.get("status") and value["status"] not in User.Status.values:
+            raise serializers.ValidationError("Estado inválido. Use: ACTIVE, BLOCKED, INACTIVE.")
+        return value
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Indica 'ids' o 'filter' (solo uno de los dos).")
+        if attrs["action"] == "set_role" and "role" not in attrs:
+            raise serializers.ValidationError({"role": "Obligatorio para set_role."})
+        if attrs["action"] == "assign_permissions" and "permissions" not in attrs:
+            raise serializers.ValidationError({"permissions": "Obligatorio para assign_permissions."})
+        return attrs
+
 class PasswordResetRequestSerializer(serializers.Serializer):
     email = serializers.EmailField()
 
     def validate_email(self, value):
         try:
-            user = User.objects.get(email__iexact=value)
+            user = User.objects.get(email=User.objects.normalize_email(value))
         except User.DoesNotExist:
             raise serializers.ValidationError("Correo no registrado.")
         self.context["user"] = user
@@ -157,15 +229,15 @@ class AdminCreateUserSerializer(serializers.ModelSerializer):
     def validate(self, data):
         if data["password"] != data["password_confirm"]:
             raise serializers.ValidationError({"password_confirm": "Las contraseñas no coinciden."})
-        if User.objects.filter(email__iexact=data["email"]).exists():
-            raise serializers.ValidationError({"email": "El correo ya está registrado."})
+        data["email"] = User.objects.normalize_email(data["email"])
+        if User.objects.filter(email=data["email"]).exists():
+            raise serializers.ValidationError({"email": EMAIL_TAKEN})
         return data
 
     def create(self, validated_data):
         validated_data.pop("password_confirm")
         validated_data["password"] = make_password(validated_data["password"])
-        user = User.objects.create(**validated_data)
-        return user
+        return create_user_or_conflict(**validated_data)
 
 class AdminUpdateUserSerializer(serializers.ModelSerializer):
     telefono = serializers.CharField(required=False, allow_blank=True, max_length=15)
@@ -180,11 +252,21 @@ class AdminUpdateUserSerializer(serializers.ModelSerializer):
         if value in (None, ""):
             return value
 
-        # Validar duplicado case-insensitive excluyendo el propio registro
-        qs = User.objects.filter(email__iexact=value)
+        # Validar duplicado (emails normalizados) excluyendo el propio registro
+        value = User.objects.normalize_email(value)
+        qs = User.objects.filter(email=value)
         if self.instance:
             qs = qs.exclude(pk=self.instance.pk)
         if qs.exists():
-            raise serializers.ValidationError("El correo ya está registrado.")
+            raise serializers.ValidationError(EMAIL_TAKEN)
         return value
 
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError as e:
+            if not is_email_conflict(e):
+                raise
+            raise serializers.ValidationError({"email": EMAIL_TAKEN})
+
@@ -1,3 +1,292 @@
-from django.test import TestCase
+"""
+Tests de rendimiento de users.
 
-# Create your tests here.
+  - QueryCountTests fija el número exacto de consultas SQL de cada endpoint;
+    se ejecuta siempre (python manage.py test users).
+  - BenchmarkTests son micro-benchmarks de serializers, validadores y del
+    despacho completo de MeView. Cada caso se compara con bench_baseline.json
+    y falla si es más lento que la línea base en más de BENCHMARK_TOLERANCE
+    (0.25 = 25 %). Solo corren con RUN_BENCHMARKS=True; con
+    UPDATE_BENCHMARKS=True se mide y se reescribe la línea base (hay que
+    generarla en la misma máquina en la que se compara).
+
+Los hashes usan PBKDF2 con pocas iteraciones: el coste del hasher se mide
+aparte con bench_hashers.
+"""
+import json
+import os
+import platform
+import statistics
+import time
+from pathlib import Path
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from audit.models import AuditEvent
+
+from .models import User
+from .perms import ALL_PERMS_MASK
+from .principal import clear_local, get_principal
+from .serializers import AssignRolePermsSerializer, LoginSerializer, UserPublicSerializer
+from .validators import validate_password_strength
+
+BASELINE_FILE = Path(__file__).with_name("bench_baseline.json")
+RUN_BENCHMARKS = os.getenv("RUN_BENCHMARKS") == "True"
+UPDATE_BENCHMARKS = os.getenv("UPDATE_BENCHMARKS") == "True"
+TOLERANCE = float(os.getenv("BENCHMARK_TOLERANCE", "0.25"))
+
+PASSWORD = "Turno2025!"
+FAST_HASHING = override_settings(PBKDF2_ITERATIONS=1000)
+
+
+def _public_users(n):
+    """Usuarios en memoria (sin BD) para medir solo la serialización."""
+    return [
+        User(id=i, first_name="Ana", last_name=f"García {i}", telefono="600000000",
+             email=f"ana.garcia.{i}@example.com", role=User.Role.EMPLEADO, status=User.Status.ACTIVE)
+        for i in range(1, n + 1)
+    ]
+
+
+def measure(func, rounds=7, min_round=0.02):
+    """
+    µs por llamada de `func` (mínimo de `rounds` rondas). Cada ronda repite la
+    llamada hasta durar al menos `min_round` segundos, como pytest-benchmark.
+    """
+    func()  # calentamiento
+    n, elapsed = 1, 0.0
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            func()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_round:
+            break
+        n *= 2
+    samples = [elapsed / n]
+    for _ in range(rounds - 1):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            func()
+        samples.append((time.perf_counter() - t0) / n)
+    return min(samples) * 1e6, statistics.median(samples) * 1e6
+
+
+class AuthFixtureMixin:
+    @classmethod
+    def setUpTestData(cls):
+        with FAST_HASHING:
+            cls.admin = User.objects.create_user(
+                email="admin@example.com", password=PASSWORD, first_name="Admin", last_name="Test",
+                role=User.Role.ADMIN, perms_mask=ALL_PERMS_MASK,
+            )
+            cls.employee = User.objects.create_user(
+                email="empleado@example.com", password=PASSWORD, first_name="Emp", last_name="Test",
+            )
+        cls.refresh = RefreshToken.for_user(cls.admin)
+        cls.auth = {"HTTP_AUTHORIZATION": f"Bearer {cls.refresh.access_token}"}
+
+    def setUp(self):
+        # Caché de principals (local y compartida) y contadores de throttling vacíos
+        cache.clear()
+        clear_local()
+
+
+@FAST_HASHING
+class QueryCountTests(AuthFixtureMixin, TestCase):
+    def test_me(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/api/auth/me", **self.auth).status_code, 200)
+        # Con el principal en caché no se consulta la BD
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/auth/me", **self.auth).status_code, 200)
+
+    def test_login(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                "/api/auth/login", {"email": self.admin.email, "password": PASSWORD},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_login_invalid(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                "/api/auth/login", {"email": self.admin.email, "password": "incorrecta1"},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 401)
+
+    def test_token_refresh(self):
+        # simplejwt comprueba que el usuario sigue activo
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                "/api/auth/token/refresh", {"refresh": str(self.refresh)}, content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_register(self):
+        data = {
+            "email": "nuevo@example.com", "password": PASSWORD, "password_confirm": PASSWORD,
+            "first_name": "Nuevo", "last_name": "Usuario",
+        }
+        # El email se comprueba dos veces (UniqueValidator del modelo y validate_email)
+        with self.assertNumQueries(5):
+            response = self.client.post("/api/auth/register", data, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+
+    def test_password_reset_request(self):
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                "/api/auth/password/reset", {"email": self.employee.email}, content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_list(self):
+        self.client.get("/api/auth/me", **self.auth)  # principal en caché
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/auth/users?limit=50", **self.auth)
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_detail(self):
+        self.client.get("/api/auth/me", **self.auth)
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/auth/users/{self.employee.pk}", **self.auth)
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_access_get(self):
+        self.client.get("/api/auth/me", **self.auth)
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/auth/users/{self.employee.pk}/access", **self.auth)
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_access_put(self):
+        self.client.get("/api/auth/me", **self.auth)
+        # SELECT, SAVEPOINT, UPDATE, RELEASE y el INSERT de auditoría en on_commit
+        with self.assertNumQueries(5), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                f"/api/auth/users/{self.employee.pk}/access",
+                {"role": "GERENTE", "permissions": ["ver", "editar"]},
+                content_type="application/json", **self.auth,
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(AuditEvent.objects.filter(action="user.access", target_id=self.employee.pk).exists())
+
+    def test_user_block(self):
+        self.client.get("/api/auth/me", **self.auth)
+        with self.assertNumQueries(5), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(f"/api/auth/users/{self.employee.pk}/block", **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(AuditEvent.objects.filter(action="user.block", target_id=self.employee.pk).exists())
+
+    def test_bulk_action_ids(self):
+        others = User.objects.bulk_create(
+            User(email=f"otro{i}@example.com", first_name="Otro", last_name=str(i)) for i in range(20)
+        )
+        ids = [self.admin.pk, self.employee.pk] + [u.pk for u in others]
+        self.client.get("/api/auth/me", **self.auth)
+        get_principal(self.employee.pk)
+        # SAVEPOINT, un UPDATE para todos, RELEASE y un INSERT de auditoría en on_commit
+        with self.assertNumQueries(4), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/auth/users/bulk-action", {"action": "block", "ids": ids},
+                content_type="application/json", **self.auth,
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["updated"], 21)
+        self.assertTrue(response.data["skipped_self"])
+        self.assertEqual(User.objects.filter(status=User.Status.BLOCKED, is_active=False).count(), 21)
+        self.assertEqual(AuditEvent.objects.filter(action="user.block").count(), 21)
+        # La caché de principals se invalida en bloque tras el commit
+        self.assertEqual(get_principal(self.employee.pk).status, User.Status.BLOCKED)
+        self.assertEqual(User.objects.get(pk=self.admin.pk).status, User.Status.ACTIVE)
+
+    def test_bulk_action_filter(self):
+        self.client.get("/api/auth/me", **self.auth)
+        with self.assertNumQueries(4), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/auth/users/bulk-action",
+                {"action": "assign_permissions", "filter": {"role": "EMPLEADO"}, "permissions": ["ver"]},
+                content_type="application/json", **self.auth,
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["updated"], 1)
+        self.assertEqual(User.objects.get(pk=self.employee.pk).permissions, ["ver"])
+        # Repetir no cambia nada: los que ya tienen los valores se excluyen
+        response = self.client.post(
+            "/api/auth/users/bulk-action",
+            {"action": "assign_permissions", "filter": {"role": "EMPLEADO"}, "permissions": ["ver"]},
+            content_type="application/json", **self.auth,
+        )
+        self.assertEqual(response.data["updated"], 0)
+
+
+@skipUnless(RUN_BENCHMARKS or UPDATE_BENCHMARKS, "RUN_BENCHMARKS=True para ejecutar los benchmarks")
+@FAST_HASHING
+class BenchmarkTests(AuthFixtureMixin, TestCase):
+    measured = {}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.baseline = json.loads(BASELINE_FILE.read_text())["cases"] if BASELINE_FILE.exists() else {}
+        cls.users = _public_users(10_000)
+
+    @classmethod
+    def tearDownClass(cls):
+        if UPDATE_BENCHMARKS and cls.measured:
+            BASELINE_FILE.write_text(json.dumps({
+                "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                            "cpus": os.cpu_count()},
+                "unit": "us",
+                "cases": dict(sorted({**cls.baseline, **cls.measured}.items())),
+            }, indent=2) + "\n")
+        super().tearDownClass()
+
+    def bench(self, name, func, **kwargs):
+        best, median = measure(func, **kwargs)
+        if UPDATE_BENCHMARKS:
+            self.measured[name] = round(best, 2)
+            return
+        self.assertIn(name, self.baseline, f"{name}: sin línea base; ejecuta con UPDATE_BENCHMARKS=True")
+        limit = self.baseline[name] * (1 + TOLERANCE)
+        self.assertLessEqual(
+            best, limit,
+            f"{name}: {best:.2f} µs (mediana {median:.2f}) > {limit:.2f} µs "
+            f"(línea base {self.baseline[name]} µs + {TOLERANCE:.0%})",
+        )
+
+    def test_user_public_serializer_1(self):
+        user = self.users[0]
+        self.bench("serializer_1", lambda: UserPublicSerializer(user).data)
+
+    def test_user_public_serializer_100(self):
+        users = self.users[:100]
+        self.bench("serializer_100", lambda: UserPublicSerializer(users, many=True).data)
+
+    def test_user_public_serializer_10k(self):
+        self.bench("serializer_10k", lambda: UserPublicSerializer(self.users, many=True).data, rounds=3)
+
+    def test_validate_permissions(self):
+        ser = AssignRolePermsSerializer()
+        perms = ["ver", "editar", "aprobar", "ver"]
+        self.bench("validate_permissions", lambda: ser.validate_permissions(perms))
+
+    def test_validate_password_strength(self):
+        self.bench("validate_password_strength", lambda: validate_password_strength("Turno-seguro-2025"))
+
+    def test_login_serializer_validate(self):
+        data = {"email": self.admin.email, "password": PASSWORD}
+
+        def validate():
+            ser = LoginSerializer(data=data)
+            assert ser.is_valid(), ser.errors
+
+        self.bench("login_serializer_validate", validate)
+
+    def test_me_view_dispatch(self):
+        self.client.get("/api/auth/me", **self.auth)
+        self.bench("me_view_dispatch", lambda: self.client.get("/api/auth/me", **self.auth))
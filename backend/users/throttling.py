@@ -0,0 +1,59 @@
+"""
+Throttling de los endpoints públicos (login, registro, restablecimiento).
+
+Cada vista declara `throttle_scope`; THROTTLE_RATES[scope] fija los límites
+por IP, por email (del cuerpo de la petición) y por endpoint (global). Los
+tres se comprueban juntos con core.ratelimit.check(), una sola ida y vuelta a
+la caché, en APIView.initial(): una petición rechazada no llega a validar el
+serializer ni a calcular ningún hash de contraseña.
+
+Uso en una vista:
+
+    throttle_classes = [ScopedSlidingWindowThrottle]
+    throttle_scope = "login"
+"""
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from core import ratelimit
+
+
+def _email(data):
+    try:
+        email = data.get("email")
+    except AttributeError:
+        return None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+def limits_for(scope, ip, email):
+    """Limit de cada tipo configurado para `scope` (sin email no hay límite por email)."""
+    idents = {"ip": ip, "email": email, "endpoint": "*"}
+    out = []
+    for kind, rate in settings.THROTTLE_RATES.get(scope, {}).items():
+        parsed = ratelimit.parse_rate(rate)
+        if parsed is None or not idents.get(kind):
+            continue
+        out.append(ratelimit.Limit(f"{scope}:{kind}", idents[kind], *parsed))
+    return out
+
+
+class ScopedSlidingWindowThrottle(BaseThrottle):
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        if not scope:
+            return True
+        limits = limits_for(scope, self.get_ident(request), _email(request.data))
+        allowed, self._wait, _ = ratelimit.check(limits)
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+def check_request(request, scope, data):
+    """Misma comprobación para vistas fuera de DRF (users.async_views): (permitido, espera)."""
+    allowed, wait, _ = ratelimit.check(
+        limits_for(scope, ScopedSlidingWindowThrottle().get_ident(request), _email(data))
+    )
+    return allowed, wait
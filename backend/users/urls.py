@@ -1,6 +1,7 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
-from .views import RegisterView, LoginView, MeView, PasswordResetRequestView, PasswordResetConfirmView, AdminCreateUserView,AdminUserDetailView,AdminBlockUserView,AdminUserAccessView
+from .views import RegisterView, LoginView, MeView, PasswordResetRequestView, PasswordResetConfirmView, AdminCreateUserView,AdminUserDetailView,AdminBlockUserView,AdminUserAccessView,AdminUserListView,AdminBulkCreateUserView,AdminUserExportView,AdminBulkActionView
 
 urlpatterns = [
     path("register", RegisterView.as_view(), name="auth-register"),
@@ -9,8 +10,26 @@ urlpatterns = [
     path("me", MeView.as_view(), name="auth-me"),
     path("password/reset", PasswordResetRequestView.as_view(), name="password-reset-request"),
     path("password/reset/confirm", PasswordResetConfirmView.as_view(), name="password-reset-confirm"),
+    path("users", AdminUserListView.as_view(), name="user-list-admin"),
     path("users/create", AdminCreateUserView.as_view(), name="user-create-admin"),
+    path("users/export", AdminUserExportView.as_view(), name="user-export-admin"),
+    path("users/bulk", AdminBulkCreateUserView.as_view(), name="user-bulk-create-admin"),
+    path("users/bulk-action", AdminBulkActionView.as_view(), name="user-bulk-action-admin"),
     path("users/<int:pk>", AdminUserDetailView.as_view(), name="user-detail-admin"),
     path("users/<int:pk>/block", AdminBlockUserView.as_view(), name="user-block-admin"),
     path("users/<int:pk>/access", AdminUserAccessView.as_view(), name="user-access-admin"),
 ]
+
+if settings.ASYNC_VIEWS:
+    # Modo ASGI: mismas rutas y nombres, servidas por vistas async
+    from . import async_views
+
+    _async = {
+        "auth-login": async_views.login,
+        "auth-me": async_views.me,
+        "user-access-admin": async_views.user_access,
+    }
+    urlpatterns = [
+        path(str(p.pattern), _async[p.name], name=p.name) if p.name in _async else p
+        for p in urlpatterns
+    ]
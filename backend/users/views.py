@@ -1,21 +1,37 @@
 import time
 from .models import User
 from django.conf import settings
-from django.core.cache import cache
-from django.core.mail import send_mail
+from django.http import StreamingHttpResponse
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import smart_bytes
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db import transaction
 from rest_framework import status, permissions, generics
+from rest_framework.exceptions import Throttled
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
-from .serializers import LoginSerializer, RegisterSerializer, UserPublicSerializer, AdminCreateUserSerializer,AdminUpdateUserSerializer, AssignRolePermsSerializer
+from audit import log as audit
+from jobs.queue import enqueue
+from jobs.views import accepted
+from notifications.outbox import enqueue_email
+from .principal import invalidate_principal
+from .policies import RolePolicyPermission
+from .throttling import ScopedSlidingWindowThrottle
+from .filters import filter_users, after_cursor, encode_cursor
+from .importers import detect_format, import_users
+from . import bulk
+from .exporters import CONTENT_TYPES, STREAMERS
+from .renderers import CSVRenderer, JSONLinesRenderer
+from .serializers import LoginSerializer, RegisterSerializer, UserPublicSerializer, AdminCreateUserSerializer,AdminUpdateUserSerializer, AssignRolePermsSerializer, BulkUserActionSerializer
 
 class RegisterView(APIView):
     authentication_classes = []
     permission_classes = []
+    throttle_classes = [ScopedSlidingWindowThrottle]
+    throttle_scope = "register"
 
     def post(self, request):
         ser = RegisterSerializer(data=request.data)
@@ -30,6 +46,8 @@ class RegisterView(APIView):
 class LoginView(APIView):
     authentication_classes = []     # público
     permission_classes = []         # público
+    throttle_classes = [ScopedSlidingWindowThrottle]
+    throttle_scope = "login"
 
     def post(self, request):
         ser = LoginSerializer(data=request.data, context={"request": request})
@@ -65,8 +83,13 @@ token_generator = PasswordResetTokenGenerator()
 class PasswordResetRequestView(APIView):
     authentication_classes = []
     permission_classes = []
+    # 1 por hora y email (THROTTLE_RATES["password_reset"]), además de IP y global
+    throttle_classes = [ScopedSlidingWindowThrottle]
+    throttle_scope = "password_reset"
 
-    RATE_LIMIT_SECONDS = 3600  # 1 por hora
+    def throttled(self, request, wait):
+        # 429 Too Many Requests
+        raise Throttled(wait, detail="Ya se solicitó un restablecimiento recientemente. Intenta más tarde.")
 
     def post(self, request):
         ser = PasswordResetRequestSerializer(data=request.data)
@@ -74,13 +97,6 @@ class PasswordResetRequestView(APIView):
             return Response(ser.errors, status=status.HTTP_400_BAD_REQUEST)
 
         user = ser.context["user"]
-        # rate limit por email
-        key = f"pwdreset:{user.email.lower()}"
-        if cache.get(key):
-            # 429 Too Many Requests
-            return Response({"message": "Ya se solicitó un restablecimiento recientemente. Intenta más tarde."},
-                            status=429)
-        cache.set(key, True, self.RATE_LIMIT_SECONDS)
 
         uidb64 = urlsafe_base64_encode(smart_bytes(user.pk))
         token = token_generator.make_token(user)
@@ -98,7 +114,8 @@ class PasswordResetRequestView(APIView):
             f"Solicitaste restablecer tu contraseña. Haz clic en el enlace (expira en 24 horas):\n\n{link}\n\n"
             "Si no fuiste tú, ignora este mensaje."
         )
-        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email], fail_silently=False)
+        # Solo un INSERT en la outbox: el envío lo hace manage.py send_outbox
+        enqueue_email(user.email, subject, message)
 
         # En desarrollo puedes (opcional) devolver los datos para facilitar test QA:
         if settings.DEBUG:
@@ -125,18 +142,18 @@ class PasswordResetConfirmView(APIView):
 class AdminCreateUserView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = AdminCreateUserSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"POST": "crear"}
+    permission_denied_messages = {"POST": "No tienes permiso para crear usuarios."}
 
     def post(self, request, *args, **kwargs):
-        # Solo roles con permiso
-        if request.user.role not in ["ADMIN", "GERENTE"]:
-            return Response({"detail": "No tienes permiso para crear usuarios."}, status=403)
-        
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=400)
 
-        user = serializer.save()
+        with transaction.atomic():
+            user = serializer.save()
+            audit.record(request, "user.create", target=user, changes=audit.diff({}, audit.snapshot(user)))
         return Response(
             {
                 "message": "Usuario creado con éxito.",
@@ -153,6 +170,33 @@ class AdminCreateUserView(generics.CreateAPIView):
             status=status.HTTP_201_CREATED
         )
 
+class AdminBulkCreateUserView(APIView):
+    """
+    POST /api/auth/users/bulk   (multipart, campo "file": .csv o .jsonl)
+    Columnas: first_name, last_name, email, telefono, role, status, password.
+    Archivos grandes (o ?async=1) se procesan en segundo plano: 202 + job.
+    Solo roles ADMIN o GERENTE.
+    """
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"POST": "crear"}
+    permission_denied_messages = {"POST": "No tienes permiso para crear usuarios."}
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"detail": "Adjunta un archivo en el campo 'file'."}, status=400)
+        fmt = detect_format(upload)
+        if fmt is None:
+            return Response({"detail": "Formato no soportado. Usa .csv o .jsonl."}, status=400)
+
+        if upload.size > settings.USER_IMPORT_INLINE_MAX_BYTES or request.query_params.get("async") == "1":
+            job = enqueue("users.import", {"format": fmt}, user=request.user, input=upload)
+            return accepted(job)
+
+        result = import_users(upload, fmt, actor=request.user)
+        code = status.HTTP_201_CREATED if result["created"] or not result["errors"] else 400
+        return Response(result, status=code)
+
 class AdminUpdateUserView(generics.UpdateAPIView):
     """
     PATCH /api/auth/users/<id>   -> actualización parcial
@@ -161,20 +205,27 @@ class AdminUpdateUserView(generics.UpdateAPIView):
     """
     queryset = User.objects.all()
     serializer_class = AdminUpdateUserSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"PUT": "editar", "PATCH": "editar"}
+    permission_denied_messages = {
+        "PUT": "No tienes permiso para editar usuarios.",
+        "PATCH": "No tienes permiso para editar usuarios.",
+    }
     lookup_field = "pk"
 
     def update(self, request, *args, **kwargs):
-        # ✅ Autorización por rol
-        if request.user.role not in ["ADMIN", "GERENTE"]:
-            return Response({"detail": "No tienes permiso para editar usuarios."}, status=403)
-
         partial = request.method.lower() == "patch"
         instance = self.get_object()
 
+        before = audit.snapshot(instance)
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
+        with transaction.atomic():
+            self.perform_update(serializer)
+            changes = audit.diff(before, audit.snapshot(instance))
+            if changes:
+                audit.record(request, "user.update", target=instance, changes=changes)
+        invalidate_principal(instance.pk)
 
         user = serializer.instance
         return Response(
@@ -195,21 +246,24 @@ class AdminUpdateUserView(generics.UpdateAPIView):
 
 class AdminDeleteUserView(generics.DestroyAPIView):
     queryset = User.objects.all()
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"DELETE": "eliminar"}
+    permission_denied_messages = {"DELETE": "No tienes permiso para eliminar usuarios."}
     lookup_field = "pk"
 
     def delete(self, request, *args, **kwargs):
-        # Solo ADMIN/GERENTE
-        if request.user.role not in ["ADMIN", "GERENTE"]:
-            return Response({"detail": "No tienes permiso para eliminar usuarios."}, status=403)
-
         instance = self.get_object()
 
         # Seguridad: no eliminarse a sí mismo
         if instance.pk == request.user.pk:
             return Response({"detail": "No puedes eliminar tu propio usuario."}, status=400)
 
-        self.perform_destroy(instance)
+        user_id = instance.pk
+        before = audit.snapshot(instance)
+        with transaction.atomic():
+            audit.record(request, "user.delete", target=instance, changes=audit.diff(before, {}))
+            self.perform_destroy(instance)
+        invalidate_principal(user_id)
         return Response({"message": "Usuario eliminado con éxito."}, status=200)
     
 class AdminUserDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -222,22 +276,29 @@ class AdminUserDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     queryset = User.objects.all()
     serializer_class = AdminUpdateUserSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"GET": "ver", "PUT": "editar", "PATCH": "editar", "DELETE": "eliminar"}
+    permission_denied_messages = {
+        "GET": "No tienes permiso para ver usuarios.",
+        "PUT": "No tienes permiso para editar usuarios.",
+        "PATCH": "No tienes permiso para editar usuarios.",
+        "DELETE": "No tienes permiso para eliminar usuarios.",
+    }
     lookup_field = "pk"
 
-    def _check_role(self, request):
-        return request.user.role in ["ADMIN", "GERENTE"]
-
     # PUT/PATCH
     def update(self, request, *args, **kwargs):
-        if not self._check_role(request):
-            return Response({"detail": "No tienes permiso para editar usuarios."}, status=403)
-
         partial = request.method.lower() == "patch"
         instance = self.get_object()
+        before = audit.snapshot(instance)
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
+        with transaction.atomic():
+            self.perform_update(serializer)
+            changes = audit.diff(before, audit.snapshot(instance))
+            if changes:
+                audit.record(request, "user.update", target=instance, changes=changes)
+        invalidate_principal(instance.pk)
 
         user = serializer.instance
         return Response({
@@ -255,29 +316,29 @@ class AdminUserDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     # DELETE
     def destroy(self, request, *args, **kwargs):
-        if not self._check_role(request):
-            return Response({"detail": "No tienes permiso para eliminar usuarios."}, status=403)
-
         instance = self.get_object()
         if instance.pk == request.user.pk:
             return Response({"detail": "No puedes eliminar tu propio usuario."}, status=400)
 
-        self.perform_destroy(instance)
+        user_id = instance.pk
+        before = audit.snapshot(instance)
+        with transaction.atomic():
+            audit.record(request, "user.delete", target=instance, changes=audit.diff(before, {}))
+            self.perform_destroy(instance)
+        invalidate_principal(user_id)
         return Response({"message": "Usuario eliminado con éxito."}, status=200)
 
 class AdminBlockUserView(APIView):
     """
     PUT /api/auth/users/<id>/block
-    Cambia el estado del usuario a 'BLOQUEADO'.
+    Cambia el estado del usuario a BLOCKED.
     Solo ADMIN o GERENTE.
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"PUT": "editar"}
+    permission_denied_messages = {"PUT": "No tienes permiso para bloquear usuarios."}
 
     def put(self, request, pk):
-        # Solo ADMIN/GERENTE pueden bloquear
-        if request.user.role not in ["ADMIN", "GERENTE"]:
-            return Response({"detail": "No tienes permiso para bloquear usuarios."}, status=403)
-
         try:
             user = User.objects.get(pk=pk)
         except User.DoesNotExist:
@@ -288,29 +349,132 @@ class AdminBlockUserView(APIView):
             return Response({"detail": "No puedes bloquear tu propio usuario."}, status=400)
 
         # Verificar si ya está bloqueado
-        if user.status == "BLOQUEADO":
+        if user.status == User.Status.BLOCKED:
             return Response({"message": "El usuario ya está bloqueado."}, status=400)
 
         # Bloquear usuario
-        user.status = "BLOQUEADO"
+        before = audit.snapshot(user)
+        user.status = User.Status.BLOCKED
         user.is_active = False
-        user.save(update_fields=["status", "is_active"])
-
-        # (Opcional) registrar auditoría
-        print(f"[AUDITORÍA] {request.user.email} bloqueó al usuario {user.email}")
+        with transaction.atomic():
+            user.save(update_fields=["status", "is_active", "updated_at"])
+            audit.record(request, "user.block", target=user, changes=audit.diff(before, audit.snapshot(user)))
+        invalidate_principal(user.pk)
 
         return Response({"message": "Usuario bloqueado con éxito."}, status=200)
 
 
+class AdminBulkActionView(APIView):
+    """
+    POST /api/auth/users/bulk-action
+    {"action": "block"|"activate"|"set_role"|"assign_permissions",
+     "ids": [...] | "filter": {"role", "status", "q", "changed_since"}, "role", "permissions"}
+    Un solo UPDATE para toda la selección (users.bulk); nunca toca al propio usuario.
+    Solo ADMIN o GERENTE.
+    """
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"POST": "editar"}
+    permission_denied_messages = {"POST": "No tienes permiso para modificar usuarios."}
+
+    def post(self, request):
+        ser = BulkUserActionSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        data = ser.validated_data
+        try:
+            updated = bulk.apply(
+                request, data["action"], ids=data.get("ids"), filters=data.get("filter"),
+                role=data.get("role"), permissions=data.get("permissions"),
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        result = {"message": "Acción aplicada con éxito.", "action": data["action"], "updated": len(updated)}
+        if "ids" in data:
+            result["requested"] = len(data["ids"])
+            result["skipped_self"] = request.user.pk in data["ids"]
+        return Response(result, status=200)
+
+
 User = get_user_model()
 
+class AdminUserListView(APIView):
+    """
+    GET /api/auth/users?role=&status=&q=&limit=&cursor=
+    Directorio paginado por keyset sobre (last_name, id).
+    Solo ADMIN o GERENTE.
+    """
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"GET": "ver"}
+    permission_denied_messages = {"GET": "No tienes permiso para ver usuarios."}
+
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get("limit", self.PAGE_SIZE)), self.MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({"detail": "limit debe ser un entero."}, status=400)
+        if limit < 1:
+            return Response({"detail": "limit debe ser mayor que 0."}, status=400)
+
+        try:
+            qs = filter_users(User.objects.all(), request.query_params)
+            cursor = request.query_params.get("cursor")
+            if cursor:
+                qs = after_cursor(qs, cursor)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        # Proyección directa a dicts: sin instanciar modelos ni serializer
+        rows = list(
+            qs.order_by("last_name", "id").values(*UserPublicSerializer.Meta.fields)[: limit + 1]
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["last_name"], rows[-1]["id"])
+
+        return Response({"results": rows, "next": next_cursor}, status=200)
+
+
+class AdminUserExportView(APIView):
+    """
+    GET /api/auth/users/export?format=csv|jsonl&role=&status=&changed_since=
+    Volcado completo en streaming (campos públicos + permissions).
+    Solo ADMIN o GERENTE.
+    """
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"GET": "ver"}
+    permission_denied_messages = {"GET": "No tienes permiso para exportar usuarios."}
+    renderer_classes = [JSONRenderer, CSVRenderer, JSONLinesRenderer]
+
+    def get(self, request):
+        fmt = request.query_params.get("format", "csv")
+        if fmt not in STREAMERS:
+            return Response({"detail": "Formato no soportado. Usa csv o jsonl."}, status=400)
+        try:
+            qs = filter_users(User.objects.all(), request.query_params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        response = StreamingHttpResponse(STREAMERS[fmt](qs), content_type=CONTENT_TYPES[fmt])
+        response["Content-Disposition"] = f'attachment; filename="users.{fmt}"'
+        return response
+
+
 class AdminUserAccessView(APIView):
     """
     GET /api/auth/users/<id>/access  -> Obtiene rol + permisos
     PUT /api/auth/users/<id>/access  -> Asigna rol + permisos
     Solo ADMIN o GERENTE.
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [RolePolicyPermission]
+    required_perms = {"GET": "ver", "PUT": "editar"}
+    permission_denied_messages = {
+        "GET": "No tienes permiso para ver acceso.",
+        "PUT": "No tienes permiso para asignar roles/permisos.",
+    }
 
     def get_object(self, pk):
         try:
@@ -319,8 +483,6 @@ class AdminUserAccessView(APIView):
             return None
 
     def get(self, request, pk):
-        if request.user.role not in ["ADMIN", "GERENTE"]:
-            return Response({"detail": "No tienes permiso para ver acceso."}, status=403)
         user = self.get_object(pk)
         if not user:
             return Response({"detail": "Usuario no encontrado."}, status=404)
@@ -332,15 +494,18 @@ class AdminUserAccessView(APIView):
         }, status=200)
 
     def put(self, request, pk):
-        if request.user.role not in ["ADMIN", "GERENTE"]:
-            return Response({"detail": "No tienes permiso para asignar roles/permisos."}, status=403)
         user = self.get_object(pk)
         if not user:
             return Response({"detail": "Usuario no encontrado."}, status=404)
 
         ser = AssignRolePermsSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
-        ser.update(user, ser.validated_data)
+        before = audit.snapshot(user)
+        with transaction.atomic():
+            ser.update(user, ser.validated_data)
+            changes = audit.diff(before, audit.snapshot(user))
+            if changes:
+                audit.record(request, "user.access", target=user, changes=changes)
 
         return Response({
             "message": "Acceso actualizado con éxito.",
@@ -16,9 +16,21 @@ for i in range(60):
 else:
     raise SystemExit("Postgres did not become available in time.")
 PY
+# Con argumentos se ejecuta ese proceso (p.ej. el worker de trabajos);
+# las migraciones quedan a cargo del contenedor web.
+if [ "$#" -gt 0 ]; then
+  exec "$@"
+fi
 echo "Running migrations..."
 python manage.py migrate --noinput
 echo "Collecting static files..."
 python manage.py collectstatic --noinput || true
+# SERVER_MODE=asgi: mismos workers de gunicorn, pero con UvicornWorker sobre
+# core.asgi (vistas async en users.async_views).
+WORKERS="${GUNICORN_WORKERS:-3}"
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+  echo "Starting Gunicorn (ASGI, uvicorn workers)..."
+  exec gunicorn core.asgi:application -k uvicorn_worker.UvicornWorker --bind 0.0.0.0:8000 --workers "$WORKERS"
+fi
 echo "Starting Gunicorn..."
-exec gunicorn core.wsgi:application --bind 0.0.0.0:8000 --workers 3
+exec gunicorn core.wsgi:application --bind 0.0.0.0:8000 --workers "$WORKERS"